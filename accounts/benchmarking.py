@@ -0,0 +1,107 @@
+import statistics
+import subprocess
+import time
+import tracemalloc
+
+from django.db import connection, transaction
+from django.test.utils import setup_test_environment
+
+
+def ensure_test_environment():
+    """
+    locmem email backend + "testserver" in ALLOWED_HOSTS,
+    tolerating an environment that is already set up.
+    """
+    try:
+        setup_test_environment()
+    except RuntimeError:
+        pass
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def latency_summary(latencies):
+    """Seconds in, rounded milliseconds out."""
+    values = sorted(latencies)
+    ms = lambda seconds: round(seconds * 1000, 3)  # noqa: E731
+
+    return {
+        "mean_ms": ms(statistics.mean(values)) if values else 0.0,
+        "p50_ms": ms(percentile(values, 50)),
+        "p95_ms": ms(percentile(values, 95)),
+        "p99_ms": ms(percentile(values, 99)),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class QueryCounter:
+    """
+    execute_wrapper that only counts statements. Unlike
+    CaptureQueriesContext it doesn't stop at the 9000-entry
+    queries_log limit and skips the debug cursor overhead.
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+# ==================================================
+# MEASURE ONE HOT PATH
+# ==================================================
+def measure(func, iterations, rollback=True):
+    """
+    Run func() `iterations` times, each inside a transaction that is
+    rolled back (so write paths leave the dataset unchanged).
+    Returns latency percentiles, query counts and peak traced memory.
+    """
+
+    def run_once():
+        with transaction.atomic():
+            func()
+            if rollback:
+                transaction.set_rollback(True)
+
+    latencies = []
+    query_counts = []
+
+    for _ in range(iterations):
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            started = time.perf_counter()
+            run_once()
+            latencies.append(time.perf_counter() - started)
+        query_counts.append(counter.count)
+
+    # Separate pass: tracemalloc slows everything down
+    tracemalloc.start()
+    try:
+        run_once()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "iterations": iterations,
+        **latency_summary(latencies),
+        "queries_median": int(statistics.median(query_counts)) if query_counts else 0,
+        "queries_max": max(query_counts, default=0),
+        "peak_memory_kb": round(peak / 1024, 1),
+    }
@@ -0,0 +1,21 @@
+"""
+Password hashing helpers for process pools.
+
+Kept free of model imports so worker processes can unpickle them
+before Django is set up (spawn start method).
+"""
+import os
+
+
+def init_worker():
+    import django
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "obdms.settings")
+    django.setup()
+
+
+def hash_password(password):
+    from django.contrib.auth.hashers import make_password
+
+    # None yields an unusable password, same as create_user(password=None)
+    return make_password(password or None)
@@ -0,0 +1,206 @@
+import json
+import platform
+
+import django
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import setup_databases, teardown_databases
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.benchmarking import ensure_test_environment, git_revision, measure
+from accounts.seeding import seed_database
+from blood_requests import services
+from blood_requests.models import BloodRequest, RequestMatch
+from donors.models import Donor
+from hospitals.models import Hospital
+
+
+# ==================================================
+# HOT PATHS
+# ==================================================
+def hot_paths():
+    """
+    name -> zero-argument callable, built against the current dataset.
+    Paths pick the busiest hospital/donor/city so numbers reflect the
+    worst realistic case rather than an empty inbox.
+    """
+    paths = {}
+
+    busiest_city = (
+        Donor.objects.filter(status="active")
+        .values("city").annotate(n=Count("id")).order_by("-n")
+        .values_list("city", flat=True).first()
+    )
+    hospital = (
+        Hospital.objects.annotate(n=Count("blood_requests")).order_by("-n").first()
+    )
+    inbox_donor = (
+        Donor.objects.filter(matches__accepted__isnull=True, matches__request__status="open")
+        .annotate(n=Count("matches")).order_by("-n").first()
+    )
+    pending_match = (
+        RequestMatch.objects.filter(accepted__isnull=True, request__status="open")
+        .select_related("donor__user").order_by("id").first()
+    )
+
+    # ---------- matching ----------
+    if hospital:
+        def match_and_notify():
+            blood_request = BloodRequest.objects.create(
+                requested_by=hospital.user,
+                hospital=hospital,
+                blood_group="AB+",  # compatible with every group: widest fan-out
+                units_required=1,
+                city=busiest_city or hospital.city,
+                contact_info=hospital.phone,
+            )
+            services.match_and_notify(blood_request)
+
+        paths["match_and_notify"] = match_and_notify
+
+    # ---------- public listing (cold: cache cleared per run) ----------
+    anonymous = Client()
+    filters = {
+        "none": {},
+        "blood_group": {"blood_group": "O-"},
+        "city": {"city": busiest_city or ""},
+        "location": {"location": busiest_city or ""},
+    }
+    for label, params in filters.items():
+        def donors_page(params=params):
+            cache.clear()
+            anonymous.get(reverse("donors:donors-page"), params)
+
+        paths[f"donors_page[{label}]"] = donors_page
+
+    def donors_page_cached():
+        anonymous.get(reverse("donors:donors-page"))
+
+    paths["donors_page[cached]"] = donors_page_cached
+
+    # ---------- dashboards / inbox ----------
+    if hospital:
+        hospital_client = Client()
+        hospital_client.force_login(hospital.user)
+        paths["hospital_dashboard"] = lambda: hospital_client.get(
+            reverse("hospital:hospital-dashboard")
+        )
+
+    if inbox_donor:
+        donor_client = Client()
+        donor_client.force_login(inbox_donor.user)
+        paths["donor_matching_requests"] = lambda: donor_client.get(
+            reverse("donors:donor-matching-requests")
+        )
+
+    # ---------- accept (rolled back after each run) ----------
+    if pending_match:
+        responder = Client()
+        responder.force_login(pending_match.donor.user)
+        accept_url = reverse("donors:respond-request", args=[pending_match.id, "accept"])
+        paths["respond_to_request"] = lambda: responder.get(accept_url)
+
+    return paths
+
+
+# ==================================================
+# COMMAND
+# ==================================================
+class Command(BaseCommand):
+    help = (
+        "Seed throwaway databases at several scales and report p50/p95/p99 "
+        "latency, query counts and peak memory of the hot paths as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scales",
+            default="1000,10000",
+            help="Comma-separated donor counts to seed, e.g. 1000,10000,100000",
+        )
+        parser.add_argument("--iterations", type=int, default=30)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--path", action="append", dest="paths", help="Only run these paths")
+        parser.add_argument(
+            "--current-db",
+            action="store_true",
+            help="Benchmark the configured database as-is (no seeding; writes rolled back)",
+        )
+        parser.add_argument("--output", help="Write the JSON report to this file")
+        parser.add_argument("--compare", help="Previous JSON report to diff p95 against")
+
+    def handle(self, *args, **options):
+        ensure_test_environment()
+
+        report = {
+            "meta": {
+                "git": git_revision(),
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "created": timezone.now().isoformat(),
+                "iterations": options["iterations"],
+            },
+            "results": [],
+        }
+
+        if options["current_db"]:
+            report["results"] += self.run_paths("current", options)
+        else:
+            for scale in [int(s) for s in options["scales"].split(",") if s.strip()]:
+                old_config = setup_databases(verbosity=0, interactive=False)
+                try:
+                    self.stderr.write(f"seeding {scale} donors...")
+                    seed_database(donors=scale, seed=options["seed"])
+                    report["results"] += self.run_paths(scale, options)
+                finally:
+                    teardown_databases(old_config, verbosity=0)
+
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as fh:
+                fh.write(output + "\n")
+        else:
+            self.stdout.write(output)
+
+        if options["compare"]:
+            self.compare(report, options["compare"])
+
+    def run_paths(self, scale, options):
+        results = []
+        paths = hot_paths()
+
+        for name, func in paths.items():
+            if options["paths"] and name not in options["paths"]:
+                continue
+            self.stderr.write(f"  [{scale}] {name}")
+            results.append({
+                "scale": scale,
+                "path": name,
+                **measure(func, options["iterations"]),
+            })
+
+        return results
+
+    def compare(self, report, baseline_path):
+        try:
+            with open(baseline_path, encoding="utf-8") as fh:
+                baseline = json.load(fh)
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"Cannot read {baseline_path}: {exc}")
+
+        previous = {(r["scale"], r["path"]): r for r in baseline["results"]}
+
+        for row in report["results"]:
+            old = previous.get((row["scale"], row["path"]))
+            if not old or not old["p95_ms"]:
+                continue
+            ratio = row["p95_ms"] / old["p95_ms"]
+            flag = "  <-- slower" if ratio > 1.2 else ""
+            self.stderr.write(
+                f"{row['scale']!s:>8} {row['path']:<28} p95 {old['p95_ms']:>9} -> "
+                f"{row['p95_ms']:>9} ms ({ratio:.2f}x), queries "
+                f"{old['queries_median']} -> {row['queries_median']}{flag}"
+            )
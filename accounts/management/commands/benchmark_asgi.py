@@ -0,0 +1,158 @@
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient, Client
+from django.urls import reverse
+
+from accounts.benchmarking import ensure_test_environment, latency_summary
+
+
+DEFAULT_URLS = [
+    "donors:donors-page",
+    "hospital:hospitals-page",
+]
+
+
+# ==================================================
+# HELPERS
+# ==================================================
+def summarize(handler, url, latencies, errors, elapsed):
+    return {
+        "handler": handler,
+        "url": url,
+        "requests": len(latencies),
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        **latency_summary(latencies),
+    }
+
+
+def is_error(response):
+    return response.status_code >= 400
+
+
+# ==================================================
+# COMMAND
+# ==================================================
+class Command(BaseCommand):
+    help = (
+        "Compare concurrent-request throughput of the WSGI and ASGI "
+        "handlers in-process for the read-heavy endpoints."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--concurrency", type=int, default=20)
+        parser.add_argument(
+            "--url",
+            action="append",
+            dest="urls",
+            help="URL name to benchmark (repeatable), e.g. donors:donors-page",
+        )
+        parser.add_argument(
+            "--login",
+            help="Email of the user to log in as (needed for dashboard pages)",
+        )
+        parser.add_argument("--json", action="store_true", help="Print results as JSON")
+
+    def handle(self, *args, **options):
+        ensure_test_environment()
+
+        user = None
+        if options["login"]:
+            user = User.objects.filter(username=options["login"]).first()
+            if not user:
+                raise CommandError(f"No user with email {options['login']}.")
+
+        total = options["requests"]
+        concurrency = options["concurrency"]
+
+        results = []
+        for name in options["urls"] or DEFAULT_URLS:
+            url = reverse(name)
+            results.append(self.run_wsgi(url, user, total, concurrency))
+            results.append(asyncio.run(self.run_asgi(url, user, total, concurrency)))
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+
+        for row in results:
+            self.stdout.write(
+                f"{row['handler']:<5} {row['url']:<28} "
+                f"{row['throughput_rps']:>8} req/s  "
+                f"mean {row['mean_ms']:>7} ms  "
+                f"p95 {row['p95_ms']:>7} ms  "
+                f"p99 {row['p99_ms']:>7} ms  "
+                f"errors {row['errors']}"
+            )
+
+    # ==================================================
+    # WSGI: thread pool, one client per worker thread
+    # ==================================================
+    def run_wsgi(self, url, user, total, concurrency):
+        local = threading.local()
+        errors = 0
+        lock = threading.Lock()
+
+        def fetch(_):
+            nonlocal errors
+            client = getattr(local, "client", None)
+            if client is None:
+                client = local.client = Client(raise_request_exception=False)
+                if user:
+                    client.force_login(user)
+
+            started = time.perf_counter()
+            response = client.get(url)
+            latency = time.perf_counter() - started
+
+            if is_error(response):
+                with lock:
+                    errors += 1
+            return latency
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            latencies = list(pool.map(fetch, range(total)))
+        elapsed = time.perf_counter() - started
+
+        return summarize("wsgi", url, latencies, errors, elapsed)
+
+    # ==================================================
+    # ASGI: asyncio workers sharing the event loop
+    # ==================================================
+    async def run_asgi(self, url, user, total, concurrency):
+        errors = 0
+        queue = asyncio.Queue()
+        for i in range(total):
+            queue.put_nowait(i)
+
+        latencies = []
+
+        async def worker():
+            nonlocal errors
+            client = AsyncClient(raise_request_exception=False)
+            if user:
+                await client.aforce_login(user)
+
+            while not queue.empty():
+                queue.get_nowait()
+                started = time.perf_counter()
+                response = await client.get(url)
+                latencies.append(time.perf_counter() - started)
+
+                if is_error(response):
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+        return summarize("asgi", url, latencies, errors, elapsed)
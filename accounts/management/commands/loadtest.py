@@ -0,0 +1,307 @@
+import http.cookiejar
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection
+from django.db.models import Count
+from django.test import Client
+from django.urls import reverse
+
+from accounts.benchmarking import ensure_test_environment, latency_summary
+from accounts.seeding import SEED_PASSWORD
+from blood_requests.models import RequestMatch
+from donors.models import Donor
+from hospitals.models import Hospital
+
+
+# Share of operations per scenario, roughly a campaign day
+DEFAULT_MIX = "search=55,inbox=30,file_request=5,accept=10"
+
+BLOOD_GROUPS = ("O+", "B+", "A+", "AB+", "O-", "B-", "A-", "AB-")
+
+
+def classify(exc):
+    if isinstance(exc, OperationalError):
+        return "sqlite_locked" if "locked" in str(exc) else "db_error"
+    return type(exc).__name__
+
+
+# ==================================================
+# TRANSPORTS
+# ==================================================
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class HttpSession:
+    """One logged-in browser against a running server."""
+
+    def __init__(self, base_url, password):
+        self.base_url = base_url.rstrip("/")
+        self.password = password
+        self.cookies = http.cookiejar.CookieJar()
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(self.cookies),
+            _NoRedirect,
+        )
+
+    def _csrf(self):
+        return next((c.value for c in self.cookies if c.name == "csrftoken"), "")
+
+    def request(self, method, path, data=None):
+        body = None
+        headers = {}
+        if method == "post":
+            data = {**(data or {}), "csrfmiddlewaretoken": self._csrf()}
+            body = urllib.parse.urlencode(data).encode()
+            headers["Referer"] = self.base_url + path
+        elif data:
+            path = f"{path}?{urllib.parse.urlencode(data)}"
+
+        req = urllib.request.Request(
+            self.base_url + path, data=body, method=method.upper(), headers=headers
+        )
+        try:
+            with self.opener.open(req, timeout=60) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as exc:
+            # 3xx (redirects are not followed) and 4xx/5xx
+            exc.read()
+            return exc.code
+
+    def login(self, user):
+        self.request("get", reverse("login"))
+        self.request("post", reverse("login"), {
+            "email": user.username, "password": self.password,
+        })
+
+
+class ClientSession:
+    """In-process test client; the view runs in the calling thread."""
+
+    def __init__(self):
+        self.client = Client()
+
+    def request(self, method, path, data=None):
+        return getattr(self.client, method)(path, data or {}).status_code
+
+    def login(self, user):
+        self.client.force_login(user)
+
+
+# ==================================================
+# ACTORS AND SCENARIOS
+# ==================================================
+class Actors:
+    """Users pulled from the (seeded) database up front."""
+
+    def __init__(self, limit):
+        self.cities = list(
+            Donor.objects.filter(status="active").values("city")
+            .annotate(n=Count("id")).order_by("-n").values_list("city", flat=True)[:20]
+        )
+        self.donors = list(
+            Donor.objects.filter(
+                matches__accepted__isnull=True, matches__request__status="open"
+            ).select_related("user").distinct()[:limit]
+        )
+        self.hospitals = list(Hospital.objects.select_related("user")[:limit])
+
+        pending = list(
+            RequestMatch.objects.filter(accepted__isnull=True, request__status="open")
+            .select_related("donor__user").order_by("?")[:limit * 10]
+        )
+        self._pending = pending
+        self._lock = threading.Lock()
+
+        if not (self.cities and self.donors and self.hospitals):
+            raise CommandError("No data to drive; run `manage.py seed` first.")
+
+    def next_pending(self):
+        with self._lock:
+            return self._pending.pop() if self._pending else None
+
+
+class Worker:
+    """
+    One thread. Scenarios return (user, method, path, data); logging in
+    happens once per user, outside the timed request.
+    """
+
+    def __init__(self, actors, make_session, rng):
+        self.actors = actors
+        self.make_session = make_session
+        self.rng = rng
+        self.sessions = {}
+
+    def session(self, user=None):
+        key = user.pk if user else None
+        if key not in self.sessions:
+            session = self.make_session()
+            if user:
+                session.login(user)
+            self.sessions[key] = session
+        return self.sessions[key]
+
+    def search(self):
+        field = self.rng.choice(("blood_group", "city", "location", None))
+        params = {}
+        if field == "blood_group":
+            params = {"blood_group": self.rng.choice(BLOOD_GROUPS)}
+        elif field:
+            params = {field: self.rng.choice(self.actors.cities)}
+        return None, "get", reverse("donors:donors-page"), params
+
+    def inbox(self):
+        donor = self.rng.choice(self.actors.donors)
+        return donor.user, "get", reverse("donors:donor-matching-requests"), None
+
+    def file_request(self):
+        hospital = self.rng.choice(self.actors.hospitals)
+        return (
+            hospital.user, "post", reverse("hospital:create-blood-request"),
+            {"blood_group": self.rng.choice(BLOOD_GROUPS), "units_required": 1},
+        )
+
+    def accept(self):
+        match = self.actors.next_pending()
+        if match is None:
+            return self.inbox()
+        return (
+            match.donor.user, "get",
+            reverse("donors:respond-request", args=[match.id, "accept"]), None,
+        )
+
+
+# ==================================================
+# COMMAND
+# ==================================================
+class Command(BaseCommand):
+    help = (
+        "Replay a realistic concurrent traffic mix (searches, inbox polling, "
+        "hospitals filing requests, donors accepting) in-process or against "
+        "a running server, and report throughput, latency and lock errors. "
+        "Requests are real writes: point it at a seeded scratch database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=1000)
+        parser.add_argument("--concurrency", type=int, default=20)
+        parser.add_argument("--mix", default=DEFAULT_MIX, help=f"default: {DEFAULT_MIX}")
+        parser.add_argument(
+            "--base-url",
+            help="Drive a running server (e.g. http://127.0.0.1:8000) instead of in-process",
+        )
+        parser.add_argument(
+            "--password",
+            default=SEED_PASSWORD,
+            help="Password of the seeded accounts (--base-url only)",
+        )
+        parser.add_argument("--actors", type=int, default=200, help="Users per role")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--output", help="Write the JSON report to this file")
+
+    def handle(self, *args, **options):
+        try:
+            mix = {
+                name: int(weight)
+                for name, weight in (part.split("=") for part in options["mix"].split(","))
+            }
+        except ValueError:
+            raise CommandError(f"Bad --mix {options['mix']!r}")
+        unknown = set(mix) - {"search", "inbox", "file_request", "accept"}
+        if unknown:
+            raise CommandError(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+        actors = Actors(options["actors"])
+
+        if options["base_url"]:
+            make_session = lambda: HttpSession(  # noqa: E731
+                options["base_url"], options["password"]
+            )
+        else:
+            ensure_test_environment()
+            make_session = ClientSession
+
+        plan = random.Random(options["seed"]).choices(
+            list(mix), weights=list(mix.values()), k=options["requests"]
+        )
+        report = self.run(plan, actors, make_session, options)
+        report["target"] = options["base_url"] or "in-process"
+
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as fh:
+                fh.write(output + "\n")
+        self.stdout.write(output)
+
+    def run(self, plan, actors, make_session, options):
+        latencies = defaultdict(list)
+        statuses = defaultdict(Counter)
+        failures = Counter()
+        lock = threading.Lock()
+        position = iter(range(len(plan)))
+
+        def work(worker_index):
+            worker = Worker(actors, make_session, random.Random(options["seed"] + worker_index))
+            try:
+                while True:
+                    with lock:
+                        index = next(position, None)
+                    if index is None:
+                        return
+
+                    scenario = plan[index]
+                    user, method, path, data = getattr(worker, scenario)()
+                    elapsed = 0.0
+                    try:
+                        session = worker.session(user)
+                        started = time.perf_counter()
+                        try:
+                            status = session.request(method, path, data)
+                        finally:
+                            elapsed = time.perf_counter() - started
+                    except Exception as exc:  # noqa: BLE001 - counted, not fatal
+                        status = classify(exc)
+
+                    with lock:
+                        latencies[scenario].append(elapsed)
+                        statuses[scenario][str(status)] += 1
+                        if not isinstance(status, int) or status >= 500:
+                            failures[str(status)] += 1
+            finally:
+                connection.close()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as pool:
+            list(pool.map(work, range(options["concurrency"])))
+        elapsed = time.perf_counter() - started
+
+        everything = [value for values in latencies.values() for value in values]
+        return {
+            "requests": len(everything),
+            "concurrency": options["concurrency"],
+            "seconds": round(elapsed, 3),
+            "throughput_rps": round(len(everything) / elapsed, 1) if elapsed else 0.0,
+            **latency_summary(everything),
+            "sqlite_locked": failures["sqlite_locked"],
+            "failures": dict(failures),
+            "scenarios": {
+                scenario: {
+                    "requests": len(values),
+                    **latency_summary(values),
+                    "statuses": dict(statuses[scenario]),
+                }
+                for scenario, values in latencies.items()
+            },
+        }
@@ -0,0 +1,41 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from obdms import scheduler
+from obdms.jobs import jobs
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the periodic jobs in SCHEDULED_JOBS (request expiry, ...) as "
+        "they fall due. --once suits cron; --job runs one job right away."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Run due jobs, then exit")
+        parser.add_argument("--job", help="Run this job now, whether due or not")
+        parser.add_argument("--tick", type=float, default=5.0, help="Seconds between checks")
+
+    def handle(self, *args, **options):
+        if options["job"]:
+            if options["job"] not in settings.SCHEDULED_JOBS:
+                raise CommandError(
+                    f"Unknown job; choose from {', '.join(settings.SCHEDULED_JOBS)}."
+                )
+            self.report({options["job"]: scheduler.run_job(options["job"])})
+            jobs.join()
+            return
+
+        while True:
+            self.report(scheduler.run_due())
+            if options["once"]:
+                # Let queued notifications go out before exiting
+                jobs.join()
+                return
+            time.sleep(options["tick"])
+
+    def report(self, results):
+        for name, result in results.items():
+            self.stdout.write(f"{name}: {result!r}")
@@ -0,0 +1,62 @@
+import os
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from obdms.routers import mark_synced
+
+
+class Command(BaseCommand):
+    help = (
+        "Refresh the local read replica (REPLICA_SQLITE_PATH) from the primary "
+        "with SQLite's online backup, once or every --interval seconds. "
+        "Needs a cache shared with the web processes (CACHE_BACKEND=file) "
+        "for them to start reading it."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            help=f"Keep syncing (e.g. {settings.REPLICA_SYNC_INTERVAL}); default: once",
+        )
+
+    def handle(self, *args, **options):
+        path = settings.REPLICA_SQLITE_PATH
+        if not path:
+            raise CommandError("Set REPLICA_SQLITE_PATH to enable the replica.")
+
+        source = sqlite3.connect(connections["default"].settings_dict["NAME"])
+        last_version = None
+        try:
+            while True:
+                started = time.time()
+                # data_version changes whenever another connection commits
+                version = source.execute("PRAGMA data_version").fetchone()[0]
+                if version != last_version or not os.path.exists(path):
+                    self.copy(source, path)
+                    last_version = version
+                    self.stdout.write(
+                        f"Replica synced in {time.time() - started:.2f}s"
+                    )
+                mark_synced(started)
+
+                if not options["interval"]:
+                    return
+                time.sleep(options["interval"])
+        finally:
+            source.close()
+
+    def copy(self, source, path):
+        tmp = f"{path}.tmp"
+        target = sqlite3.connect(tmp)
+        try:
+            source.backup(target)
+            # Readers open it read-only: it must not need a -wal file
+            target.execute("PRAGMA journal_mode=DELETE")
+        finally:
+            target.close()
+        os.replace(tmp, path)
@@ -23,3 +23,42 @@ class UserRole(models.Model):
 
     def __str__(self):
         return f"{self.user.username} - {self.role}"
+
+
+class IdempotencyKey(models.Model):
+    """
+    Claimed idempotency keys (obdms.idempotency). A table rather than the
+    cache so every worker process sees the same claims.
+    """
+
+    key = models.CharField(max_length=255, unique=True)
+    location = models.CharField(max_length=500, blank=True)  # blank while pending
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Purging expired keys (obdms.idempotency.purge_expired_keys)
+            models.Index(fields=["created_at"], name="idempotency_created_idx"),
+        ]
+
+    def __str__(self):
+        return self.key
+
+
+class ScheduledJobRun(models.Model):
+    """
+    One row per (job, interval slot) claimed by obdms.scheduler. The
+    unique constraint is what keeps two schedulers from both running it.
+    """
+
+    job = models.CharField(max_length=100)
+    slot = models.BigIntegerField()  # unix time // interval
+    started_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["job", "slot"], name="unique_job_run_slot"),
+        ]
+
+    def __str__(self):
+        return f"{self.job} #{self.slot}"
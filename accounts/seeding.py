@@ -0,0 +1,277 @@
+"""
+Deterministic synthetic data for scale testing.
+
+The same --seed always produces the same donors, hospitals, requests,
+matches and donations (timestamps are offsets from the run time).
+Everything is written with bulk_create in batches, so model save()
+validation and signals are skipped on purpose.
+"""
+
+import random
+from datetime import date, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+
+from blood_requests.models import BloodRequest, RequestMatch
+from blood_requests.services import BLOOD_COMPATIBILITY
+from donors.models import Donor, DonorDonation
+from hospitals.models import Hospital
+from analytics import rollups
+from obdms.caching import bump_version
+
+
+SEED_PASSWORD = "obdms-seed-pass"
+SEED_EMAIL_DOMAIN = "seed.obdms.test"
+
+# Approximate distribution in India
+BLOOD_GROUP_WEIGHTS = {
+    "O+": 36.5, "B+": 32.1, "A+": 22.9, "AB+": 6.4,
+    "O-": 0.9, "B-": 0.6, "A-": 0.4, "AB-": 0.2,
+}
+
+# (city, state); earlier cities get far more donors (Zipf-like skew)
+CITIES = [
+    ("Mumbai", "Maharashtra"), ("Delhi", "Delhi"), ("Bengaluru", "Karnataka"),
+    ("Hyderabad", "Telangana"), ("Ahmedabad", "Gujarat"), ("Chennai", "Tamil Nadu"),
+    ("Kolkata", "West Bengal"), ("Pune", "Maharashtra"), ("Jaipur", "Rajasthan"),
+    ("Lucknow", "Uttar Pradesh"), ("Kanpur", "Uttar Pradesh"), ("Nagpur", "Maharashtra"),
+    ("Indore", "Madhya Pradesh"), ("Bhopal", "Madhya Pradesh"), ("Patna", "Bihar"),
+    ("Vadodara", "Gujarat"), ("Ludhiana", "Punjab"), ("Agra", "Uttar Pradesh"),
+    ("Nashik", "Maharashtra"), ("Ranchi", "Jharkhand"), ("Gaya", "Bihar"),
+    ("Varanasi", "Uttar Pradesh"), ("Guwahati", "Assam"), ("Kochi", "Kerala"),
+]
+CITY_WEIGHTS = [1 / (rank + 1) for rank in range(len(CITIES))]
+
+REQUEST_STATUS_WEIGHTS = {
+    "open": 35, "matched": 15, "fulfilled": 40, "cancelled": 10,
+}
+
+FIRST_NAMES = [
+    "Aarav", "Vivaan", "Aditya", "Rohan", "Arjun", "Rahul", "Amit", "Vikram",
+    "Ananya", "Diya", "Priya", "Sneha", "Pooja", "Kavya", "Neha", "Isha",
+    "Rajan", "Mukesh", "Awdhesh", "Prabhakar", "Sita", "Gita", "Ravi", "Suresh",
+]
+LAST_NAMES = [
+    "Kumar", "Sharma", "Singh", "Verma", "Gupta", "Das", "Patel", "Yadav",
+    "Reddy", "Nair", "Iyer", "Gautam", "Mishra", "Jha", "Khan", "Bose",
+]
+
+
+def _weighted(rng, weights):
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+
+def _sample_candidates(rng, groups, k):
+    """
+    Sample k items across several lists without concatenating them
+    (a big city's compatible pool can hold hundreds of thousands of ids).
+    """
+    total = sum(len(group) for group in groups)
+    picked = []
+
+    for index in rng.sample(range(total), min(k, total)):
+        for group in groups:
+            if index < len(group):
+                picked.append(group[index])
+                break
+            index -= len(group)
+
+    return picked
+
+
+def _bulk(model, objs, batch_size):
+    with transaction.atomic():
+        return model.objects.bulk_create(objs, batch_size=batch_size)
+
+
+# ==================================================
+# GENERATOR
+# ==================================================
+def seed_database(
+    donors=1000,
+    hospitals=None,
+    requests=None,
+    matches_per_request=20,
+    seed=42,
+    batch_size=5000,
+    log=None,
+):
+    """
+    Generate the dataset and return a dict of row counts.
+    """
+    rng = random.Random(seed)
+    log = log or (lambda message: None)
+    now = timezone.now()
+
+    hospitals = hospitals if hospitals is not None else max(1, donors // 200)
+    requests = requests if requests is not None else max(1, donors // 20)
+
+    # One hash for everyone: hashing per user would dominate the run
+    password = make_password(SEED_PASSWORD)
+
+    # ---------- donors ----------
+    city_donors = {}  # (city, blood_group) -> [(donor_id, user_id)]
+    for start in range(0, donors, batch_size):
+        size = min(batch_size, donors - start)
+
+        users = _bulk(User, [
+            User(
+                username=f"donor{start + i}@{SEED_EMAIL_DOMAIN}",
+                email=f"donor{start + i}@{SEED_EMAIL_DOMAIN}",
+                password=password,
+            )
+            for i in range(size)
+        ], batch_size)
+
+        rows = []
+        for user in users:
+            city, state = rng.choices(CITIES, weights=CITY_WEIGHTS)[0]
+            rows.append(Donor(
+                user=user,
+                first_name=rng.choice(FIRST_NAMES),
+                last_name=rng.choice(LAST_NAMES),
+                date_of_birth=date(1960, 1, 1) + timedelta(days=rng.randrange(365 * 45)),
+                gender=rng.choice(("male", "male", "female", "other")),
+                marital_status=rng.choice(("married", "unmarried")),
+                blood_group=_weighted(rng, BLOOD_GROUP_WEIGHTS),
+                phone=f"9{rng.randrange(10 ** 9):09d}",
+                aadhaar_last4=f"{rng.randrange(10 ** 4):04d}",
+                address=f"{rng.randrange(1, 500)} Main Road",
+                state=state,
+                city=city,
+                pincode=f"{rng.randrange(110000, 860000)}",
+                status="active" if rng.random() < 0.9 else "inactive",
+            ))
+
+        for donor in _bulk(Donor, rows, batch_size):
+            if donor.status == "active":
+                city_donors.setdefault((donor.city, donor.blood_group), []).append(
+                    (donor.id, donor.user_id)
+                )
+        log(f"donors: {start + size}/{donors}")
+
+    # ---------- hospitals ----------
+    users = _bulk(User, [
+        User(
+            username=f"hospital{i}@{SEED_EMAIL_DOMAIN}",
+            email=f"hospital{i}@{SEED_EMAIL_DOMAIN}",
+            password=password,
+        )
+        for i in range(hospitals)
+    ], batch_size)
+
+    hospital_rows = []
+    for i, user in enumerate(users):
+        city, state = rng.choices(CITIES, weights=CITY_WEIGHTS)[0]
+        hospital_rows.append(Hospital(
+            user=user,
+            hospital_name=f"{city} {rng.choice(('City', 'General', 'Care', 'Life'))} Hospital {i}",
+            category=rng.choice(("government", "private", "trust", "clinic")),
+            contact_person=f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            phone=f"8{rng.randrange(10 ** 9):09d}",
+            address=f"{rng.randrange(1, 500)} Hospital Road",
+            state=state,
+            city=city,
+            licence_number=f"SEED-LIC-{seed}-{i:07d}",
+        ))
+    hospital_rows = _bulk(Hospital, hospital_rows, batch_size)
+    log(f"hospitals: {hospitals}")
+
+    # ---------- requests, matches, donations ----------
+    totals = {"matches": 0, "donations": 0}
+
+    for start in range(0, requests, batch_size):
+        size = min(batch_size, requests - start)
+
+        rows = []
+        for _ in range(size):
+            hospital = rng.choice(hospital_rows)
+            rows.append(BloodRequest(
+                requested_by_id=hospital.user_id,
+                hospital=hospital,
+                blood_group=_weighted(rng, BLOOD_GROUP_WEIGHTS),
+                units_required=rng.choice((1, 1, 1, 2, 2, 3, 4)),
+                city=hospital.city,
+                contact_info=hospital.phone,
+                status=_weighted(rng, REQUEST_STATUS_WEIGHTS),
+            ))
+
+        with transaction.atomic():
+            rows = BloodRequest.objects.bulk_create(rows, batch_size=batch_size)
+
+            # auto_now_add ignores supplied values; spread creation over 180 days
+            for blood_request in rows:
+                blood_request.created_at = now - timedelta(minutes=rng.randrange(180 * 24 * 60))
+                blood_request.updated_at = blood_request.created_at
+            BloodRequest.objects.bulk_update(
+                rows, ["created_at", "updated_at"], batch_size=1000
+            )
+
+        match_rows = []
+        donation_rows = []
+        for blood_request in rows:
+            groups = [
+                city_donors.get((blood_request.city, group), [])
+                for group in BLOOD_COMPATIBILITY[blood_request.blood_group]
+            ]
+            chosen = [
+                candidate
+                for candidate in _sample_candidates(rng, groups, matches_per_request)
+                if candidate[1] != blood_request.requested_by_id
+            ]
+
+            accepted_donor = None
+            if chosen and blood_request.status in ("matched", "fulfilled"):
+                accepted_donor = chosen[0][0]
+
+            for donor_id, _ in chosen:
+                if donor_id == accepted_donor:
+                    accepted = True
+                elif blood_request.status == "open":
+                    accepted = None if rng.random() < 0.8 else False
+                else:
+                    accepted = rng.choice((None, False))
+
+                match_rows.append(RequestMatch(
+                    request=blood_request,
+                    donor_id=donor_id,
+                    notified=True,
+                    accepted=accepted,
+                    responded_at=None if accepted is None else now,
+                ))
+
+            if accepted_donor and blood_request.status == "fulfilled":
+                donation_rows.append(DonorDonation(
+                    donor_id=accepted_donor,
+                    request=blood_request,
+                    units_donated=blood_request.units_required,
+                ))
+
+        _bulk(RequestMatch, match_rows, batch_size)
+        _bulk(DonorDonation, donation_rows, batch_size)
+        totals["matches"] += len(match_rows)
+        totals["donations"] += len(donation_rows)
+        log(f"requests: {start + size}/{requests}")
+
+    # bulk_create sends no signals
+    bump_version("donors")
+    bump_version("hospitals")
+    rollups.rebuild()
+
+    return {
+        "donors": donors,
+        "hospitals": hospitals,
+        "requests": requests,
+        **totals,
+    }
+
+
+def clear_seed_data():
+    """Delete every seeded account (cascades to all seeded rows)."""
+    deleted, _ = User.objects.filter(username__endswith=f"@{SEED_EMAIL_DOMAIN}").delete()
+    bump_version("donors")
+    bump_version("hospitals")
+    return deleted
@@ -1,3 +1,73 @@
-from django.test import TestCase
+import os
+import tempfile
+import threading
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from obdms import metrics, scheduler
+from obdms.query_budgets import QueryBudgetMixin
+from . import urls
+from .models import ScheduledJobRun
+
+
+class MetricsStoreTests(SimpleTestCase):
+    def test_concurrent_increments_are_not_lost(self):
+        with tempfile.TemporaryDirectory() as tmp, \
+                override_settings(METRICS_SQLITE_PATH=os.path.join(tmp, "m.sqlite3")):
+
+            def work():
+                for _ in range(200):
+                    metrics.inc("obdms_matches_created_total", 2)
+
+            threads = [threading.Thread(target=work) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            self.assertEqual(metrics.counter_values("obdms_matches_created_total"), [({}, 1600)])
+            self.assertIn("obdms_matches_created_total 1600", metrics.render())
+
+
+@override_settings(SCHEDULED_JOBS={"tick": ("time.time", 3600)})
+class SchedulerClaimTests(TestCase):
+    def test_job_runs_once_per_slot_across_schedulers(self):
+        self.assertEqual(list(scheduler.run_due()), ["tick"])
+        # Another scheduler process: its own cache, the same database
+        cache.clear()
+        self.assertEqual(scheduler.run_due(), {})
+
+        # The next slot is free again; older claims are dropped
+        ScheduledJobRun.objects.update(slot=0)
+        self.assertEqual(list(scheduler.run_due()), ["tick"])
+        self.assertEqual(ScheduledJobRun.objects.count(), 1)
+
+
+class AccountViewQueryBudgetTests(QueryBudgetMixin, TestCase):
+    URLS = urls
+
+    BUDGETS = {
+        "home": 0,
+        "metrics": 4,
+        "login": 0,
+        "logout": 4,
+        "dashboard": 3,
+        "cache-stats": 2,
+        "change-password": 4,
+        "change-password-done": 4,
+    }
+
+    def calls(self, fx):
+        donor = fx.donor_user
+        return {
+            "home": (None, "get", reverse("home"), None),
+            "metrics": (fx.staff, "get", reverse("metrics"), None),
+            "login": (None, "get", reverse("login"), None),
+            "logout": (donor, "get", reverse("logout"), None),
+            "dashboard": (donor, "get", reverse("dashboard"), None),
+            "cache-stats": (fx.staff, "get", reverse("cache-stats"), None),
+            "change-password": (donor, "get", reverse("change-password"), None),
+            "change-password-done": (donor, "get", reverse("change-password-done"), None),
+        }
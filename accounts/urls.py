@@ -1,11 +1,12 @@
 from django.urls import path, reverse_lazy
 from django.contrib.auth import views as auth_views
-from .views import login_view, logout_view, dashboard
+from .views import login_view, logout_view, dashboard, cache_stats_view
 
 urlpatterns = [
     path("login/", login_view, name="login"),
     path("logout/", logout_view, name="logout"),
     path("dashboard/", dashboard, name="dashboard"),
+    path("cache-stats/", cache_stats_view, name="cache-stats"),
 
     # Password change
     path(
@@ -3,12 +3,22 @@ from django.shortcuts import render
 # Create your views here.
 from django.shortcuts import render, redirect
 from django.contrib.auth import authenticate, login, logout
-from django.contrib.auth.decorators import login_required
+from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
 from django.contrib.auth.models import User
-
+from django.conf import settings
+from django.db.models import Count, Min
+from django.http import HttpResponse, JsonResponse
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+
+from analytics import ops
+from blood_requests.models import BloodRequest, RequestMatch
 from donors.models import Donor
 from hospitals.models import Hospital
+from obdms import metrics
+from obdms.caching import cache_stats
+from obdms.routers import replica_reads
 
 
 # ==============================
@@ -65,7 +75,73 @@ def dashboard(request):
     if hospital:
         return redirect("hospital:hospital-dashboard")
 
-    if user.is_superuser:
-        return render(request, "admin/dashboard.html", {"user_obj": user})
+    if user.is_staff or user.is_superuser:
+        return render(request, "admin/dashboard.html", {
+            "user_obj": user,
+            "snapshot": ops.get_snapshot(),
+        })
 
     return render(request, "home.html", {"user_obj": user})
+
+
+# ==============================
+# Cache hit rates (staff only)
+# ==============================
+@user_passes_test(lambda u: u.is_active and u.is_staff)
+def cache_stats_view(request):
+    return JsonResponse(cache_stats())
+
+
+# ==============================
+# Prometheus metrics
+# ==============================
+def _metrics_allowed(request):
+    token = settings.METRICS_TOKEN
+    if token:
+        header = request.headers.get("Authorization", "")
+        if constant_time_compare(header, f"Bearer {token}"):
+            return True
+
+    user = request.user
+    if user.is_active and user.is_staff:
+        return True
+
+    # No token configured: open in development only
+    return not token and settings.DEBUG
+
+
+@replica_reads
+def metrics_view(request):
+    if not _metrics_allowed(request):
+        return HttpResponse(status=403)
+
+    open_requests = BloodRequest.objects.filter(status="open").aggregate(
+        count=Count("id"),
+        oldest=Min("created_at"),
+    )
+    oldest = open_requests["oldest"]
+
+    gauges = [
+        (
+            "obdms_open_requests",
+            "Blood requests waiting for a donor",
+            open_requests["count"],
+        ),
+        (
+            "obdms_oldest_open_request_age_seconds",
+            "Age of the oldest open blood request",
+            round((timezone.now() - oldest).total_seconds(), 3) if oldest else 0,
+        ),
+        (
+            "obdms_pending_donor_responses",
+            "Matches on open requests the donor hasn't answered (queue depth)",
+            RequestMatch.objects.filter(
+                accepted__isnull=True, request__status="open"
+            ).count(),
+        ),
+    ]
+
+    return HttpResponse(
+        metrics.render(gauges),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
@@ -0,0 +1,37 @@
+from django.contrib import admin
+
+from .models import CityBloodGroupStock, DailyRollup, OpsSnapshot
+
+
+# Maintained by analytics.rollups; read-only here
+class RollupAdmin(admin.ModelAdmin):
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(CityBloodGroupStock)
+class CityBloodGroupStockAdmin(RollupAdmin):
+    list_display = ("city", "blood_group", "active_donors", "open_requests", "open_units", "updated_at")
+    list_filter = ("blood_group",)
+    search_fields = ("city__exact",)
+    search_help_text = "Exact city (e.g. Mumbai)."
+
+
+@admin.register(DailyRollup)
+class DailyRollupAdmin(RollupAdmin):
+    list_display = (
+        "day", "city", "blood_group", "donors_registered", "requests_created",
+        "units_requested", "matches_created", "acceptances",
+    )
+    list_filter = ("blood_group",)
+    search_fields = ("city__exact",)
+    search_help_text = "Exact city (e.g. Mumbai)."
+    date_hierarchy = "day"
+
+
+@admin.register(OpsSnapshot)
+class OpsSnapshotAdmin(RollupAdmin):
+    list_display = ("computed_at",)
@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from analytics import ops
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the staff ops dashboard snapshot, once or every "
+        "--interval seconds (stored in the database for every worker)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--interval", type=float, help="Keep refreshing; default: once")
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.perf_counter()
+            ops.refresh()
+            self.stdout.write(f"Ops snapshot refreshed in {time.perf_counter() - started:.2f}s")
+
+            if not options["interval"]:
+                return
+            time.sleep(options["interval"])
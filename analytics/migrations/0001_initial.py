@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CityBloodGroupStock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('city', models.CharField(max_length=100)),
+                ('blood_group', models.CharField(choices=[('A+', 'A+'), ('A-', 'A-'), ('B+', 'B+'), ('B-', 'B-'), ('O+', 'O+'), ('O-', 'O-'), ('AB+', 'AB+'), ('AB-', 'AB-')], max_length=5)),
+                ('active_donors', models.IntegerField(default=0)),
+                ('open_requests', models.IntegerField(default=0)),
+                ('open_units', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['city', 'blood_group'],
+                'constraints': [models.UniqueConstraint(fields=('city', 'blood_group'), name='unique_stock_city_blood_group')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('city', models.CharField(max_length=100)),
+                ('blood_group', models.CharField(choices=[('A+', 'A+'), ('A-', 'A-'), ('B+', 'B+'), ('B-', 'B-'), ('O+', 'O+'), ('O-', 'O-'), ('AB+', 'AB+'), ('AB-', 'AB-')], max_length=5)),
+                ('day', models.DateField()),
+                ('donors_registered', models.IntegerField(default=0)),
+                ('requests_created', models.IntegerField(default=0)),
+                ('units_requested', models.IntegerField(default=0)),
+                ('matches_created', models.IntegerField(default=0)),
+                ('acceptances', models.IntegerField(default=0)),
+                ('accept_seconds', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-day', 'city', 'blood_group'],
+                'indexes': [models.Index(fields=['day'], name='analytics_d_day_f54fd0_idx')],
+                'constraints': [models.UniqueConstraint(fields=('city', 'blood_group', 'day'), name='unique_rollup_city_blood_group_day')],
+            },
+        ),
+    ]
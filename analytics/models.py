@@ -0,0 +1,94 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+from donors.models import BLOOD_GROUP_CHOICES
+
+
+# ==================================================
+# CURRENT SUPPLY / DEMAND PER CITY + BLOOD GROUP
+# ==================================================
+class CityBloodGroupStock(models.Model):
+    """
+    One row per (city, blood group): a few hundred rows answer
+    "where are we short" without touching Donor or BloodRequest.
+    """
+
+    city = models.CharField(max_length=100)
+    blood_group = models.CharField(max_length=5, choices=BLOOD_GROUP_CHOICES)
+
+    active_donors = models.IntegerField(default=0)
+    open_requests = models.IntegerField(default=0)
+    open_units = models.IntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["city", "blood_group"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["city", "blood_group"],
+                name="unique_stock_city_blood_group",
+            )
+        ]
+
+    @property
+    def shortfall(self):
+        """Units still needed beyond what the active donor pool covers."""
+        return max(self.open_units - self.active_donors, 0)
+
+    def __str__(self):
+        return f"{self.city} {self.blood_group}: {self.active_donors} donors / {self.open_units} units"
+
+
+# ==================================================
+# DAILY ACTIVITY PER CITY + BLOOD GROUP
+# ==================================================
+class DailyRollup(models.Model):
+    """Flows per day; never decremented, so archiving keeps history."""
+
+    city = models.CharField(max_length=100)
+    blood_group = models.CharField(max_length=5, choices=BLOOD_GROUP_CHOICES)
+    day = models.DateField()
+
+    donors_registered = models.IntegerField(default=0)
+    requests_created = models.IntegerField(default=0)
+    units_requested = models.IntegerField(default=0)
+    matches_created = models.IntegerField(default=0)
+    acceptances = models.IntegerField(default=0)
+    # Sum of match -> accept times; average = accept_seconds / acceptances
+    accept_seconds = models.BigIntegerField(default=0)
+
+    class Meta:
+        ordering = ["-day", "city", "blood_group"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["city", "blood_group", "day"],
+                name="unique_rollup_city_blood_group_day",
+            )
+        ]
+        indexes = [
+            models.Index(fields=["day"]),
+        ]
+
+    @property
+    def avg_accept_seconds(self):
+        return self.accept_seconds / self.acceptances if self.acceptances else None
+
+    def __str__(self):
+        return f"{self.day} {self.city} {self.blood_group}"
+
+
+# ==================================================
+# STAFF OPS DASHBOARD
+# ==================================================
+class OpsSnapshot(models.Model):
+    """
+    The latest figures for the staff dashboard (analytics.ops): one row,
+    written by the scheduler and read by every web worker.
+    """
+
+    computed_at = models.DateTimeField()
+    data = models.JSONField(encoder=DjangoJSONEncoder)
+
+    def __str__(self):
+        return f"Ops snapshot at {self.computed_at}"
@@ -0,0 +1,169 @@
+"""
+Aggregates behind the staff operations dashboard.
+
+compute() does the expensive part (status counts, backlog buckets, top
+hospitals) and refresh() stores the result as the one OpsSnapshot row.
+Table sizes come from MAX(pk) (obdms.admin_tools.estimated_count), supply
+from the rollup tables, and request figures from ranges on the
+(status, ...) indexes, so nothing counts a whole table row by row.
+
+Only the scheduler computes it (the "ops-dashboard" job, every
+OPS_SNAPSHOT_MAX_AGE seconds) or `manage.py refresh_ops_dashboard`.
+Page views just read the row, so every web worker sees the same snapshot
+whatever the cache backend.
+"""
+
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from blood_requests.models import BloodRequest, RequestMatch
+from donors.models import Donor, DonorDonation
+from hospitals.models import Hospital
+from obdms import metrics
+from obdms.admin_tools import estimated_count
+from obdms.routers import reading_replica
+from obdms.writes import retry_write
+from . import rollups
+from .models import CityBloodGroupStock, OpsSnapshot
+
+
+SNAPSHOT_ID = 1
+
+# (label, open for at most this long); the last bucket catches the rest
+BACKLOG_BUCKETS = (
+    ("< 1 hour", timedelta(hours=1)),
+    ("1-6 hours", timedelta(hours=6)),
+    ("6-24 hours", timedelta(days=1)),
+    ("1-3 days", timedelta(days=3)),
+    ("3-7 days", timedelta(days=7)),
+    ("> 7 days", None),
+)
+
+TOP_HOSPITALS_DAYS = 30
+
+
+# ==================================================
+# COMPUTING A SNAPSHOT
+# ==================================================
+def _backlog(now):
+    buckets = {}
+    newer_than = None
+    for index, (label, age) in enumerate(BACKLOG_BUCKETS):
+        condition = Q()
+        if age is not None:
+            condition &= Q(created_at__gt=now - age)
+        if newer_than is not None:
+            condition &= Q(created_at__lte=now - newer_than)
+        buckets[f"b{index}"] = Count("id", filter=condition)
+        newer_than = age
+
+    counts = BloodRequest.objects.filter(status="open").aggregate(**buckets)
+    return [
+        {"label": label, "count": counts[f"b{index}"]}
+        for index, (label, _) in enumerate(BACKLOG_BUCKETS)
+    ]
+
+
+def _email_failures():
+    failures = metrics.counter_values("obdms_emails_total")
+    return [
+        {"kind": labels["kind"], "count": value}
+        for labels, value in failures
+        if labels["result"] == "failed"
+    ]
+
+
+def _status_totals():
+    # One COUNT per status, each a range on a (status, ...) index,
+    # instead of a pass over the whole request table
+    totals = {
+        status: BloodRequest.objects.filter(status=status).count()
+        for status, _ in BloodRequest.STATUS_CHOICES
+    }
+    totals["total"] = sum(totals.values())
+    return totals
+
+
+def compute():
+    now = timezone.now()
+
+    requests = _status_totals()
+    supply = CityBloodGroupStock.objects.aggregate(
+        active_donors=Sum("active_donors"), open_units=Sum("open_units")
+    )
+
+    # Every status listed so the window is a created_at range per status
+    # on the (status, created_at) index, not a scan of all requests
+    top_hospitals = list(
+        BloodRequest.objects.filter(
+            status__in=[status for status, _ in BloodRequest.STATUS_CHOICES],
+            created_at__gte=now - timedelta(days=TOP_HOSPITALS_DAYS),
+            hospital__isnull=False,
+        )
+        .values("hospital__hospital_name", "hospital__city")
+        .annotate(requests=Count("id"), units=Sum("units_required"))
+        .order_by("-requests", "hospital__hospital_name")[:10]
+    )
+
+    return {
+        "computed_at": now,
+        "totals": {
+            "users": estimated_count(User),
+            "donors": estimated_count(Donor),
+            "active_donors": supply["active_donors"] or 0,
+            "hospitals": estimated_count(Hospital),
+            "requests": requests,
+            "open_units": supply["open_units"] or 0,
+            "matches": estimated_count(RequestMatch),
+            "donations": estimated_count(DonorDonation),
+        },
+        "backlog": _backlog(now),
+        "shortages": [
+            {
+                "city": row.city,
+                "blood_group": row.blood_group,
+                "active_donors": row.active_donors,
+                "open_units": row.open_units,
+                "gap": row.gap,
+            }
+            for row in rollups.shortages(limit=15)
+        ],
+        "email_failures": _email_failures(),
+        "top_hospitals": top_hospitals,
+        "top_hospitals_days": TOP_HOSPITALS_DAYS,
+    }
+
+
+@retry_write
+def _save(snapshot):
+    data = {key: value for key, value in snapshot.items() if key != "computed_at"}
+    OpsSnapshot.objects.update_or_create(
+        pk=SNAPSHOT_ID,
+        defaults={"computed_at": snapshot["computed_at"], "data": data},
+    )
+
+
+def refresh():
+    with reading_replica():
+        snapshot = compute()
+    _save(snapshot)
+    return snapshot
+
+
+def refresh_job():
+    """Scheduler job; returns when the snapshot was computed."""
+    return refresh()["computed_at"]
+
+
+# ==================================================
+# READING IT FROM A VIEW
+# ==================================================
+def get_snapshot():
+    """The stored snapshot, or None before the scheduler first ran."""
+    row = OpsSnapshot.objects.filter(pk=SNAPSHOT_ID).first()
+    if row is None:
+        return None
+    return {**row.data, "computed_at": row.computed_at}
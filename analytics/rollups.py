@@ -0,0 +1,270 @@
+"""
+Incremental maintenance of the supply/demand rollups.
+
+Model signals (analytics.signals) turn each change into deltas keyed by
+(city, blood group[, day]). Deltas are applied after commit through
+obdms.writes.defer: a rolled-back write never counts, and with
+DEFER_LOW_PRIORITY_WRITES on a burst of events collapses into a few
+UPDATEs on the background writer.
+
+bulk_create paths (matching, seeding, imports) record their own deltas;
+rebuild() recomputes everything from the source and archive tables.
+"""
+
+from collections import Counter, defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Exists, F, OuterRef, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from blood_requests.models import (
+    ArchivedBloodRequest,
+    ArchivedRequestMatch,
+    BloodRequest,
+    RequestMatch,
+)
+from donors.models import Donor
+from obdms.writes import defer, retry_write
+from .models import CityBloodGroupStock, DailyRollup
+
+
+STOCK = "stock"
+DAILY = "daily"
+
+
+def normalize(city, blood_group):
+    # Same normalisation match_and_notify matches on
+    return (city or "").strip().title(), (blood_group or "").strip().upper()
+
+
+def _stock(city, blood_group, **changes):
+    return (STOCK, *normalize(city, blood_group), None), changes
+
+
+def _daily(city, blood_group, when, **changes):
+    day = timezone.localdate(when) if when else timezone.localdate()
+    return (DAILY, *normalize(city, blood_group), day), changes
+
+
+# ==================================================
+# APPLYING DELTAS
+# ==================================================
+def record(deltas):
+    deltas = [delta for delta in deltas if any(delta[1].values())]
+    if deltas:
+        transaction.on_commit(lambda: defer(apply_deltas, deltas))
+
+
+def apply_deltas(deltas):
+    """Sum deltas per row, then one UPDATE (or INSERT) per row."""
+    totals = defaultdict(Counter)
+    for key, changes in deltas:
+        totals[key].update(changes)
+
+    for (table, city, blood_group, day), changes in totals.items():
+        changes = {field: amount for field, amount in changes.items() if amount}
+        if not changes:
+            continue
+
+        lookup = {"city": city, "blood_group": blood_group}
+        updates = {field: F(field) + amount for field, amount in changes.items()}
+        if table == DAILY:
+            model = DailyRollup
+            lookup["day"] = day
+        else:
+            model = CityBloodGroupStock
+            updates["updated_at"] = timezone.now()
+
+        rows = model.objects.filter(**lookup)
+        if rows.update(**updates):
+            continue
+        try:
+            with transaction.atomic():
+                model.objects.create(**lookup, **changes)
+        except IntegrityError:
+            # Another writer created the row first
+            rows.update(**updates)
+
+
+# ==================================================
+# EVENTS
+# ==================================================
+def _donor_stock(donor, sign):
+    if donor["status"] != "active":
+        return []
+    return [_stock(donor["city"], donor["blood_group"], active_donors=sign)]
+
+
+def _request_stock(blood_request, sign):
+    if blood_request["status"] != "open":
+        return []
+    return [_stock(
+        blood_request["city"], blood_request["blood_group"],
+        open_requests=sign, open_units=sign * blood_request["units_required"],
+    )]
+
+
+def donors_added(donors):
+    """Donor rows created (one by one or with bulk_create)."""
+    deltas = []
+    for donor in donors:
+        deltas.append(_daily(donor.city, donor.blood_group, donor.created_at, donors_registered=1))
+        deltas += _donor_stock(vars(donor), 1)
+    record(deltas)
+
+
+def donors_deactivated(donors):
+    """Call before a bulk .update(status="inactive"), which sends no signals."""
+    record([
+        _stock(city, blood_group, active_donors=-n)
+        for city, blood_group, n in _grouped(
+            donors.filter(status="active"), "city", "blood_group", n=Count("id")
+        )
+    ])
+
+
+def donor_changed(previous, current):
+    """previous/current: dicts of city, blood_group, status (None = absent)."""
+    record(
+        (_donor_stock(previous, -1) if previous else [])
+        + (_donor_stock(current, 1) if current else [])
+    )
+
+
+def request_created(blood_request):
+    record([
+        _daily(
+            blood_request.city, blood_request.blood_group, blood_request.created_at,
+            requests_created=1, units_requested=blood_request.units_required,
+        ),
+        *_request_stock(vars(blood_request), 1),
+    ])
+
+
+def request_changed(previous, current):
+    """previous/current: dicts of city, blood_group, status, units_required."""
+    record(
+        (_request_stock(previous, -1) if previous else [])
+        + (_request_stock(current, 1) if current else [])
+    )
+
+
+def requests_closed(rows):
+    """
+    Call before a bulk .update() that closes requests (no signals);
+    rows: dicts of city, blood_group, status, units_required.
+    """
+    record([delta for row in rows for delta in _request_stock(row, -1)])
+
+
+def matches_created(blood_request, count, when=None):
+    record([_daily(blood_request.city, blood_request.blood_group, when, matches_created=count)])
+
+
+def match_accepted(match):
+    blood_request = match.request
+    responded_at = match.responded_at or timezone.now()
+    record([_daily(
+        blood_request.city, blood_request.blood_group, responded_at,
+        acceptances=1,
+        accept_seconds=int((responded_at - match.created_at).total_seconds()),
+    )])
+
+
+# ==================================================
+# REBUILD
+# ==================================================
+def _grouped(qs, city, blood_group, *extra, **aggregates):
+    return (
+        qs.order_by()
+        .values(city, blood_group, *extra)
+        .annotate(**aggregates)
+        .values_list(city, blood_group, *extra, *aggregates)
+    )
+
+
+def rebuild():
+    """Recompute both tables from scratch. Returns (stock rows, daily rows)."""
+    stock = defaultdict(Counter)
+    daily = defaultdict(Counter)
+    day = TruncDate("created_at")
+
+    for city, blood_group, n in _grouped(
+        Donor.objects.filter(status="active"), "city", "blood_group", n=Count("id")
+    ):
+        stock[normalize(city, blood_group)]["active_donors"] += n
+
+    for city, blood_group, n, units in _grouped(
+        BloodRequest.objects.filter(status="open"), "city", "blood_group",
+        n=Count("id"), units=Sum("units_required"),
+    ):
+        stock[normalize(city, blood_group)].update(open_requests=n, open_units=units)
+
+    for city, blood_group, created, n in _grouped(
+        Donor.objects.annotate(created=day), "city", "blood_group", "created", n=Count("id")
+    ):
+        daily[(*normalize(city, blood_group), created)]["donors_registered"] += n
+
+    # A closed request with donations stays hot after archiving and also
+    # has an archived copy (its archived matches join to it): count it once
+    still_hot = Exists(BloodRequest.objects.filter(pk=OuterRef("pk")))
+
+    for requests, matches in (
+        (BloodRequest.objects.all(), RequestMatch.objects.all()),
+        (ArchivedBloodRequest.objects.exclude(still_hot), ArchivedRequestMatch.objects.all()),
+    ):
+        for city, blood_group, created, n, units in _grouped(
+            requests.annotate(created=day), "city", "blood_group", "created",
+            n=Count("id"), units=Sum("units_required"),
+        ):
+            daily[(*normalize(city, blood_group), created)].update(
+                requests_created=n, units_requested=units,
+            )
+
+        for city, blood_group, created, n in _grouped(
+            matches.annotate(created=day),
+            "request__city", "request__blood_group", "created", n=Count("id"),
+        ):
+            daily[(*normalize(city, blood_group), created)]["matches_created"] += n
+
+        accepted = matches.filter(
+            accepted=True, responded_at__isnull=False
+        ).values_list("request__city", "request__blood_group", "created_at", "responded_at")
+        for city, blood_group, created_at, responded_at in accepted.iterator(chunk_size=2000):
+            daily[(*normalize(city, blood_group), timezone.localdate(responded_at))].update(
+                acceptances=1,
+                accept_seconds=int((responded_at - created_at).total_seconds()),
+            )
+
+    stock_rows = [
+        CityBloodGroupStock(city=city, blood_group=blood_group, **counts)
+        for (city, blood_group), counts in stock.items()
+    ]
+    daily_rows = [
+        DailyRollup(city=city, blood_group=blood_group, day=day, **counts)
+        for (city, blood_group, day), counts in daily.items()
+    ]
+
+    @retry_write
+    def replace():
+        CityBloodGroupStock.objects.all().delete()
+        DailyRollup.objects.all().delete()
+        CityBloodGroupStock.objects.bulk_create(stock_rows, batch_size=1000)
+        DailyRollup.objects.bulk_create(daily_rows, batch_size=1000)
+
+    replace()
+    return len(stock_rows), len(daily_rows)
+
+
+# ==================================================
+# REPORTS
+# ==================================================
+def shortages(blood_group=None, limit=20):
+    """Cities where open demand exceeds the active donor pool the most."""
+    rows = CityBloodGroupStock.objects.filter(open_requests__gt=0)
+    if blood_group:
+        rows = rows.filter(blood_group=blood_group)
+    return rows.annotate(gap=F("open_units") - F("active_donors")).filter(
+        gap__gt=0
+    ).order_by("-gap", "city")[:limit]
@@ -0,0 +1,87 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from blood_requests.models import BloodRequest, RequestMatch
+from donors.models import Donor
+
+from . import rollups
+
+
+# Fields whose change moves a row between rollup keys
+TRACKED = {
+    Donor: ("city", "blood_group", "status"),
+    BloodRequest: ("city", "blood_group", "status", "units_required"),
+    RequestMatch: ("accepted",),
+}
+
+
+def _current(sender, instance):
+    return {field: getattr(instance, field) for field in TRACKED[sender]}
+
+
+# ==================================================
+# REMEMBER THE STORED ROW BEFORE AN UPDATE
+# ==================================================
+@receiver(pre_save, sender=Donor)
+@receiver(pre_save, sender=BloodRequest)
+@receiver(pre_save, sender=RequestMatch)
+def remember_previous(sender, instance, raw=False, update_fields=None, **kwargs):
+    instance._rollup_previous = None
+    if raw or instance._state.adding:
+        return
+
+    fields = TRACKED[sender]
+    if update_fields is not None and not set(update_fields) & set(fields):
+        return
+
+    instance._rollup_previous = (
+        sender.objects.filter(pk=instance.pk).values(*fields).first()
+    )
+
+
+# ==================================================
+# TURN SAVES / DELETES INTO DELTAS
+# ==================================================
+@receiver(post_save, sender=Donor)
+def donor_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        rollups.donors_added([instance])
+    elif instance._rollup_previous:
+        rollups.donor_changed(instance._rollup_previous, _current(sender, instance))
+
+
+@receiver(post_delete, sender=Donor)
+def donor_deleted(sender, instance, **kwargs):
+    rollups.donor_changed(_current(sender, instance), None)
+
+
+@receiver(post_save, sender=BloodRequest)
+def request_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        rollups.request_created(instance)
+    elif instance._rollup_previous:
+        rollups.request_changed(instance._rollup_previous, _current(sender, instance))
+
+
+@receiver(post_delete, sender=BloodRequest)
+def request_deleted(sender, instance, **kwargs):
+    rollups.request_changed(_current(sender, instance), None)
+
+
+@receiver(post_save, sender=RequestMatch)
+def match_saved(sender, instance, created, raw=False, **kwargs):
+    # bulk_create in match_and_notify records its own count
+    if raw:
+        return
+    if created:
+        rollups.matches_created(instance.request, 1, instance.created_at)
+    elif (
+        instance._rollup_previous
+        and instance._rollup_previous["accepted"] is None
+        and instance.accepted
+    ):
+        rollups.match_accepted(instance)
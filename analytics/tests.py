@@ -0,0 +1,143 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from blood_requests import archiving
+from blood_requests.models import ArchivedBloodRequest, BloodRequest
+from donors.models import Donor
+from obdms.query_budgets import CITY, build_fixture
+from . import ops, rollups
+from .models import CityBloodGroupStock, DailyRollup
+
+
+@override_settings(JOBS_RUN_INLINE=True)
+class RollupTests(TestCase):
+    def snapshot(self):
+        return (
+            sorted(CityBloodGroupStock.objects.values_list(
+                "city", "blood_group", "active_donors", "open_requests", "open_units",
+            )),
+            sorted(DailyRollup.objects.values_list(
+                "city", "blood_group", "day", "donors_registered", "requests_created",
+                "units_requested", "matches_created", "acceptances", "accept_seconds",
+            )),
+        )
+
+    def as_user(self, user):
+        client = Client()
+        client.force_login(user)
+        return client
+
+    def test_incremental_updates_match_a_rebuild(self):
+        fx = build_fixture(3)
+        rollups.rebuild()
+        requests_before = BloodRequest.objects.count()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.as_user(fx.requester).post(reverse("requests:create-request"), {
+                "blood_group": "O+", "units_required": 2, "city": CITY, "contact_info": "x",
+            })
+            donor = self.as_user(fx.donor_user)
+            donor.get(reverse("donors:respond-request", args=[fx.pending_match.id, "accept"]))
+            donor.get(reverse("donors:toggle-availability"))
+            self.as_user(fx.requester).get(
+                reverse("requests:cancel-request", args=[fx.requester_request.id])
+            )
+
+        self.assertEqual(BloodRequest.objects.count(), requests_before + 1)
+        incremental = self.snapshot()
+        rollups.rebuild()
+        self.assertEqual(incremental, self.snapshot())
+
+        stock = CityBloodGroupStock.objects.get(city=CITY, blood_group="O+")
+        self.assertEqual(stock.active_donors, 3)  # 4 donors, one toggled off
+        self.assertEqual(
+            sum(DailyRollup.objects.values_list("acceptances", flat=True)), 1
+        )
+
+    def test_rebuild_after_archiving_counts_each_request_once(self):
+        build_fixture(3)
+        rollups.rebuild()
+        before = self.snapshot()
+
+        cutoff = archiving.cutoff_for(-1)
+        archiving.archive_request_batch(
+            list(archiving.archivable_requests(cutoff).values_list("pk", flat=True))
+        )
+        # Fulfilled requests with donations are both hot and archived
+        self.assertTrue(ArchivedBloodRequest.objects.filter(
+            pk__in=BloodRequest.objects.values("pk")
+        ).exists())
+
+        rollups.rebuild()
+        self.assertEqual(self.snapshot(), before)
+
+    def test_shortages_rank_by_unmet_units(self):
+        CityBloodGroupStock.objects.create(
+            city="Patna", blood_group="O-", active_donors=1, open_requests=2, open_units=5
+        )
+        CityBloodGroupStock.objects.create(
+            city="Gaya", blood_group="O-", active_donors=0, open_requests=1, open_units=2
+        )
+        CityBloodGroupStock.objects.create(
+            city="Pune", blood_group="O-", active_donors=9, open_requests=1, open_units=2
+        )
+
+        self.assertEqual(
+            [(row.city, row.gap) for row in rollups.shortages("O-")],
+            [("Patna", 4), ("Gaya", 2)],
+        )
+
+
+class OpsDashboardTests(TestCase):
+    def setUp(self):
+        self.fx = build_fixture(2)
+        rollups.rebuild()
+
+    def test_snapshot_totals(self):
+        with CaptureQueriesContext(connection) as queries:
+            snapshot = ops.refresh()
+
+        big_tables = (
+            "auth_user", "donors_donor", "hospitals_hospital", "blood_requests_bloodrequest",
+            "blood_requests_requestmatch", "donors_donordonation",
+        )
+        # Index ranges and MAX(pk) only: no pass over a whole table or index
+        scans = []
+        with connection.cursor() as cursor:
+            for query in queries:
+                cursor.execute(f"EXPLAIN QUERY PLAN {query['sql']}")
+                scans += [
+                    (query["sql"], row[3]) for row in cursor.fetchall()
+                    if any(row[3].startswith(f"SCAN {table}") for table in big_tables)
+                ]
+        self.assertFalse(scans)
+        self.assertEqual(snapshot["totals"]["donors"], Donor.objects.count())
+
+        open_requests = BloodRequest.objects.filter(status="open").count()
+        self.assertEqual(snapshot["totals"]["requests"]["open"], open_requests)
+        self.assertEqual(sum(bucket["count"] for bucket in snapshot["backlog"]), open_requests)
+        self.assertEqual(snapshot["top_hospitals"][0]["hospital__hospital_name"], "Budget Hospital 0")
+
+    def test_page_view_never_computes(self):
+        client = Client()
+        client.force_login(self.fx.staff)
+
+        self.assertContains(client.get(reverse("dashboard")), "No snapshot yet")
+        self.assertIsNone(ops.get_snapshot())
+
+    def test_staff_refresh_only_reads_the_snapshot(self):
+        ops.refresh()
+        # Computed in the scheduler process: nothing shared through the cache
+        cache.clear()
+        client = Client()
+        client.force_login(self.fx.staff)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(reverse("dashboard"))
+
+        self.assertContains(response, "Operations Dashboard")
+        self.assertContains(response, "Budget Hospital 0")
+        self.assertFalse([q["sql"] for q in queries if "COUNT(" in q["sql"]])
@@ -1,3 +1,67 @@
-from django.contrib import admin
+from django.contrib import admin, messages
 
-# Register your models here.
+from obdms.admin_tools import LargeTableAdmin
+from obdms.jobs import enqueue
+
+from . import services
+from .models import ArchivedBloodRequest, ArchivedRequestMatch, BloodRequest, RequestMatch
+
+
+@admin.register(BloodRequest)
+class BloodRequestAdmin(LargeTableAdmin):
+    list_display = (
+        "id", "blood_group", "units_required", "city", "status",
+        "hospital", "requested_by", "created_at",
+    )
+    list_filter = ("status", "blood_group")
+    list_select_related = ("hospital", "requested_by")
+    raw_id_fields = ("requested_by", "hospital")
+    search_fields = ("requested_by__username__exact", "hospital__licence_number__exact")
+    search_help_text = "Exact requester login email or hospital licence number."
+    actions = ["rematch", "resend_notifications"]
+
+    def _open_ids(self, queryset):
+        return list(queryset.filter(status="open").values_list("pk", flat=True))
+
+    @admin.action(description="Rematch selected open requests (background)")
+    def rematch(self, request, queryset):
+        ids = self._open_ids(queryset)
+        enqueue(services.rematch_requests, ids, request.build_absolute_uri("/"))
+        self.message_user(
+            request, f"Queued rematching of {len(ids)} open requests.", messages.SUCCESS
+        )
+
+    @admin.action(description="Resend match emails to donors who haven't answered (background)")
+    def resend_notifications(self, request, queryset):
+        ids = self._open_ids(queryset)
+        enqueue(services.resend_match_notifications, ids, request.build_absolute_uri("/"))
+        self.message_user(
+            request, f"Queued reminder emails for {len(ids)} open requests.", messages.SUCCESS
+        )
+
+
+@admin.register(RequestMatch)
+class RequestMatchAdmin(LargeTableAdmin):
+    list_display = ("id", "request", "donor", "notified", "accepted", "responded_at", "created_at")
+    list_filter = ("accepted", "notified")
+    list_select_related = ("request", "donor")
+    raw_id_fields = ("request", "donor")
+    search_fields = ("donor__user__username__exact",)
+    search_help_text = "Exact donor login email."
+
+
+@admin.register(ArchivedBloodRequest)
+class ArchivedBloodRequestAdmin(LargeTableAdmin):
+    list_display = ("id", "blood_group", "units_required", "city", "status", "created_at", "archived_at")
+    list_filter = ("status",)
+    raw_id_fields = ("requested_by", "hospital")
+    search_fields = ("requested_by__username__exact",)
+    search_help_text = "Exact requester login email."
+
+
+@admin.register(ArchivedRequestMatch)
+class ArchivedRequestMatchAdmin(LargeTableAdmin):
+    list_display = ("id", "request_id", "donor_id", "accepted", "created_at")
+    raw_id_fields = ("request", "donor")
+    search_fields = ("request__id__exact",)
+    search_help_text = "Exact archived request id."
@@ -0,0 +1,120 @@
+"""
+Moves closed requests, their matches and old read notifications out of
+the hot tables into the Archived* tables, one short transaction per batch.
+
+A closed request that has donations keeps its row (DonorDonation points
+at it, so donation history reads exactly as before); only its matches
+move. Everything else moves entirely.
+
+DonorNotification has no link to a request, so notifications are
+archived by age instead, and only once read: unread counts never change.
+"""
+
+from datetime import timedelta
+
+from django.db import connection
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from donors.models import ArchivedDonorNotification, DonorDonation, DonorNotification
+from obdms.writes import retry_write
+from .models import (
+    CLOSED_STATUSES,
+    ArchivedBloodRequest,
+    ArchivedRequestMatch,
+    BloodRequest,
+    RequestMatch,
+)
+
+
+# Rows per INSERT when copying matches
+COPY_BATCH_SIZE = 1000
+
+REQUEST_FIELDS = [
+    "id", "requested_by_id", "hospital_id", "blood_group", "units_required",
+    "city", "contact_info", "status", "created_at", "updated_at",
+]
+MATCH_FIELDS = [
+    "id", "request_id", "donor_id", "notified", "accepted", "responded_at", "created_at",
+]
+NOTIFICATION_FIELDS = ["id", "donor_id", "title", "message", "is_read", "created_at"]
+
+
+def cutoff_for(days):
+    return timezone.now() - timedelta(days=days)
+
+
+def _copy(model, rows):
+    # ignore_conflicts: a request kept for its donations may be copied again
+    model.objects.bulk_create(
+        (model(**row) for row in rows),
+        batch_size=COPY_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+# ==================================================
+# REQUESTS + MATCHES
+# ==================================================
+def archivable_requests(cutoff):
+    """
+    Closed before `cutoff` and still holding something to move.
+    A range on the (status, updated_at) index per closed status.
+    """
+    has_matches = Exists(RequestMatch.objects.filter(request=OuterRef("pk")))
+    has_donations = Exists(DonorDonation.objects.filter(request=OuterRef("pk")))
+
+    return (
+        BloodRequest.objects
+        .filter(status__in=CLOSED_STATUSES, updated_at__lt=cutoff)
+        .filter(has_matches | ~has_donations)
+        .order_by("pk")
+    )
+
+
+@retry_write
+def archive_request_batch(request_ids):
+    """Returns (requests removed from the hot table, matches moved)."""
+    requests = BloodRequest.objects.filter(pk__in=request_ids)
+    matches = RequestMatch.objects.filter(request_id__in=request_ids)
+
+    _copy(ArchivedBloodRequest, requests.values(*REQUEST_FIELDS))
+    _copy(
+        ArchivedRequestMatch,
+        matches.order_by("pk").values(*MATCH_FIELDS).iterator(chunk_size=COPY_BATCH_SIZE),
+    )
+
+    moved, _ = matches.delete()
+    removed, _ = requests.exclude(
+        Exists(DonorDonation.objects.filter(request=OuterRef("pk")))
+    ).delete()
+    return removed, moved
+
+
+# ==================================================
+# NOTIFICATIONS
+# ==================================================
+def archivable_notifications(cutoff):
+    return DonorNotification.objects.filter(
+        is_read=True, created_at__lt=cutoff
+    ).order_by("pk")
+
+
+@retry_write
+def archive_notification_batch(notification_ids):
+    notifications = DonorNotification.objects.filter(pk__in=notification_ids)
+    _copy(ArchivedDonorNotification, notifications.values(*NOTIFICATION_FIELDS))
+
+    # A plain DELETE by primary key instead of .delete(): only read rows
+    # move, so the per-row post_delete badge invalidation (one cache call
+    # each, after loading every row) would have nothing to do.
+    ids = list(notification_ids)
+    if not ids:
+        return 0
+    quote = connection.ops.quote_name
+    table = quote(DonorNotification._meta.db_table)
+    pk = quote(DonorNotification._meta.pk.column)
+    placeholders = ", ".join(["%s"] * len(ids))
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {table} WHERE {pk} IN ({placeholders})", ids)
+        return cursor.rowcount
@@ -0,0 +1,87 @@
+"""
+Closes requests nobody is going to fulfil, so donor inboxes and
+matching stop carrying them.
+
+- open requests created more than REQUEST_EXPIRY_DAYS ago;
+- matched requests not touched for MATCHED_REQUEST_EXPIRY_DAYS
+  (a donor accepted but the donation never got recorded).
+
+Each batch is one short transaction: one UPDATE of the requests and one
+UPDATE of their unanswered matches (accepted=False with no responded_at
+= closed without an answer, unlike a rejection). Requesters are emailed
+from the job queue after commit. A run stops after `time_budget` seconds
+and the next scheduled run carries on, so any backlog size takes bounded
+time per run.
+"""
+
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from analytics import rollups
+from obdms import metrics
+from obdms.jobs import enqueue
+from obdms.writes import retry_write
+from . import services
+from .models import BloodRequest, RequestMatch
+
+
+def stale_requests(now=None):
+    now = now or timezone.now()
+    open_cutoff = now - timedelta(days=settings.REQUEST_EXPIRY_DAYS)
+    matched_cutoff = now - timedelta(days=settings.MATCHED_REQUEST_EXPIRY_DAYS)
+
+    return BloodRequest.objects.filter(
+        Q(status="open", created_at__lt=open_cutoff)
+        | Q(status="matched", updated_at__lt=matched_cutoff)
+    ).order_by("pk")
+
+
+@retry_write
+def expire_batch(request_ids):
+    """Returns the ids actually expired (a request may have moved on)."""
+    rows = list(
+        BloodRequest.objects.filter(pk__in=request_ids, status__in=("open", "matched"))
+        .values("id", "city", "blood_group", "status", "units_required")
+    )
+    ids = [row["id"] for row in rows]
+    if not ids:
+        return []
+
+    # .update() sends no signals
+    rollups.requests_closed(rows)
+    BloodRequest.objects.filter(pk__in=ids).update(
+        status="expired", updated_at=timezone.now()
+    )
+    RequestMatch.objects.filter(request_id__in=ids, accepted__isnull=True).update(
+        accepted=False
+    )
+
+    transaction.on_commit(lambda: enqueue(services.notify_expired_requests, ids))
+    return ids
+
+
+def expire_stale_requests(batch_size=None, time_budget=None):
+    """Scheduler job. Returns how many requests were expired."""
+    batch_size = batch_size or settings.EXPIRY_BATCH_SIZE
+    if time_budget is None:
+        time_budget = settings.EXPIRY_TIME_BUDGET
+    deadline = time.monotonic() + time_budget
+    expired = 0
+
+    # At least one batch per run, however small the budget
+    while True:
+        ids = list(stale_requests().values_list("pk", flat=True)[:batch_size])
+        if not ids:
+            break
+        batch = expire_batch(ids)
+        metrics.inc("obdms_blood_requests_total", len(batch), event="expired")
+        expired += len(batch)
+        if time.monotonic() >= deadline:
+            break
+
+    return expired
@@ -0,0 +1,121 @@
+import csv
+import json
+
+from donors.models import Donor, DonorDonation
+from .models import BloodRequest, RequestMatch
+
+
+# Rows pulled from the DB per round trip / rows per yielded chunk.
+# Together they keep memory flat regardless of table size.
+CHUNK_SIZE = 2000
+ROWS_PER_WRITE = 500
+
+FORMATS = ("csv", "jsonl")
+
+
+# ==================================================
+# DATASETS
+# ==================================================
+# name -> (model, exported fields, hospital scope lookup or None)
+DATASETS = {
+    "donors": (
+        Donor,
+        [
+            "id", "first_name", "middle_name", "last_name", "user__email",
+            "blood_group", "gender", "phone", "city", "state", "pincode",
+            "status", "created_at",
+        ],
+        None,
+    ),
+    "requests": (
+        BloodRequest,
+        [
+            "id", "blood_group", "units_required", "city", "status",
+            "hospital_id", "hospital__hospital_name", "requested_by__email",
+            "created_at", "updated_at",
+        ],
+        "hospital",
+    ),
+    "matches": (
+        RequestMatch,
+        [
+            "id", "request_id", "donor_id", "donor__blood_group",
+            "notified", "accepted", "created_at",
+        ],
+        "request__hospital",
+    ),
+    "donations": (
+        DonorDonation,
+        [
+            "id", "donor_id", "request_id", "request__hospital_id",
+            "units_donated", "donation_date", "status", "created_at",
+        ],
+        "request__hospital",
+    ),
+}
+
+
+def column_names(fields):
+    return [field.replace("__", "_") for field in fields]
+
+
+def export_rows(dataset, hospital=None, using=None):
+    """
+    Lazily yields value tuples in primary-key order.
+    values_list() + iterator() avoids model instances and
+    the queryset result cache.
+    """
+    model, fields, scope = DATASETS[dataset]
+    qs = model.objects.using(using)
+
+    if hospital is not None:
+        qs = qs.filter(**{scope: hospital})
+
+    return qs.order_by("pk").values_list(*fields).iterator(chunk_size=CHUNK_SIZE)
+
+
+# ==================================================
+# SERIALIZERS (GENERATORS OF TEXT CHUNKS)
+# ==================================================
+class _Echo:
+    """File-like object whose write() just hands the line back."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(rows, columns):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(columns)
+
+    buffer = []
+    for row in rows:
+        buffer.append(writer.writerow(row))
+        if len(buffer) >= ROWS_PER_WRITE:
+            yield "".join(buffer)
+            buffer = []
+
+    if buffer:
+        yield "".join(buffer)
+
+
+def iter_jsonl(rows, columns):
+    buffer = []
+    for row in rows:
+        buffer.append(json.dumps(dict(zip(columns, row)), default=str) + "\n")
+        if len(buffer) >= ROWS_PER_WRITE:
+            yield "".join(buffer)
+            buffer = []
+
+    if buffer:
+        yield "".join(buffer)
+
+
+def stream_export(dataset, fmt, hospital=None, using=None):
+    _, fields, _ = DATASETS[dataset]
+    rows = export_rows(dataset, hospital=hospital, using=using)
+    columns = column_names(fields)
+
+    if fmt == "jsonl":
+        return iter_jsonl(rows, columns)
+    return iter_csv(rows, columns)
@@ -0,0 +1,63 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from blood_requests import archiving
+
+
+class Command(BaseCommand):
+    help = (
+        "Move fulfilled/cancelled/expired requests older than the retention window, "
+        "their matches and old read notifications into the archive tables, "
+        "in short batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.ARCHIVE_RETENTION_DAYS,
+            help="Retention window (default: ARCHIVE_RETENTION_DAYS)",
+        )
+        parser.add_argument("--batch-size", type=int, default=100, help="Requests per transaction")
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0.05,
+            help="Seconds between batches, so interactive writes get the lock",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Only count")
+
+    def handle(self, *args, **options):
+        cutoff = archiving.cutoff_for(options["days"])
+        requests = archiving.archivable_requests(cutoff)
+        notifications = archiving.archivable_notifications(cutoff)
+
+        if options["dry_run"]:
+            self.stdout.write(
+                f"Would archive {requests.count()} requests and "
+                f"{notifications.count()} notifications closed before {cutoff:%Y-%m-%d}."
+            )
+            return
+
+        batch_size = options["batch_size"]
+        removed = moved = archived_notifications = 0
+
+        # Archived rows drop out of the queryset, so always take the first batch
+        while ids := list(requests.values_list("pk", flat=True)[:batch_size]):
+            batch_removed, batch_moved = archiving.archive_request_batch(ids)
+            removed += batch_removed
+            moved += batch_moved
+            self.stdout.write(f"requests: {removed} removed, {moved} matches moved")
+            time.sleep(options["pause"])
+
+        notification_batch = batch_size * 10
+        while ids := list(notifications.values_list("pk", flat=True)[:notification_batch]):
+            archived_notifications += archiving.archive_notification_batch(ids)
+            time.sleep(options["pause"])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {removed} requests, {moved} matches and "
+            f"{archived_notifications} notifications closed before {cutoff:%Y-%m-%d}."
+        ))
@@ -0,0 +1,51 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from hospitals.models import Hospital
+from blood_requests import exports
+from obdms.routers import read_alias
+
+
+class Command(BaseCommand):
+    help = "Stream donors, requests, matches or donations as CSV or JSONL."
+
+    def add_arguments(self, parser):
+        parser.add_argument("dataset", choices=sorted(exports.DATASETS))
+        parser.add_argument("--format", choices=exports.FORMATS, default="csv")
+        parser.add_argument("--output", help="File to write (default: stdout)")
+        parser.add_argument(
+            "--hospital",
+            type=int,
+            help="Only rows belonging to this hospital id",
+        )
+        parser.add_argument(
+            "--primary",
+            action="store_true",
+            help="Read the primary even when a fresh replica is available",
+        )
+
+    def handle(self, *args, **options):
+        dataset = options["dataset"]
+
+        hospital = None
+        if options["hospital"]:
+            _, _, scope = exports.DATASETS[dataset]
+            if scope is None:
+                raise CommandError(f"{dataset} cannot be scoped to a hospital.")
+            hospital = Hospital.objects.filter(pk=options["hospital"]).first()
+            if not hospital:
+                raise CommandError(f"No hospital with id {options['hospital']}.")
+
+        chunks = exports.stream_export(
+            dataset, options["format"], hospital=hospital,
+            using="default" if options["primary"] else read_alias(),
+        )
+
+        if options["output"]:
+            with open(options["output"], "w", newline="", encoding="utf-8") as fh:
+                for chunk in chunks:
+                    fh.write(chunk)
+        else:
+            for chunk in chunks:
+                sys.stdout.write(chunk)
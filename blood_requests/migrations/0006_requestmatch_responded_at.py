@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blood_requests', '0005_archivedbloodrequest_archivedrequestmatch'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedrequestmatch',
+            name='responded_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='requestmatch',
+            name='responded_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
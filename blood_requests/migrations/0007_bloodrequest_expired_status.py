@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blood_requests', '0006_requestmatch_responded_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='archivedbloodrequest',
+            name='status',
+            field=models.CharField(choices=[('open', 'Open'), ('matched', 'Matched'), ('fulfilled', 'Fulfilled'), ('cancelled', 'Cancelled'), ('expired', 'Expired')], max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='bloodrequest',
+            name='status',
+            field=models.CharField(choices=[('open', 'Open'), ('matched', 'Matched'), ('fulfilled', 'Fulfilled'), ('cancelled', 'Cancelled'), ('expired', 'Expired')], default='open', max_length=20),
+        ),
+    ]
@@ -9,12 +9,16 @@ from donors.models import BLOOD_GROUP_CHOICES, Donor
 # =========================
 # BLOOD REQUEST
 # =========================
+CLOSED_STATUSES = ("fulfilled", "cancelled", "expired")
+
+
 class BloodRequest(models.Model):
     STATUS_CHOICES = [
         ("open", "Open"),
         ("matched", "Matched"),
         ("fulfilled", "Fulfilled"),
         ("cancelled", "Cancelled"),
+        ("expired", "Expired"),
     ]
 
     requested_by = models.ForeignKey(
@@ -47,9 +51,16 @@ class BloodRequest(models.Model):
     )
 
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # Expiry (open by age, matched by idle time) and archiving
+            # (closed by updated_at) read ranges within one status
+            models.Index(fields=["status", "created_at"], name="request_status_created_idx"),
+            models.Index(fields=["status", "updated_at"], name="request_status_updated_idx"),
+        ]
 
     def __str__(self):
         return f"{self.blood_group} ({self.units_required}) - {self.city}"
@@ -57,13 +68,13 @@ class BloodRequest(models.Model):
     def clean(self):
         """
         HARD RULES:
-        - Cancelled / fulfilled requests are immutable
+        - Cancelled / fulfilled / expired requests are immutable
         """
         if self.pk:
             old = BloodRequest.objects.get(pk=self.pk)
-            if old.status in ("cancelled", "fulfilled") and old.status != self.status:
+            if old.status in CLOSED_STATUSES and old.status != self.status:
                 raise ValidationError(
-                    "Cancelled or fulfilled requests cannot be modified."
+                    "Closed requests cannot be modified."
                 )
 
 
@@ -85,6 +96,7 @@ class RequestMatch(models.Model):
     notified = models.BooleanField(default=False)
 
     accepted = models.BooleanField(null=True, blank=True)
+    responded_at = models.DateTimeField(null=True, blank=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -122,3 +134,63 @@ class RequestMatch(models.Model):
 
     def __str__(self):
         return f"{self.donor.full_name} → {self.request.blood_group}"
+
+
+# =========================
+# ARCHIVE (manage.py archive_closed)
+# =========================
+# Copies of closed requests and their matches moved out of the hot
+# tables. Ids are kept; relations are unconstrained so deleting a user,
+# hospital or donor never has to touch the archive.
+class ArchivedBloodRequest(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    requested_by = models.ForeignKey(
+        User,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="+",
+    )
+    hospital = models.ForeignKey(
+        Hospital,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        related_name="+",
+    )
+    blood_group = models.CharField(max_length=5, choices=BLOOD_GROUP_CHOICES)
+    units_required = models.PositiveIntegerField()
+    city = models.CharField(max_length=100)
+    contact_info = models.CharField(max_length=200)
+    status = models.CharField(max_length=20, choices=BloodRequest.STATUS_CHOICES)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.blood_group} ({self.units_required}) - {self.city} [archived]"
+
+
+class ArchivedRequestMatch(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    request = models.ForeignKey(
+        ArchivedBloodRequest,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="matches",
+    )
+    donor = models.ForeignKey(
+        Donor,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="+",
+    )
+    notified = models.BooleanField(default=False)
+    accepted = models.BooleanField(null=True, blank=True)
+    responded_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"match {self.id} of request {self.request_id} [archived]"
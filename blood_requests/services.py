@@ -1,10 +1,18 @@
 from django.urls import reverse
-from django.core.mail import send_mail
+from django.core.exceptions import ValidationError
+from django.core.mail import EmailMessage, get_connection, send_mail
 from django.conf import settings
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
 import logging
-from donors.models import Donor
-from .models import RequestMatch
+import time
+from donors.models import Donor, DonorDonation, DonorNotification
+from obdms import metrics
+from obdms.jobs import enqueue
+from obdms.timing import timed
+from obdms.writes import retry_write
+from .models import BloodRequest, RequestMatch
+from analytics import rollups
+from django.db.models import Exists, OuterRef
 from django.db.models.functions import Upper, Trim
 
 logger = logging.getLogger(__name__)
@@ -24,94 +32,323 @@ BLOOD_COMPATIBILITY = {
 }
 
 
+# ==================================================
+# REQUEST LIFECYCLE
+# ==================================================
+# The one path for creating, cancelling and fulfilling a request, whatever
+# the entry point (requester and hospital views, admin, API). Permission
+# checks stay with the caller; these validate, write in one short
+# transaction, and queue matching / emails for after the commit.
+# Invalid input raises ValidationError with a message fit for the user.
+
+@timed("pipeline")
+def create_request(user, blood_group, units_required, city=None, hospital=None,
+                   base_url=None):
+    """
+    base_url (request.build_absolute_uri("/")) makes the links in
+    the donor emails absolute; matching runs in the job queue.
+    """
+    blood_group = (blood_group or "").strip().upper()
+    city = (city or "").strip().title() or (hospital.city if hospital else "")
+
+    if not blood_group or not units_required or not city:
+        raise ValidationError("All fields are required.")
+
+    try:
+        units = int(units_required)
+    except (TypeError, ValueError):
+        units = 0
+    if blood_group not in BLOOD_COMPATIBILITY or units < 1:
+        raise ValidationError("Enter a valid blood group and number of units.")
+
+    blood_request = retry_write(BloodRequest.objects.create)(
+        requested_by=user,
+        hospital=hospital,
+        blood_group=blood_group,
+        units_required=units,
+        city=city,
+        contact_info=hospital.phone if hospital else user.email,
+        status="open",
+    )
+    metrics.inc("obdms_blood_requests_total", event="created")
+
+    transaction.on_commit(lambda: enqueue(match_request, blood_request.pk, base_url))
+    return blood_request
+
+
+@retry_write
+def _transition(blood_request, from_statuses, status):
+    # Re-read inside the write transaction: a donor may have
+    # accepted (or another tab cancelled) since the page loaded
+    if not BloodRequest.objects.filter(
+        pk=blood_request.pk, status__in=from_statuses
+    ).exists():
+        raise ValidationError("This request can no longer be changed.")
+
+    blood_request.status = status
+    blood_request.save(update_fields=["status", "updated_at"])
+
+
+# A matched request can still be called off (e.g. blood found elsewhere);
+# its accepted donor is told not to come (notify_cancelled_request)
+CANCELLABLE_STATUSES = ("open", "matched")
+
+
+@timed("pipeline")
+def cancel_request(blood_request):
+    _transition(blood_request, CANCELLABLE_STATUSES, "cancelled")
+    metrics.inc("obdms_blood_requests_total", event="cancelled")
+
+    transaction.on_commit(lambda: enqueue(notify_cancelled_request, blood_request))
+
+
+@retry_write
+def _fulfil(blood_request, donor):
+    _transition(blood_request, ("matched",), "fulfilled")
+
+    DonorDonation.objects.get_or_create(
+        donor=donor,
+        request=blood_request,
+        defaults={
+            "units_donated": blood_request.units_required,
+            "status": "completed",
+        },
+    )
+
+    DonorNotification.objects.create(
+        donor=donor,
+        title="Blood Request Fulfilled",
+        message="Thank you for donating blood. The requester has marked the request as fulfilled.",
+    )
+
+
+@timed("pipeline")
+def fulfil_request(blood_request):
+    """Records the accepted donor's donation and closes the request."""
+    accepted_match = RequestMatch.objects.filter(
+        request=blood_request,
+        accepted=True,
+    ).select_related("donor").first()
+
+    if not accepted_match:
+        raise ValidationError("No accepted donor found.")
+
+    _fulfil(blood_request, accepted_match.donor)
+    metrics.inc("obdms_blood_requests_total", event="fulfilled")
+
+    transaction.on_commit(lambda: enqueue(notify_fulfilled_request, blood_request))
+
+
+def match_request(request_id, base_url=None):
+    """Job: match a newly created request unless it was closed meanwhile."""
+    blood_request = BloodRequest.objects.filter(pk=request_id, status="open").first()
+    if blood_request:
+        match_and_notify(blood_request, base_url=base_url)
+
+
+# ==================================================
+# BATCHED EMAIL
+# ==================================================
+def send_emails(kind, emails):
+    """
+    emails: (EmailMessage, label for the log) pairs. They share one
+    mail connection instead of an SMTP handshake per message; each
+    is still timed, counted and allowed to fail on its own.
+    """
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception:
+        # Each send below retries the connection and logs its failure
+        logger.exception("Could not open mail connection for %s emails", kind)
+
+    try:
+        for email, label in emails:
+            email.connection = connection
+            try:
+                with metrics.email_timer(kind):
+                    email.send()
+            except Exception:
+                logger.exception("%s email failed for %s", kind.capitalize(), label)
+    finally:
+        connection.close()
+
+
+def _email(subject, body, recipient):
+    return EmailMessage(subject, body, settings.DEFAULT_FROM_EMAIL, [recipient])
+
+
 
 # ==================================================
 # MATCH DONORS & NOTIFY
 # ==================================================
-def match_and_notify(blood_request, request=None):
+@timed("notify")
+def match_and_notify(blood_request, base_url=None):
     """
     Match donors by blood_group + city,
     create RequestMatch rows,
-    and notify donors via email.
+    and notify donors via email (one batch).
 
     HARD RULES:
     - Only ACTIVE donors
     - No self-matching
     - No duplicate matches
     """
+    started = time.perf_counter()
     request_bg = (blood_request.blood_group or "").strip().upper()
     request_city_title = (blood_request.city or "").strip().title()
 
     compatible = BLOOD_COMPATIBILITY.get(request_bg, [])
     compatible = [bg.strip().upper() for bg in compatible]
-    donors = Donor.objects.annotate(
-        norm_bg=Upper(Trim("blood_group")),
-        norm_city=Trim("city"),
-    ).filter(
-        norm_bg__in=compatible,
-        norm_city__iexact=request_city_title,
-        status="active",
+    donors = list(
+        Donor.objects.annotate(
+            norm_bg=Upper(Trim("blood_group")),
+            norm_city=Trim("city"),
+        ).filter(
+            norm_bg__in=compatible,
+            norm_city__iexact=request_city_title,
+            status="active",
+        ).exclude(
+            user_id=blood_request.requested_by_id,
+        ).select_related("user").order_by("pk")
     )
 
-    for donor in donors:
-        if donor.user_id == blood_request.requested_by_id:
-            continue
+    # One query for existing matches + one INSERT, instead of
+    # a get_or_create round trip per donor
+    already_matched = set(
+        RequestMatch.objects.filter(request=blood_request).values_list("donor_id", flat=True)
+    )
+    donors = [donor for donor in donors if donor.id not in already_matched]
 
-        try:
-            match, created = RequestMatch.objects.get_or_create(
-                request=blood_request,
-                donor=donor,
-            )
-        except IntegrityError:
-            continue
+    try:
+        matches = retry_write(RequestMatch.objects.bulk_create)([
+            RequestMatch(request=blood_request, donor=donor)
+            for donor in donors
+        ])
+        # bulk_create sends no post_save; get_or_create below does
+        rollups.matches_created(blood_request, len(matches))
+    except IntegrityError:
+        # Raced with another matcher; fall back to row by row
+        matches = []
+        for donor in donors:
+            try:
+                match, created = RequestMatch.objects.get_or_create(
+                    request=blood_request,
+                    donor=donor,
+                )
+            except IntegrityError:
+                continue
+            if created:
+                matches.append(match)
+
+    metrics.inc("obdms_matches_created_total", len(matches))
+    metrics.observe("obdms_match_fanout", len(matches))
+
+    send_emails("match", (
+        (match_email(blood_request, match, base_url), f"request {blood_request.id}")
+        for match in matches
+    ))
+
+    metrics.observe("obdms_match_seconds", time.perf_counter() - started)
+
+
+def match_email(blood_request, match, base_url=None):
+    # Jobs without a request to take the host from fall back to SITE_URL
+    base_url = base_url or settings.SITE_URL
+
+    def link(action):
+        path = reverse("donors:respond-request", args=[match.id, action])
+        return f"{base_url.rstrip('/')}{path}" if base_url else path
+
+    accept_link = link("accept")
+    reject_link = link("reject")
+
+    subject = f"Blood request matching your blood group ({blood_request.blood_group})"
+    message = (
+        f"Blood Group: {blood_request.blood_group}\n"
+        f"City: {blood_request.city}\n"
+        f"Units Required: {blood_request.units_required}\n\n"
+        f"Accept: {accept_link}\n"
+        f"Reject: {reject_link}\n"
+    )
 
-        if not created:
-            continue
+    return _email(subject, message, match.donor.user.email)
 
-        accept_path = reverse(
-            "donors:respond-request",
-            args=[match.id, "accept"],
-        )
-        reject_path = reverse(
-            "donors:respond-request",
-            args=[match.id, "reject"],
-        )
 
-        if request:
-            accept_link = request.build_absolute_uri(accept_path)
-            reject_link = request.build_absolute_uri(reject_path)
+# ==================================================
+# REQUEST EXPIRED (queued by blood_requests.expiry)
+# ==================================================
+def notify_expired_requests(request_ids):
+    """
+    Tell each requester their request was closed. A request that expired
+    while matched had a donor accept, but no donation was ever recorded.
+    """
+    expired = BloodRequest.objects.filter(
+        pk__in=request_ids, status="expired"
+    ).annotate(
+        had_donor=Exists(RequestMatch.objects.filter(request=OuterRef("pk"), accepted=True))
+    ).select_related("hospital__user", "requested_by")
+
+    emails = []
+    for blood_request in expired:
+        if blood_request.hospital:
+            recipient = blood_request.hospital.user.email
         else:
-            accept_link = accept_path
-            reject_link = reject_path
-
-        subject = f"Blood request matching your blood group ({blood_request.blood_group})"
-        message = (
-            f"Blood Group: {blood_request.blood_group}\n"
-            f"City: {blood_request.city}\n"
-            f"Units Required: {blood_request.units_required}\n\n"
-            f"Accept: {accept_link}\n"
-            f"Reject: {reject_link}\n"
-        )
+            recipient = blood_request.requested_by.email
+        if not recipient:
+            continue
 
-        try:
-            send_mail(
-                subject,
-                message,
-                settings.DEFAULT_FROM_EMAIL,
-                [donor.user.email],
-                fail_silently=False,
+        summary = (
+            f"Your request for {blood_request.units_required} unit(s) of "
+            f"{blood_request.blood_group} in {blood_request.city} was closed"
+        )
+        if blood_request.had_donor:
+            reason = (
+                " because a donor accepted it but the donation was never marked "
+                "as fulfilled. If blood is still needed, please file a new request."
             )
-        except Exception:
-            logger.exception(
-                "Email failed for donor %s (request %s)",
-                donor.user.email,
-                blood_request.id,
+        else:
+            reason = (
+                " after receiving no confirmed donor. Please file a new request "
+                "if blood is still needed."
             )
 
+        emails.append((_email(
+            f"Blood Request Expired ({blood_request.blood_group})",
+            summary + reason,
+            recipient,
+        ), f"request {blood_request.id}"))
+
+    send_emails("expired", emails)
+
+
+# ==================================================
+# BACKGROUND JOBS (obdms.jobs; admin actions)
+# ==================================================
+def rematch_requests(request_ids, base_url=None):
+    """Match newly eligible donors to requests that are still open."""
+    for blood_request in BloodRequest.objects.filter(pk__in=request_ids, status="open"):
+        match_and_notify(blood_request, base_url=base_url)
+
+
+def resend_match_notifications(request_ids, base_url=None):
+    """Email again every donor who hasn't answered an open request."""
+    pending = RequestMatch.objects.filter(
+        request_id__in=request_ids,
+        request__status="open",
+        accepted__isnull=True,
+    ).select_related("request", "donor__user").order_by("request_id", "pk")
+
+    send_emails("match", (
+        (match_email(match.request, match, base_url), f"request {match.request_id}")
+        for match in pending.iterator(chunk_size=500)
+    ))
+
 
 # ==================================================
 # DONOR ACCEPTANCE NOTIFICATION
 # ==================================================
+@timed("notify")
 def send_acceptance_email_to_requester(match):
     """
     Sent when donor ACCEPTS request.
@@ -140,13 +377,14 @@ def send_acceptance_email_to_requester(match):
     )
 
     try:
-        send_mail(
-            subject,
-            message,
-            settings.DEFAULT_FROM_EMAIL,
-            [recipient],
-            fail_silently=False,
-        )
+        with metrics.email_timer("acceptance"):
+            send_mail(
+                subject,
+                message,
+                settings.DEFAULT_FROM_EMAIL,
+                [recipient],
+                fail_silently=False,
+            )
     except Exception:
         logger.exception(
             "Acceptance email failed for request %s",
@@ -157,6 +395,7 @@ def send_acceptance_email_to_requester(match):
 # ==================================================
 # REQUEST CANCELLED
 # ==================================================
+@timed("notify")
 def notify_cancelled_request(blood_request):
     """
     Notify ONLY donors who ACCEPTED the request.
@@ -165,27 +404,22 @@ def notify_cancelled_request(blood_request):
     matches = RequestMatch.objects.filter(
         request=blood_request,
         accepted=True,
-    )
+    ).select_related("donor__user")
 
-    for match in matches:
-        try:
-            send_mail(
-                f"Blood Request Cancelled ({blood_request.blood_group})",
-                f"The blood request in {blood_request.city} has been cancelled.",
-                settings.DEFAULT_FROM_EMAIL,
-                [match.donor.user.email],
-                fail_silently=False,
-            )
-        except Exception:
-            logger.exception(
-                "Cancel email failed for donor %s",
-                match.donor.user.email,
-            )
+    send_emails("cancelled", (
+        (_email(
+            f"Blood Request Cancelled ({blood_request.blood_group})",
+            f"The blood request in {blood_request.city} has been cancelled.",
+            match.donor.user.email,
+        ), f"donor {match.donor_id}")
+        for match in matches
+    ))
 
 
 # ==================================================
 # REQUEST FULFILLED
 # ==================================================
+@timed("notify")
 def notify_fulfilled_request(blood_request):
     """
     Notify ONLY donors who ACCEPTED the request.
@@ -194,19 +428,13 @@ def notify_fulfilled_request(blood_request):
     matches = RequestMatch.objects.filter(
         request=blood_request,
         accepted=True,
-    )
-
-    for match in matches:
-        try:
-            send_mail(
-                f"Blood Request Fulfilled ({blood_request.blood_group})",
-                "Thank you for helping. The request has been fulfilled.",
-                settings.DEFAULT_FROM_EMAIL,
-                [match.donor.user.email],
-                fail_silently=False,
-            )
-        except Exception:
-            logger.exception(
-                "Fulfilled email failed for donor %s",
-                match.donor.user.email,
-            )
+    ).select_related("donor__user")
+
+    send_emails("fulfilled", (
+        (_email(
+            f"Blood Request Fulfilled ({blood_request.blood_group})",
+            "Thank you for helping. The request has been fulfilled.",
+            match.donor.user.email,
+        ), f"donor {match.donor_id}")
+        for match in matches
+    ))
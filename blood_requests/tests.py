@@ -1,3 +1,250 @@
-from django.test import TestCase
+import warnings
+from datetime import timedelta
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core import mail
+from django.template import Context, Template
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import IdempotencyKey
+from analytics import rollups
+from analytics.models import CityBloodGroupStock
+from obdms import idempotency
+from obdms.nplusone import NPlusOneError, NPlusOneWarning, detect_n_plus_one
+from obdms.query_budgets import CITY, QueryBudgetMixin, build_fixture
+from donors.models import ArchivedDonorNotification, DonorNotification
+from . import archiving, expiry, urls
+from .models import BloodRequest, RequestMatch
+
+
+class BloodRequestViewQueryBudgetTests(QueryBudgetMixin, TestCase):
+    URLS = urls
+
+    BUDGETS = {
+        "create-request": 4,
+        "my-requests": 5,
+        "cancel-request": 6,
+        "export": 3,
+        "hospital-requests": 6,
+        "mark-fulfilled": 17,
+    }
+
+    def calls(self, fx):
+        requester = fx.requester
+        return {
+            # Matching and emails run after the response (job queue)
+            "create-request": (
+                requester, "post", reverse("requests:create-request"),
+                {"blood_group": "AB+", "units_required": 1, "city": "Patna"},
+            ),
+            "my-requests": (requester, "get", reverse("requests:my-requests"), None),
+            "cancel-request": (
+                requester, "get",
+                reverse("requests:cancel-request", args=[fx.requester_request.id]),
+                None,
+            ),
+            "export": (fx.staff, "get", reverse("requests:export", args=["matches"]), None),
+            "hospital-requests": (
+                fx.hospital_user, "get", reverse("requests:hospital-requests"), None,
+            ),
+            "mark-fulfilled": (
+                requester, "get",
+                reverse("requests:mark-fulfilled", args=[fx.matched_request.id]),
+                None,
+            ),
+        }
+
+
+class NPlusOneDetectorTests(TestCase):
+    def setUp(self):
+        self.fx = build_fixture(4)
+
+    def test_lazy_related_access_raises(self):
+        with self.assertRaisesMessage(NPlusOneError, "test_lazy_related_access_raises"):
+            with detect_n_plus_one():
+                for match in RequestMatch.objects.filter(donor=self.fx.donor):
+                    match.request.hospital
+
+    def test_select_related_passes(self):
+        with detect_n_plus_one():
+            matches = RequestMatch.objects.filter(donor=self.fx.donor).select_related(
+                "request__hospital"
+            )
+            for match in matches:
+                match.request.hospital
+
+    def test_warn_mode_reports_template_line(self):
+        template = Template(
+            "{% for m in matches %}\n{{ m.request.city }}\n{% endfor %}",
+        )
+        template.origin.template_name = "inline.html"
+
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            with self.assertLogs("obdms.nplusone", "WARNING"), detect_n_plus_one("warn"):
+                template.render(Context({
+                    "matches": RequestMatch.objects.filter(donor=self.fx.donor),
+                }))
+
+        messages = [str(w.message) for w in caught if w.category is NPlusOneWarning]
+        self.assertEqual(len(messages), 1)
+        self.assertIn("inline.html:2", messages[0])
+
+
+@override_settings(
+    JOBS_RUN_INLINE=True,
+    EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+)
+class RequestExpiryTests(TestCase):
+    def setUp(self):
+        self.fx = build_fixture(3)
+        rollups.rebuild()
+        BloodRequest.objects.filter(status="open", hospital=self.fx.hospital).update(
+            created_at=timezone.now() - timedelta(days=60)
+        )
+        self.stale = set(
+            BloodRequest.objects.filter(status="open", hospital=self.fx.hospital)
+            .values_list("pk", flat=True)
+        )
+
+    def test_stale_requests_expire_in_batches(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            expired = expiry.expire_stale_requests(batch_size=2)
+
+        self.assertEqual(expired, len(self.stale))
+        self.assertEqual(
+            set(BloodRequest.objects.filter(status="expired").values_list("pk", flat=True)),
+            self.stale,
+        )
+        # Unanswered matches are closed, not left in donor inboxes
+        self.assertFalse(RequestMatch.objects.filter(
+            request_id__in=self.stale, accepted__isnull=True
+        ).exists())
+        self.assertEqual(len(mail.outbox), len(self.stale))
+
+        stock = CityBloodGroupStock.objects.get(city=CITY, blood_group="O+")
+        self.assertEqual(
+            stock.open_requests,
+            BloodRequest.objects.filter(status="open", blood_group="O+").count(),
+        )
+
+    def test_expired_matched_request_email_mentions_the_donor(self):
+        BloodRequest.objects.filter(pk=self.fx.matched_request.pk).update(
+            updated_at=timezone.now() - timedelta(days=60)
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            expiry.expire_stale_requests()
+
+        bodies = {m.to[0]: m.body for m in mail.outbox}
+        self.assertIn("a donor accepted it", bodies[self.fx.requester.email])
+        self.assertIn("no confirmed donor", bodies[self.fx.hospital_user.email])
+
+    def test_run_is_bounded_by_time_budget(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(expiry.expire_stale_requests(batch_size=1, time_budget=0), 1)
+            self.assertEqual(expiry.expire_stale_requests(batch_size=1, time_budget=60), 2)
+
+
+class NotificationArchivingTests(TestCase):
+    def test_only_old_read_notifications_move(self):
+        fx = build_fixture(1)
+        old = timezone.now() - timedelta(days=400)
+        read = DonorNotification.objects.create(donor=fx.donor, title="Old", message="m", is_read=True)
+        unread = DonorNotification.objects.create(donor=fx.donor, title="Unread", message="m")
+        DonorNotification.objects.filter(pk__in=[read.pk, unread.pk]).update(created_at=old)
+
+        ids = list(
+            archiving.archivable_notifications(archiving.cutoff_for(30))
+            .values_list("pk", flat=True)
+        )
+        self.assertIn(read.pk, ids)
+        self.assertNotIn(unread.pk, ids)
+
+        self.assertEqual(archiving.archive_notification_batch(ids), len(ids))
+        self.assertFalse(DonorNotification.objects.filter(pk__in=ids).exists())
+        self.assertTrue(DonorNotification.objects.filter(pk=unread.pk).exists())
+        self.assertTrue(ArchivedDonorNotification.objects.filter(pk=read.pk, title="Old").exists())
+
+
+@override_settings(
+    JOBS_RUN_INLINE=True,
+    EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+)
+class BloodRequestAdminTests(TestCase):
+    def test_resent_match_emails_have_absolute_links(self):
+        fx = build_fixture(2)
+        client = Client()
+        client.force_login(User.objects.create(
+            username="admin@budget.test", is_staff=True, is_superuser=True,
+        ))
+
+        client.post(reverse("admin:blood_requests_bloodrequest_changelist"), {
+            "action": "resend_notifications", "_selected_action": [fx.open_request.pk],
+        })
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn(
+            f"Accept: http://testserver/donors/requests/{fx.pending_match.pk}/accept/",
+            mail.outbox[0].body,
+        )
+
+
+@override_settings(
+    JOBS_RUN_INLINE=True,
+    EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+)
+class IdempotentCreateTests(TestCase):
+    def setUp(self):
+        self.fx = build_fixture(3)
+        self.client = Client()
+        self.client.force_login(self.fx.requester)
+        self.url = reverse("requests:create-request")
+        self.form = {"blood_group": "AB+", "units_required": 1, "city": CITY}
+
+    def _created(self):
+        return BloodRequest.objects.filter(requested_by=self.fx.requester, blood_group="AB+")
+
+    def test_resubmitted_form_creates_once(self):
+        key = self.client.get(self.url).context["idempotency_key"]
+        with self.captureOnCommitCallbacks(execute=True):
+            first = self.client.post(self.url, {**self.form, "idempotency_key": key})
+        sent = len(mail.outbox)
+        with self.captureOnCommitCallbacks(execute=True):
+            again = self.client.post(self.url, {**self.form, "idempotency_key": key})
+
+        self.assertEqual(self._created().count(), 1)
+        self.assertGreater(sent, 0)
+        self.assertEqual(again["Location"], first["Location"])
+        self.assertEqual(again["Idempotent-Replayed"], "true")
+        self.assertEqual(len(mail.outbox), sent)
+
+    def test_header_key_and_validation_errors(self):
+        headers = {"Idempotency-Key": "retry-0001"}
+        bounced = self.client.post(self.url, {"city": CITY}, headers=headers)
+        self.assertEqual(bounced["Location"], self.url)
+
+        # The failed attempt did not use up the key
+        for _ in range(2):
+            self.client.post(self.url, self.form, headers=headers)
+        self.assertEqual(self._created().count(), 1)
+
+    def test_keys_are_shared_rows_that_expire(self):
+        headers = {"Idempotency-Key": "retry-0002"}
+        first = self.client.post(self.url, self.form, headers=headers)
+
+        # Claimed in the database, not in this process's cache
+        claim = IdempotencyKey.objects.get(key__endswith=":retry-0002")
+        self.assertEqual(claim.location, first["Location"])
+
+        expired = timezone.now() - timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL + 1)
+        IdempotencyKey.objects.filter(pk=claim.pk).update(created_at=expired)
+        self.client.post(self.url, self.form, headers=headers)
+        self.assertEqual(self._created().count(), 2)
+
+        IdempotencyKey.objects.update(created_at=expired)
+        self.assertEqual(idempotency.purge_expired_keys(), 1)
+        self.assertFalse(IdempotencyKey.objects.exists())
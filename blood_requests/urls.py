@@ -31,6 +31,12 @@ urlpatterns = [
     # Hospital-only actions
     # =========================
 
+    path(
+        "export/<str:dataset>/",
+        views.export_data,
+        name="export",
+    ),
+
     path(
         "hospital/",
         views.hospital_requests,
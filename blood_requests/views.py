@@ -1,51 +1,57 @@
 from django.shortcuts import get_object_or_404, redirect, render
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.db import transaction
-from django.core.exceptions import PermissionDenied
+from django.core.exceptions import PermissionDenied, ValidationError
+from django.db.models import Count, Max
+from django.http import Http404, StreamingHttpResponse
 
 from hospitals.models import Hospital
-from donors.models import Donor, BLOOD_GROUP_CHOICES, DonorDonation, DonorNotification
-from .models import BloodRequest, RequestMatch
-from . import services
+from donors.models import BLOOD_GROUP_CHOICES
+from .models import BloodRequest
+from . import exports, services
+from obdms import idempotency
+from obdms.conditional import conditional_page
+from obdms.routers import read_alias
+
+
+# ==================================================
+# CONDITIONAL GET VALIDATORS
+# ==================================================
+def _requests_state(requests_qs):
+    state = requests_qs.aggregate(count=Count("id"), updated=Max("updated_at"))
+    return (state["count"], state["updated"]), state["updated"]
+
+
+def _my_requests_validator(request):
+    return _requests_state(BloodRequest.objects.filter(requested_by=request.user))
+
+
+def _hospital_requests_validator(request):
+    return _requests_state(BloodRequest.objects.filter(hospital__user=request.user))
 
 
 # ==================================================
 # CREATE BLOOD REQUEST (User or Hospital)
 # ==================================================
 @login_required
+@idempotency.idempotent_post
 def create_blood_request(request):
     hospital = getattr(request.user, "hospital", None)
 
     if request.method == "POST":
-        blood_group = request.POST.get("blood_group")
-        units = request.POST.get("units_required")
-        city = request.POST.get("city", "").strip().title()
-
-        if not blood_group or not units or not city:
-            messages.error(request, "All fields are required.")
-            return redirect("requests:create-request")
-
-        if hospital:
-            contact_info = hospital.phone
-        else:
-            contact_info = request.user.email
-
-        blood_request = BloodRequest.objects.create(
-            requested_by=request.user,
-            hospital=hospital,
-            blood_group=blood_group,
-            units_required=units,
-            city=city,
-            contact_info=contact_info,
-            status="open",
-        )
-
-        # Auto-match donors
         try:
-            services.match_and_notify(blood_request, request=request)
-        except Exception:
-            pass
+            # Donors are matched and emailed from the job queue
+            services.create_request(
+                request.user,
+                blood_group=request.POST.get("blood_group"),
+                units_required=request.POST.get("units_required"),
+                city=request.POST.get("city"),
+                hospital=hospital,
+                base_url=request.build_absolute_uri("/"),
+            )
+        except ValidationError as exc:
+            messages.error(request, exc.messages[0])
+            return redirect("requests:create-request")
 
         messages.success(request, "Blood request created successfully.")
 
@@ -55,6 +61,7 @@ def create_blood_request(request):
 
     return render(request, "requests/create.html", {
         "blood_groups": BLOOD_GROUP_CHOICES,
+        "idempotency_key": idempotency.new_key(),
     })
 
 
@@ -63,6 +70,7 @@ def create_blood_request(request):
 # MY REQUESTS (Requester: User or Hospital)
 # ==================================================
 @login_required
+@conditional_page(_my_requests_validator)
 def my_requests(request):
     requests_qs = BloodRequest.objects.filter(requested_by=request.user)
 
@@ -81,16 +89,14 @@ def cancel_blood_request(request, request_id):
         BloodRequest,
         id=request_id,
         requested_by=request.user,
-        status="open",
+        status__in=services.CANCELLABLE_STATUSES,
     )
 
-    blood_request.status = "cancelled"
-    blood_request.save(update_fields=["status"])
-
     try:
-        services.notify_cancelled_request(blood_request)
-    except Exception:
-        pass
+        services.cancel_request(blood_request)
+    except ValidationError as exc:
+        messages.error(request, exc.messages[0])
+        return redirect("requests:my-requests")
 
     messages.success(request, "Blood request cancelled successfully.")
     return redirect("requests:my-requests")
@@ -100,6 +106,7 @@ def cancel_blood_request(request, request_id):
 # HOSPITAL: VIEW OWN REQUESTS
 # ==================================================
 @login_required
+@conditional_page(_hospital_requests_validator)
 def hospital_requests(request):
     hospital = getattr(request.user, "hospital", None)
     if not hospital:
@@ -134,38 +141,38 @@ def mark_request_fulfilled(request, request_id):
         messages.error(request, "You are not allowed to fulfill this request.")
         return redirect("dashboard")
 
-    accepted_match = RequestMatch.objects.filter(
-        request=blood_request,
-        accepted=True,
-    ).select_related("donor").first()
-
-    if not accepted_match:
-        messages.error(request, "No accepted donor found.")
+    try:
+        services.fulfil_request(blood_request)
+    except ValidationError as exc:
+        messages.error(request, exc.messages[0])
         return redirect("dashboard")
 
-    with transaction.atomic():
-        blood_request.status = "fulfilled"
-        blood_request.save(update_fields=["status"])
-
-        DonorDonation.objects.get_or_create(
-            donor=accepted_match.donor,
-            request=blood_request,
-            defaults={
-                "units_donated": blood_request.units_required,
-                "status": "completed",
-            },
-        )
-
-        DonorNotification.objects.create(
-            donor=accepted_match.donor,
-            title="Blood Request Fulfilled",
-            message="Thank you for donating blood. The requester has marked the request as fulfilled.",
-        )
-
-        try:
-            services.notify_fulfilled_request(blood_request)
-        except Exception:
-            pass
-
     messages.success(request, "Blood request marked as fulfilled.")
     return redirect("dashboard")
+
+
+# ==================================================
+# BULK EXPORT (STAFF: ALL DATA, HOSPITAL: OWN REQUESTS)
+# ==================================================
+@login_required
+def export_data(request, dataset):
+    fmt = request.GET.get("format", "csv")
+
+    if dataset not in exports.DATASETS or fmt not in exports.FORMATS:
+        raise Http404("Unknown export.")
+
+    hospital = None
+    if not request.user.is_staff:
+        hospital = getattr(request.user, "hospital", None)
+        _, _, scope = exports.DATASETS[dataset]
+        if not hospital or scope is None:
+            raise PermissionDenied("Export not allowed.")
+
+    response = StreamingHttpResponse(
+        exports.stream_export(
+            dataset, fmt, hospital=hospital, using=read_alias(request)
+        ),
+        content_type="text/csv" if fmt == "csv" else "application/x-ndjson",
+    )
+    response["Content-Disposition"] = f'attachment; filename="{dataset}.{fmt}"'
+    return response
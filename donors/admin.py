@@ -1,3 +1,66 @@
-from django.contrib import admin
+from django.contrib import admin, messages
 
-# Register your models here.
+from analytics import rollups
+from obdms.admin_tools import LargeTableAdmin
+from obdms.caching import bump_version
+
+from .models import ArchivedDonorNotification, Donor, DonorDonation, DonorNotification
+from .services import invalidate_unread_count
+
+
+# Search uses exact matches on indexed columns only (no LIKE '%...%' scans)
+@admin.register(Donor)
+class DonorAdmin(LargeTableAdmin):
+    list_display = ("full_name", "blood_group", "city", "status", "user", "created_at")
+    list_filter = ("status", "blood_group")
+    list_select_related = ("user",)
+    raw_id_fields = ("user",)
+    search_fields = ("user__username__exact", "city__exact", "blood_group__exact")
+    search_help_text = "Exact login email, city (e.g. Mumbai) or blood group."
+    actions = ["deactivate"]
+
+    @admin.action(description="Deactivate selected donors")
+    def deactivate(self, request, queryset):
+        # One UPDATE; it sends no signals, so keep the rollups and
+        # the cached listings in step by hand
+        rollups.donors_deactivated(queryset)
+        updated = queryset.filter(status="active").update(status="inactive")
+        bump_version("donors")
+        self.message_user(request, f"Deactivated {updated} donors.", messages.SUCCESS)
+
+
+@admin.register(DonorDonation)
+class DonorDonationAdmin(LargeTableAdmin):
+    list_display = ("donor", "request", "units_donated", "donation_date", "status")
+    list_select_related = ("donor", "request")
+    raw_id_fields = ("donor", "request")
+    search_fields = ("donor__user__username__exact",)
+    search_help_text = "Exact donor login email."
+
+
+@admin.register(DonorNotification)
+class DonorNotificationAdmin(LargeTableAdmin):
+    list_display = ("title", "donor", "is_read", "created_at")
+    list_filter = ("is_read",)
+    list_select_related = ("donor",)
+    raw_id_fields = ("donor",)
+    search_fields = ("donor__user__username__exact",)
+    search_help_text = "Exact donor login email."
+    actions = ["mark_read"]
+
+    @admin.action(description="Mark selected notifications as read")
+    def mark_read(self, request, queryset):
+        unread = queryset.filter(is_read=False)
+        donor_ids = set(unread.values_list("donor_id", flat=True).distinct())
+        updated = unread.update(is_read=True)
+        for donor_id in donor_ids:
+            invalidate_unread_count(donor_id)
+        self.message_user(request, f"Marked {updated} notifications as read.", messages.SUCCESS)
+
+
+@admin.register(ArchivedDonorNotification)
+class ArchivedDonorNotificationAdmin(LargeTableAdmin):
+    list_display = ("title", "donor_id", "created_at", "archived_at")
+    raw_id_fields = ("donor",)
+    search_fields = ("donor__user__username__exact",)
+    search_help_text = "Exact donor login email."
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class DonorsConfig(AppConfig):
     name = 'donors'
+
+    def ready(self):
+        from . import signals  # noqa: F401
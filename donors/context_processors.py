@@ -0,0 +1,22 @@
+from .services import unread_notification_count
+
+
+def donor_notifications(request):
+    """
+    Exposes the unread badge count to every template.
+    Passed as a callable so pages that never render the badge
+    don't pay for the user or count lookup.
+    """
+
+    def unread_count():
+        user = getattr(request, "user", None)
+        if not (user and user.is_authenticated):
+            return 0
+
+        donor = getattr(user, "donor", None)
+        if not donor:
+            return 0
+
+        return unread_notification_count(donor.id)
+
+    return {"unread_notifications_count": unread_count}
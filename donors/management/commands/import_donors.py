@@ -0,0 +1,205 @@
+import csv
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, transaction
+
+from accounts.hashing import hash_password, init_worker
+from analytics import rollups
+from obdms.caching import bump_version
+from donors.forms import DonorRegistrationForm
+from donors.models import Donor
+
+
+# ==================================================
+# INPUT
+# ==================================================
+def read_rows(path, fmt):
+    """
+    Yield (line_number, row dict, parse error or None) without loading
+    the file. A line that can't be parsed comes back as {"raw": line}.
+    """
+    with open(path, newline="", encoding="utf-8") as fh:
+        if fmt == "jsonl":
+            for number, line in enumerate(fh, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError as exc:
+                    yield number, {"raw": line.strip()}, f"Invalid JSON: {exc}"
+                    continue
+                if not isinstance(row, dict):
+                    yield number, {"raw": line.strip()}, "Each line must be a JSON object."
+                    continue
+                yield number, row, None
+        else:
+            # Header is line 1
+            for number, row in enumerate(csv.DictReader(fh), start=2):
+                yield number, row, None
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+# ==================================================
+# COMMAND
+# ==================================================
+class Command(BaseCommand):
+    help = (
+        "Bulk-register donors from CSV/JSONL (same rules as the "
+        "registration form). Rejected rows go to a reject file."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--format", choices=("csv", "jsonl"))
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+        parser.add_argument(
+            "--rejects",
+            help="Reject file (JSONL, default: <path>.rejects.jsonl)",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        if not os.path.exists(path):
+            raise CommandError(f"{path} does not exist.")
+
+        fmt = options["format"] or ("jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv")
+        rejects_path = options["rejects"] or f"{path}.rejects.jsonl"
+
+        self.imported = 0
+        self.rejected = 0
+
+        with open(rejects_path, "w", encoding="utf-8") as rejects, ProcessPoolExecutor(
+            max_workers=options["workers"],
+            initializer=init_worker,
+        ) as pool:
+            self.rejects = rejects
+            self.pool = pool
+            self.workers = options["workers"]
+
+            for chunk in chunked(read_rows(path, fmt), options["batch_size"]):
+                self.import_chunk(chunk)
+                self.stdout.write(f"imported {self.imported}, rejected {self.rejected}")
+
+        # bulk_create skips post_save, so invalidate cached listings here
+        if self.imported:
+            bump_version("donors")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Done: {self.imported} imported, {self.rejected} rejected ({rejects_path})."
+        ))
+
+    # ==================================================
+    # ONE CHUNK = VALIDATE, DEDUPE, HASH, ONE TRANSACTION
+    # ==================================================
+    def import_chunk(self, chunk):
+        valid = []
+        seen = set()
+
+        for number, row, error in chunk:
+            if error:
+                self.reject(number, row, {"__all__": error})
+                continue
+
+            form = DonorRegistrationForm(data=row)
+            if not form.is_valid():
+                self.reject(number, row, form.errors.get_json_data())
+                continue
+
+            email = form.cleaned_data["email"]
+            if email in seen:
+                self.reject(number, row, {"email": "Duplicate email in file."})
+                continue
+            seen.add(email)
+
+            valid.append((number, row, form))
+
+        # One lookup for the whole chunk instead of one per row
+        existing = set(
+            User.objects.filter(username__in=seen).values_list("username", flat=True)
+        )
+        valid = [item for item in valid if self._keep_new(item, existing)]
+
+        if not valid:
+            return
+
+        hashes = list(self.pool.map(
+            hash_password,
+            [row.get("password") for _, row, _ in valid],
+            chunksize=max(1, len(valid) // (self.workers * 4)),
+        ))
+
+        try:
+            self.write(valid, hashes)
+        except IntegrityError:
+            # Someone registered one of these emails meanwhile; retry without them
+            existing = set(
+                User.objects.filter(username__in=seen).values_list("username", flat=True)
+            )
+            kept = [
+                (item, pw) for item, pw in zip(valid, hashes)
+                if self._keep_new(item, existing)
+            ]
+            if kept:
+                self.write_or_reject(kept)
+
+    def _keep_new(self, item, existing):
+        number, row, form = item
+        if form.cleaned_data["email"] in existing:
+            self.reject(number, row, {"email": "Email already registered."})
+            return False
+        return True
+
+    def write_or_reject(self, kept):
+        """kept: (item, hash) pairs. Falls back to row by row on a conflict."""
+        try:
+            self.write([item for item, _ in kept], [pw for _, pw in kept])
+        except IntegrityError:
+            for item, password_hash in kept:
+                try:
+                    self.write([item], [password_hash])
+                except IntegrityError as exc:
+                    number, row, _ = item
+                    self.reject(number, row, {"__all__": f"Could not be saved: {exc}"})
+
+    def write(self, valid, hashes):
+        with transaction.atomic():
+            users = User.objects.bulk_create([
+                User(
+                    username=form.cleaned_data["email"],
+                    email=form.cleaned_data["email"],
+                    password=password_hash,
+                )
+                for (_, _, form), password_hash in zip(valid, hashes)
+            ])
+
+            donors = []
+            for (_, _, form), user in zip(valid, users):
+                donor = form.save(commit=False)
+                donor.user = user
+                donor.city = donor.city.strip().title()
+                aadhaar = form.cleaned_data.get("aadhaar_number")
+                if aadhaar:
+                    donor.aadhaar_last4 = aadhaar[-4:]
+                donors.append(donor)
+
+            Donor.objects.bulk_create(donors)
+            # bulk_create sends no post_save
+            rollups.donors_added(donors)
+
+        self.imported += len(donors)
+
+    def reject(self, number, row, errors):
+        row = {k: v for k, v in row.items() if k not in ("password", "aadhaar_number")}
+        self.rejects.write(json.dumps({"line": number, "row": row, "errors": errors}) + "\n")
+        self.rejected += 1
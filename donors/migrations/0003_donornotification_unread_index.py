@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('donors', '0002_alter_donor_options_remove_donordonation_blood_group_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='donornotification',
+            index=models.Index(fields=['donor', 'is_read', 'created_at'], name='donor_notif_unread_idx'),
+        ),
+    ]
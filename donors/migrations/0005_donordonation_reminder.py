@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blood_requests', '0007_bloodrequest_expired_status'),
+        ('donors', '0004_archiveddonornotification'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='donordonation',
+            name='reminder_sent_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='donordonation',
+            index=models.Index(condition=models.Q(('reminder_sent_at__isnull', True)), fields=['donation_date', 'id'], name='donation_reminder_due_idx'),
+        ),
+    ]
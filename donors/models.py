@@ -114,6 +114,10 @@ class DonorDonation(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Set once the "eligible again" reminder for this donation has been
+    # handled (donors.reminders); NULL rows are the job's work queue
+    reminder_sent_at = models.DateTimeField(null=True, blank=True, editable=False)
+
     class Meta:
         constraints = [
             models.UniqueConstraint(
@@ -121,6 +125,13 @@ class DonorDonation(models.Model):
                 name="unique_donor_request_donation",
             )
         ]
+        indexes = [
+            models.Index(
+                fields=["donation_date", "id"],
+                condition=models.Q(reminder_sent_at__isnull=True),
+                name="donation_reminder_due_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.donor.full_name} → {self.units_donated} units"
@@ -171,6 +182,38 @@ class DonorNotification(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["donor", "is_read", "created_at"],
+                name="donor_notif_unread_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.donor.full_name} - {self.title}"
+
+
+# ==================================================
+# ARCHIVED NOTIFICATIONS (manage.py archive_closed)
+# ==================================================
+class ArchivedDonorNotification(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    donor = models.ForeignKey(
+        Donor,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="+",
+    )
+
+    title = models.CharField(max_length=200)
+    message = models.TextField()
+
+    is_read = models.BooleanField(default=True)
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.donor_id} - {self.title} [archived]"
@@ -0,0 +1,111 @@
+"""
+"Eligible again" reminders: once DONATION_COOLDOWN_DAYS have passed since
+a donation, the donor gets an in-app notification and an email.
+
+Donations with reminder_sent_at IS NULL are the work queue. They are
+read through the partial (donation_date, id) index, so each batch is one
+range scan that only ever sees rows still owed a reminder. Marking a
+batch and creating its notifications happen in one transaction. A
+crashed or time-boxed run resumes where it stopped, and a rerun never
+reminds anyone twice.
+
+A donation is marked without a reminder when:
+- the donor has donated again since (the newer donation reminds later);
+- its cooldown ended more than REMINDER_LOOKBACK_DAYS ago (history that
+  predates the job).
+"""
+
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from obdms.jobs import enqueue
+from obdms.writes import retry_write
+from . import services
+from .models import DonorDonation, DonorNotification
+
+
+def due_donations(today=None):
+    today = today or timezone.localdate()
+    cutoff = today - timedelta(days=settings.DONATION_COOLDOWN_DAYS)
+
+    return DonorDonation.objects.filter(
+        reminder_sent_at__isnull=True,
+        donation_date__lte=cutoff,
+    ).order_by("donation_date", "pk")
+
+
+@retry_write
+def remind_batch(donation_ids, today=None):
+    """Returns the ids of the donors reminded."""
+    today = today or timezone.localdate()
+    oldest = today - timedelta(
+        days=settings.DONATION_COOLDOWN_DAYS + settings.REMINDER_LOOKBACK_DAYS
+    )
+
+    newer = DonorDonation.objects.filter(donor_id=OuterRef("donor_id")).filter(
+        Q(donation_date__gt=OuterRef("donation_date"))
+        | Q(donation_date=OuterRef("donation_date"), pk__gt=OuterRef("pk"))
+    )
+    rows = list(
+        DonorDonation.objects.filter(pk__in=donation_ids, reminder_sent_at__isnull=True)
+        .annotate(superseded=Exists(newer))
+        .values("id", "donor_id", "donation_date", "superseded")
+    )
+    if not rows:
+        return []
+
+    donor_ids = sorted({
+        row["donor_id"]
+        for row in rows
+        if not row["superseded"] and row["donation_date"] >= oldest
+    })
+
+    DonorDonation.objects.filter(pk__in=[row["id"] for row in rows]).update(
+        reminder_sent_at=timezone.now()
+    )
+    DonorNotification.objects.bulk_create([
+        DonorNotification(
+            donor_id=donor_id,
+            title="You Can Donate Again",
+            message=(
+                "Your recovery period after your last donation is over. "
+                "Keep your availability switched on so hospitals nearby can reach you."
+            ),
+        )
+        for donor_id in donor_ids
+    ])
+
+    def after_commit():
+        # bulk_create sends no signals
+        for donor_id in donor_ids:
+            services.invalidate_unread_count(donor_id)
+        enqueue(services.notify_eligible_donors, donor_ids)
+
+    transaction.on_commit(after_commit)
+    return donor_ids
+
+
+def send_eligibility_reminders(batch_size=None, time_budget=None):
+    """Scheduler job. Returns how many donors were reminded."""
+    batch_size = batch_size or settings.REMINDER_BATCH_SIZE
+    if time_budget is None:
+        time_budget = settings.REMINDER_TIME_BUDGET
+    deadline = time.monotonic() + time_budget
+    today = timezone.localdate()
+    reminded = 0
+
+    # At least one batch per run, however small the budget
+    while True:
+        ids = list(due_donations(today).values_list("pk", flat=True)[:batch_size])
+        if not ids:
+            break
+        reminded += len(remind_batch(ids, today))
+        if time.monotonic() >= deadline:
+            break
+
+    return reminded
@@ -0,0 +1,102 @@
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import EmailMessage
+
+from blood_requests.services import send_emails
+from obdms.writes import defer
+from .models import Donor, DonorNotification
+
+logger = logging.getLogger(__name__)
+
+
+UNREAD_COUNT_TIMEOUT = 300
+
+
+# ==================================================
+# UNREAD NOTIFICATION COUNTER (NAVBAR BADGE)
+# ==================================================
+def _unread_count_key(donor_id):
+    return f"donors:unread:{donor_id}"
+
+
+def unread_notification_count(donor_id):
+    """
+    Cached count of unread notifications.
+    Served from the (donor, is_read, created_at) index on a miss.
+    """
+    key = _unread_count_key(donor_id)
+    count = cache.get(key)
+
+    if count is None:
+        count = DonorNotification.objects.filter(
+            donor_id=donor_id,
+            is_read=False,
+        ).count()
+        cache.set(key, count, UNREAD_COUNT_TIMEOUT)
+
+    return count
+
+
+def invalidate_unread_count(donor_id):
+    cache.delete(_unread_count_key(donor_id))
+
+
+def _apply_read_receipts(items):
+    """items: (donor_id, notification_id) pairs, possibly from many requests."""
+    DonorNotification.objects.filter(
+        id__in=[notification_id for _, notification_id in items],
+        is_read=False,
+    ).update(is_read=True)
+
+    for donor_id in {donor_id for donor_id, _ in items}:
+        invalidate_unread_count(donor_id)
+
+
+def mark_notifications_read(donor_id, notifications):
+    """
+    Mark ONLY the given (already rendered) notifications as read.
+    Read receipts are low priority: with DEFER_LOW_PRIORITY_WRITES they
+    are batched by the background writer and the badge is adjusted now.
+    """
+    unread_ids = [n.id for n in notifications if not n.is_read]
+
+    if not unread_ids:
+        return 0
+
+    applied = defer(_apply_read_receipts, [(donor_id, pk) for pk in unread_ids])
+
+    if not applied:
+        count = unread_notification_count(donor_id)
+        cache.set(
+            _unread_count_key(donor_id),
+            max(0, count - len(unread_ids)),
+            UNREAD_COUNT_TIMEOUT,
+        )
+
+    return len(unread_ids)
+
+
+# ==================================================
+# ELIGIBILITY REMINDERS (donors.reminders; job queue)
+# ==================================================
+def notify_eligible_donors(donor_ids):
+    """Email each donor that they can donate again (one mail connection)."""
+    donors = Donor.objects.filter(pk__in=donor_ids).select_related("user")
+
+    send_emails("reminder", (
+        (EmailMessage(
+            "You Can Donate Blood Again",
+            (
+                f"Hi {donor.first_name}, your recovery period after your last "
+                f"donation is over. {donor.blood_group} donors are always needed "
+                f"in {donor.city}; keep your availability switched on so "
+                "hospitals can reach you."
+            ),
+            settings.DEFAULT_FROM_EMAIL,
+            [donor.user.email],
+        ), f"donor {donor.id}")
+        for donor in donors
+        if donor.user.email
+    ))
@@ -0,0 +1,25 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from obdms.caching import bump_version
+
+from .models import Donor, DonorNotification
+from .services import invalidate_unread_count
+
+
+# ==================================================
+# KEEP NAVBAR BADGE IN SYNC
+# ==================================================
+@receiver(post_save, sender=DonorNotification)
+@receiver(post_delete, sender=DonorNotification)
+def notification_changed(sender, instance, **kwargs):
+    invalidate_unread_count(instance.donor_id)
+
+
+# ==================================================
+# INVALIDATE CACHED DONOR LISTINGS
+# ==================================================
+@receiver(post_save, sender=Donor)
+@receiver(post_delete, sender=Donor)
+def donor_changed(sender, **kwargs):
+    bump_version("donors")
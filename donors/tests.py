@@ -1,3 +1,191 @@
-from django.test import TestCase
+import io
+import json
+import os
+import tempfile
+from datetime import timedelta
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from analytics import rollups
+from analytics.models import CityBloodGroupStock
+from blood_requests.models import BloodRequest, RequestMatch
+from obdms.query_budgets import CITY, QueryBudgetMixin, build_fixture
+from . import reminders, urls, views
+from .models import Donor, DonorDonation, DonorNotification
+
+
+class DonorViewQueryBudgetTests(QueryBudgetMixin, TestCase):
+    URLS = urls
+
+    BUDGETS = {
+        "register-donor": 0,
+        "donors-page": 1,
+        "donor-dashboard": 9,
+        "donor-profile": 5,
+        "donor-profile-edit": 5,
+        "donor-donations": 7,
+        "donation-detail": 6,
+        "donor-matching-requests": 8,
+        "respond-request": 15,
+        "toggle-availability": 5,
+        "donor-notifications": 8,
+    }
+
+    def calls(self, fx):
+        donor = fx.donor_user
+        return {
+            "register-donor": (None, "get", reverse("donors:register-donor"), None),
+            "donors-page": (None, "get", reverse("donors:donors-page"), None),
+            "donor-dashboard": (donor, "get", reverse("donors:donor-dashboard"), None),
+            "donor-profile": (donor, "get", reverse("donors:donor-profile"), None),
+            "donor-profile-edit": (donor, "get", reverse("donors:donor-profile-edit"), None),
+            "donor-donations": (donor, "get", reverse("donors:donor-donations"), None),
+            "donation-detail": (
+                donor, "get", reverse("donors:donation-detail", args=[fx.donation.id]), None,
+            ),
+            "donor-matching-requests": (
+                donor, "get", reverse("donors:donor-matching-requests"), None,
+            ),
+            "respond-request": (
+                donor, "get",
+                reverse("donors:respond-request", args=[fx.pending_match.id, "accept"]),
+                None,
+            ),
+            "toggle-availability": (donor, "get", reverse("donors:toggle-availability"), None),
+            "donor-notifications": (donor, "get", reverse("donors:donor-notifications"), None),
+        }
+
+
+class DonorAdminTests(TestCase):
+    def test_deactivate_action_keeps_rollups_in_step(self):
+        fx = build_fixture(3)
+        rollups.rebuild()
+        client = Client()
+        client.force_login(User.objects.create(
+            username="admin@budget.test", is_staff=True, is_superuser=True,
+        ))
+
+        selected = list(Donor.objects.values_list("pk", flat=True)[:2])
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.post(reverse("admin:donors_donor_changelist"), {
+                "action": "deactivate", "_selected_action": selected,
+            })
+
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(Donor.objects.filter(pk__in=selected, status="active").exists())
+        stock = CityBloodGroupStock.objects.get(city=CITY, blood_group=fx.donor.blood_group)
+        self.assertEqual(stock.active_donors, Donor.objects.filter(status="active").count())
+
+
+class DonorResponseTests(TestCase):
+    def setUp(self):
+        self.fx = build_fixture(2)
+        rollups.rebuild()
+        # As respond_to_request read it, before its write transaction
+        self.match = RequestMatch.objects.select_related("request").get(pk=self.fx.pending_match.pk)
+
+    def _open_stock(self):
+        request = self.fx.open_request
+        stock = CityBloodGroupStock.objects.get(city=request.city, blood_group=request.blood_group)
+        return stock.open_requests
+
+    def test_accept_moves_open_request_to_matched(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertTrue(views._record_response(self.match, True))
+
+        self.assertEqual(BloodRequest.objects.get(pk=self.match.request_id).status, "matched")
+        self.assertEqual(self._open_stock(), BloodRequest.objects.filter(
+            status="open", city=self.match.request.city,
+            blood_group=self.match.request.blood_group,
+        ).count())
+
+    def test_accept_after_concurrent_cancel_keeps_it_cancelled(self):
+        BloodRequest.objects.filter(pk=self.match.request_id).update(status="cancelled")
+        notifications = DonorNotification.objects.count()
+        open_stock = self._open_stock()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertFalse(views._record_response(self.match, True))
+
+        self.assertEqual(BloodRequest.objects.get(pk=self.match.request_id).status, "cancelled")
+        self.match.refresh_from_db()
+        self.assertIsNone(self.match.accepted)
+        self.assertEqual(DonorNotification.objects.count(), notifications)
+        self.assertEqual(self._open_stock(), open_stock)
+
+
+class ImportDonorsTests(TestCase):
+    ROW = {
+        "email": "imported@budget.test", "password": "secret-pass-1",
+        "first_name": "Asha", "last_name": "Kumari", "date_of_birth": "1990-01-01",
+        "gender": "female", "marital_status": "unmarried", "blood_group": "B+",
+        "phone": "9876543210", "aadhaar_number": "123412341234",
+        "address": "1 Main Road", "state": "Bihar", "city": "patna", "pincode": "800001",
+    }
+
+    def test_malformed_lines_are_rejected_not_fatal(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "donors.jsonl")
+            with open(path, "w", encoding="utf-8") as fh:
+                fh.write('{"email": "broken"\n')
+                fh.write('["not", "an", "object"]\n')
+                fh.write(json.dumps(self.ROW) + "\n")
+
+            call_command("import_donors", path, workers=1, stdout=io.StringIO())
+
+            with open(f"{path}.rejects.jsonl", encoding="utf-8") as fh:
+                rejects = [json.loads(line) for line in fh]
+
+        self.assertEqual([reject["line"] for reject in rejects], [1, 2])
+        self.assertTrue(Donor.objects.filter(user__username=self.ROW["email"]).exists())
+
+
+@override_settings(
+    JOBS_RUN_INLINE=True,
+    EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+)
+class EligibilityReminderTests(TestCase):
+    def setUp(self):
+        self.fx = build_fixture(3)
+
+    def _donated(self, days_ago):
+        # Several donations on one day: only the newest one reminds
+        DonorDonation.objects.filter(donor=self.fx.donor).update(
+            donation_date=timezone.localdate() - timedelta(days=days_ago)
+        )
+
+    def _run(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return reminders.send_eligibility_reminders(batch_size=1)
+
+    def test_reminds_once_after_cooldown(self):
+        self._donated(settings.DONATION_COOLDOWN_DAYS - 1)
+        self.assertEqual(self._run(), 0)
+        self.assertFalse(reminders.due_donations().exists())
+
+        self._donated(settings.DONATION_COOLDOWN_DAYS)
+        self.assertGreater(reminders.due_donations().count(), 1)
+        self.assertEqual(self._run(), 1)
+        self.assertEqual(self._run(), 0)
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, [self.fx.donor_user.email])
+        self.assertEqual(
+            DonorNotification.objects.filter(
+                donor=self.fx.donor, title="You Can Donate Again"
+            ).count(),
+            1,
+        )
+
+    def test_old_history_is_skipped(self):
+        self._donated(settings.DONATION_COOLDOWN_DAYS + settings.REMINDER_LOOKBACK_DAYS + 1)
+
+        self.assertEqual(self._run(), 0)
+        self.assertFalse(reminders.due_donations().exists())
+        self.assertEqual(len(mail.outbox), 0)
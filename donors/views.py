@@ -1,21 +1,57 @@
+from asgiref.sync import sync_to_async
 from django.db import transaction
 from django.contrib.auth.models import User
 from django.contrib import messages
-from django.shortcuts import get_object_or_404, redirect, render
+from django.shortcuts import aget_object_or_404, get_object_or_404, redirect, render
 from django.contrib.auth.decorators import login_required
-from django.db.models import Q
+from django.db.models import Count, Max, Q
 from django.core.exceptions import PermissionDenied
+from django.core.paginator import Paginator
+from django.template.loader import render_to_string
+from django.utils import timezone
 
 from .forms import DonorRegistrationForm
 from .models import Donor, DonorDonation, DonorNotification
+from analytics import rollups
 from blood_requests.models import BloodRequest, RequestMatch
 from blood_requests import services
+from obdms import caching, metrics
+from obdms.conditional import conditional_page
+from obdms.routers import replica_reads
+from obdms.writes import retry_write
+from .services import mark_notifications_read
+
+
+NOTIFICATIONS_PER_PAGE = 20
+
+
+# ==================================================
+# CONDITIONAL GET VALIDATORS
+# ==================================================
+def _donors_page_validator(request):
+    return (caching.get_version("donors"),), None
+
+
+def _matching_requests_validator(request):
+    state = RequestMatch.objects.filter(
+        donor__user=request.user,
+        accepted__isnull=True,
+        request__status="open",
+    ).aggregate(
+        count=Count("id"),
+        created=Max("created_at"),
+        updated=Max("request__updated_at"),
+    )
+    return (state["count"], state["created"], state["updated"]), state["updated"]
 
 
 # ==================================================
-# PUBLIC: DONORS LIST
+# PUBLIC: DONORS LIST (ASYNC, CACHED)
 # ==================================================
-def donors_page(request):
+@replica_reads
+@conditional_page(_donors_page_validator)
+@caching.cache_anonymous_page("donors")
+async def donors_page(request):
     blood_group = request.GET.get("blood_group", "").strip()
     city = request.GET.get("city", "").strip()
     location = request.GET.get("location", "").strip()
@@ -35,8 +71,19 @@ def donors_page(request):
             | Q(address__icontains=location)
         )
 
-    return render(request, "donor/list.html", {
-        "donors": qs.order_by("first_name"),
+    async def build_table():
+        donors = [donor async for donor in qs.order_by("first_name")]
+        return render_to_string("donor/_table.html", {"donors": donors})
+
+    version = await sync_to_async(caching.get_version)("donors")
+    donor_table = await caching.aget_fragment(
+        "donor_table",
+        [version, blood_group, city, location],
+        build_table,
+    )
+
+    return await sync_to_async(render)(request, "donor/list.html", {
+        "donor_table": donor_table,
         "blood_group": blood_group,
         "city": city,
         "location": location,
@@ -89,6 +136,7 @@ def register_donor(request):
 # DONOR DASHBOARD
 # ==================================================
 @login_required
+@replica_reads
 def donor_dashboard(request):
     donor = get_object_or_404(Donor, user=request.user)
 
@@ -153,13 +201,17 @@ def edit_donor_profile(request):
 def donor_donations(request):
     donor = get_object_or_404(Donor, user=request.user)
 
-    donations = DonorDonation.objects.filter(donor=donor).order_by("-donation_date")
+    donations = DonorDonation.objects.filter(donor=donor)
+    stats = donations.aggregate(
+        total=Count("id"),
+        completed=Count("id", filter=Q(status="completed")),
+    )
 
     return render(request, "donor/donations.html", {
-        "donations": donations,
-        "total": donations.count(),
-        "completed": donations.filter(status="completed").count(),
-        "pending": donations.exclude(status="completed").count(),
+        "donations": donations.select_related("request").order_by("-donation_date"),
+        "total": stats["total"],
+        "completed": stats["completed"],
+        "pending": stats["total"] - stats["completed"],
     })
 
 
@@ -173,7 +225,7 @@ def donation_detail(request, donation_id):
     donor = get_object_or_404(Donor, user=request.user)
 
     donation = get_object_or_404(
-        DonorDonation,
+        DonorDonation.objects.select_related("request__hospital", "request__requested_by"),
         id=donation_id,
         donor=donor,
     )
@@ -188,23 +240,61 @@ def donation_detail(request, donation_id):
 
 
 # ==================================================
-# MATCHING REQUESTS (PENDING ONLY)
+# MATCHING REQUESTS (PENDING ONLY, ASYNC)
 # ==================================================
 @login_required
-def donor_matching_requests(request):
-    donor = get_object_or_404(Donor, user=request.user)
-
-    matches = RequestMatch.objects.filter(
-        donor=donor,
-        accepted__isnull=True,
-        request__status="open",
-    ).select_related("request")
+@conditional_page(_matching_requests_validator)
+async def donor_matching_requests(request):
+    user = await request.auser()
+    donor = await aget_object_or_404(Donor, user=user)
+
+    matches = [
+        match async for match in RequestMatch.objects.filter(
+            donor=donor,
+            accepted__isnull=True,
+            request__status="open",
+        ).select_related("request__hospital", "request__requested_by")
+    ]
 
-    return render(request, "donor/matching_requests.html", {
+    return await sync_to_async(render)(request, "donor/matching_requests.html", {
         "matches": matches,
     })
 
 
+@retry_write
+def _record_response(match, accepted):
+    """False (nothing recorded) if the request closed since it was read."""
+    now = timezone.now()
+
+    if accepted:
+        # match.request was read before this transaction: a cancel or
+        # expiry may have closed it since, so move it only if still open
+        req = match.request
+        moved = BloodRequest.objects.filter(pk=req.pk, status="open").update(
+            status="matched", updated_at=now
+        )
+        if moved:
+            # .update() sends no signals
+            rollups.requests_closed([{**vars(req), "status": "open"}])
+        elif not BloodRequest.objects.filter(pk=req.pk, status="matched").exists():
+            return False
+
+    # RequestMatch.clean() checks the request as read (still open)
+    match.accepted = accepted
+    match.responded_at = now
+    match.save(update_fields=["accepted", "responded_at"])
+
+    if accepted:
+        match.request.status = "matched"
+        match.request.updated_at = now
+        DonorNotification.objects.create(
+            donor=match.donor,
+            title="Request Accepted",
+            message="You have accepted a blood request. Please coordinate with the hospital.",
+        )
+    return True
+
+
 @login_required
 def respond_to_request(request, match_id, action):
     try:
@@ -225,26 +315,24 @@ def respond_to_request(request, match_id, action):
         messages.error(request, "Invalid action.")
         return redirect("donors:donor-matching-requests")
 
-    match.accepted = True if action == "accept" else False
-    match.save(update_fields=["accepted"])
+    if not _record_response(match, action == "accept"):
+        messages.error(request, "This blood request has just been closed.")
+        return redirect("donors:donor-matching-requests")
+
+    metrics.inc("obdms_donor_responses_total", response=action)
+    metrics.observe(
+        "obdms_donor_response_seconds",
+        (match.responded_at - match.created_at).total_seconds(),
+        response=action,
+    )
 
     if match.accepted:
-        req = match.request
-        if req.status == "open":
-            req.status = "matched"
-            req.save(update_fields=["status"])
-
+        # After commit: SMTP never runs inside the write transaction
         try:
             services.send_acceptance_email_to_requester(match)
         except Exception:
             pass
 
-        DonorNotification.objects.create(
-            donor=match.donor,
-            title="Request Accepted",
-            message="You have accepted a blood request. Please coordinate with the hospital.",
-        )
-
     messages.success(request, "Your response has been recorded.")
     return redirect("donors:donor-matching-requests")
 
@@ -256,7 +344,7 @@ def toggle_availability(request):
     donor = get_object_or_404(Donor, user=request.user)
 
     donor.status = "inactive" if donor.status == "active" else "active"
-    donor.save(update_fields=["status"])
+    retry_write(donor.save)(update_fields=["status"])
 
     messages.success(request, f"You are now marked as {donor.status.upper()}.")
     return redirect("donors:donor-dashboard")
@@ -269,11 +357,16 @@ def toggle_availability(request):
 def donor_notifications(request):
     donor = get_object_or_404(Donor, user=request.user)
 
-    notifications = donor.notifications.all()
-    notifications.filter(is_read=False).update(is_read=True)
+    paginator = Paginator(donor.notifications.all(), NOTIFICATIONS_PER_PAGE)
+    page = paginator.get_page(request.GET.get("page"))
+    notifications = list(page.object_list)
+
+    # Only what is on this page gets marked read; the in-memory
+    # objects keep is_read=False so the "New" badge still renders.
+    mark_notifications_read(donor.id, notifications)
 
     return render(
         request,
         "donor/notifications.html",
-        {"notifications": notifications},
+        {"notifications": notifications, "page_obj": page},
     )
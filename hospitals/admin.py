@@ -1,3 +1,13 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import Hospital
+
+
+@admin.register(Hospital)
+class HospitalAdmin(admin.ModelAdmin):
+    list_display = ("hospital_name", "category", "city", "licence_number", "user")
+    list_filter = ("category",)
+    list_select_related = ("user",)
+    raw_id_fields = ("user",)
+    search_fields = ("licence_number__exact", "user__username__exact")
+    search_help_text = "Exact licence number or login email."
@@ -33,6 +33,8 @@ class Hospital(models.Model):
     )
 
     created_at = models.DateTimeField(auto_now_add=True)
+    # Part of the dashboard's conditional GET validator (profile edits)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["hospital_name"]
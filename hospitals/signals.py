@@ -0,0 +1,15 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from obdms.caching import bump_version
+
+from .models import Hospital
+
+
+# ==================================================
+# INVALIDATE CACHED HOSPITAL LISTINGS
+# ==================================================
+@receiver(post_save, sender=Hospital)
+@receiver(post_delete, sender=Hospital)
+def hospital_changed(sender, **kwargs):
+    bump_version("hospitals")
@@ -1,3 +1,114 @@
-from django.test import TestCase
+from django.core import mail
+from django.core.exceptions import ValidationError
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
 
-# Create your tests here.
+from blood_requests import services
+from blood_requests.models import BloodRequest, RequestMatch
+from obdms.query_budgets import CITY, QueryBudgetMixin, build_fixture
+from . import urls
+
+
+class HospitalViewQueryBudgetTests(QueryBudgetMixin, TestCase):
+    URLS = urls
+
+    BUDGETS = {
+        "hospitals-page": 1,
+        "register-hospital": 0,
+        "hospital-dashboard": 7,
+        "hospital-profile": 4,
+        "hospital-requests": 7,
+        "create-blood-request": 4,
+        "cancel-blood-request": 7,
+    }
+
+    def calls(self, fx):
+        hospital = fx.hospital_user
+        return {
+            "hospitals-page": (None, "get", reverse("hospital:hospitals-page"), None),
+            "register-hospital": (None, "get", reverse("hospital:register-hospital"), None),
+            "hospital-dashboard": (hospital, "get", reverse("hospital:hospital-dashboard"), None),
+            "hospital-profile": (hospital, "get", reverse("hospital:hospital-profile"), None),
+            "hospital-requests": (hospital, "get", reverse("hospital:hospital-requests"), None),
+            "create-blood-request": (
+                hospital, "post", reverse("hospital:create-blood-request"),
+                {"blood_group": "O+", "units_required": 2},
+            ),
+            "cancel-blood-request": (
+                hospital, "get",
+                reverse("hospital:cancel-blood-request", args=[fx.open_request.id]),
+                None,
+            ),
+        }
+
+
+@override_settings(
+    JOBS_RUN_INLINE=True,
+    EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+)
+class HospitalRequestPipelineTests(TestCase):
+    def setUp(self):
+        self.fx = build_fixture(3)
+        self.client = Client()
+        self.client.force_login(self.fx.hospital_user)
+
+    def test_create_matches_and_notifies(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("hospital:create-blood-request"), {
+                "blood_group": "O+", "units_required": 2,
+            })
+
+        created = BloodRequest.objects.filter(hospital=self.fx.hospital).latest("pk")
+        self.assertEqual(created.city, CITY)
+        matched = RequestMatch.objects.filter(request=created).count()
+        self.assertGreater(matched, 0)
+        self.assertEqual(len(mail.outbox), matched)
+
+    def test_cancel_matched_request_notifies_accepted_donor(self):
+        donor = Client()
+        donor.force_login(self.fx.donor_user)
+        with self.captureOnCommitCallbacks(execute=True):
+            donor.get(reverse(
+                "donors:respond-request", args=[self.fx.pending_match.id, "accept"]
+            ))
+        self.fx.open_request.refresh_from_db()
+        self.assertEqual(self.fx.open_request.status, "matched")
+        mail.outbox.clear()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.get(
+                reverse("hospital:cancel-blood-request", args=[self.fx.open_request.id])
+            )
+
+        self.fx.open_request.refresh_from_db()
+        self.assertEqual(self.fx.open_request.status, "cancelled")
+        self.assertEqual([m.to for m in mail.outbox], [[self.fx.donor_user.email]])
+        with self.assertRaises(ValidationError):
+            services.cancel_request(self.fx.open_request)
+
+
+class HospitalDashboardValidatorTests(TestCase):
+    def test_status_buckets_add_up_to_total(self):
+        fx = build_fixture(2)
+        BloodRequest.objects.filter(pk=fx.open_request.pk).update(status="expired")
+        client = Client()
+        client.force_login(fx.hospital_user)
+
+        stats = client.get(reverse("hospital:hospital-dashboard")).context["stats"]
+        self.assertEqual(stats["expired"], 1)
+        self.assertEqual(stats["total"], sum(v for k, v in stats.items() if k != "total"))
+
+    def test_profile_edit_changes_etag(self):
+        fx = build_fixture(2)
+        client = Client()
+        client.force_login(fx.hospital_user)
+        url = reverse("hospital:hospital-dashboard")
+
+        etag = client.get(url)["ETag"]
+        self.assertEqual(client.get(url, headers={"If-None-Match": etag}).status_code, 304)
+
+        fx.hospital.hospital_name = "Renamed Hospital"
+        fx.hospital.save()
+        response = client.get(url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Renamed Hospital")
@@ -1,33 +1,70 @@
-from django.shortcuts import render, redirect, get_object_or_404
+from asgiref.sync import sync_to_async
+from django.shortcuts import aget_object_or_404, render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.db import transaction
-from django.db.models import Q
+from django.db.models import Count, Max, Q
 from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.template.loader import render_to_string
 
 from .models import Hospital
 from .forms import HospitalProfileForm, HospitalRegistrationForm
+from blood_requests import services
 from blood_requests.models import BloodRequest
+from donors.models import BLOOD_GROUP_CHOICES
+from obdms import caching
+from obdms import idempotency
+from obdms.conditional import conditional_page
+from obdms.routers import replica_reads
 
 
 # ==================================================
-# HOSPITAL DASHBOARD
+# CONDITIONAL GET VALIDATORS
+# ==================================================
+def _hospitals_page_validator(request):
+    return (caching.get_version("hospitals"),), None
+
+
+def _dashboard_validator(request):
+    # The page shows the profile too: its updated_at is part of the state
+    state = (
+        Hospital.objects.filter(user=request.user)
+        .annotate(count=Count("blood_requests"), updated=Max("blood_requests__updated_at"))
+        .values("updated_at", "count", "updated")
+        .first()
+    ) or {"updated_at": None, "count": 0, "updated": None}
+
+    stamps = [stamp for stamp in (state["updated_at"], state["updated"]) if stamp]
+    return (
+        (state["count"], state["updated"], state["updated_at"]),
+        max(stamps) if stamps else None,
+    )
+
+
+# ==================================================
+# HOSPITAL DASHBOARD (ASYNC)
 # ==================================================
 @login_required
-def hospital_dashboard(request):
-    hospital = get_object_or_404(Hospital, user=request.user)
+@replica_reads
+@conditional_page(_dashboard_validator)
+async def hospital_dashboard(request):
+    user = await request.auser()
+    hospital = await aget_object_or_404(Hospital, user=user)
 
     requests_qs = BloodRequest.objects.filter(hospital=hospital)
 
-    stats = {
-        "total": requests_qs.count(),
-        "open": requests_qs.filter(status="open").count(),
-        "matched": requests_qs.filter(status="matched").count(),
-        "fulfilled": requests_qs.filter(status="fulfilled").count(),
-        "cancelled": requests_qs.filter(status="cancelled").count(),
-    }
+    # One aggregate query instead of a COUNT per status
+    stats = await requests_qs.aaggregate(
+        total=Count("id"),
+        open=Count("id", filter=Q(status="open")),
+        matched=Count("id", filter=Q(status="matched")),
+        fulfilled=Count("id", filter=Q(status="fulfilled")),
+        cancelled=Count("id", filter=Q(status="cancelled")),
+        expired=Count("id", filter=Q(status="expired")),
+    )
 
-    return render(request, "hospital/dashboard.html", {
+    return await sync_to_async(render)(request, "hospital/dashboard.html", {
         "hospital": hospital,
         "stats": stats,
         "requests": requests_qs.order_by("-created_at"),
@@ -93,9 +130,12 @@ def register_hospital(request):
     })
 
 # ==================================================
-# PUBLIC: HOSPITAL LIST
+# PUBLIC: HOSPITAL LIST (ASYNC, CACHED)
 # ==================================================
-def hospitals_page(request):
+@replica_reads
+@conditional_page(_hospitals_page_validator)
+@caching.cache_anonymous_page("hospitals")
+async def hospitals_page(request):
     location = request.GET.get("location", "").strip()
 
     qs = Hospital.objects.all()
@@ -107,8 +147,19 @@ def hospitals_page(request):
             | Q(address__icontains=location)
         )
 
-    return render(request, "hospital/list.html", {
-        "hospitals": qs.order_by("hospital_name"),
+    async def build_table():
+        hospitals = [hospital async for hospital in qs.order_by("hospital_name")]
+        return render_to_string("hospital/_table.html", {"hospitals": hospitals})
+
+    version = await sync_to_async(caching.get_version)("hospitals")
+    hospital_table = await caching.aget_fragment(
+        "hospital_table",
+        [version, location],
+        build_table,
+    )
+
+    return await sync_to_async(render)(request, "hospital/list.html", {
+        "hospital_table": hospital_table,
         "location": location,
     })
 
@@ -117,31 +168,32 @@ def hospitals_page(request):
 # CREATE BLOOD REQUEST (HOSPITAL ONLY)
 # ==================================================
 @login_required
+@idempotency.idempotent_post
 def create_blood_request(request):
     hospital = get_object_or_404(Hospital, user=request.user)
 
     if request.method == "POST":
-        blood_group = request.POST.get("blood_group")
-        units = request.POST.get("units_required")
-
-        if not blood_group or not units:
-            messages.error(request, "All fields are required.")
+        try:
+            # Defaults to the hospital's city; matched from the job queue
+            services.create_request(
+                request.user,
+                blood_group=request.POST.get("blood_group"),
+                units_required=request.POST.get("units_required"),
+                city=request.POST.get("city"),
+                hospital=hospital,
+                base_url=request.build_absolute_uri("/"),
+            )
+        except ValidationError as exc:
+            messages.error(request, exc.messages[0])
             return redirect("hospital:create-blood-request")
 
-        BloodRequest.objects.create(
-            requested_by=request.user,
-            hospital=hospital,
-            blood_group=blood_group,
-            units_required=units,
-            city=hospital.city,
-            contact_info=hospital.phone,
-            status="open",
-        )
-
         messages.success(request, "Blood request created successfully.")
         return redirect("hospital:hospital-dashboard")
 
-    return render(request, "requests/create.html")
+    return render(request, "requests/create.html", {
+        "blood_groups": BLOOD_GROUP_CHOICES,
+        "idempotency_key": idempotency.new_key(),
+    })
 
 
 # ==================================================
@@ -155,11 +207,14 @@ def cancel_blood_request(request, request_id):
         BloodRequest,
         id=request_id,
         hospital=hospital,
-        status="open",
+        status__in=services.CANCELLABLE_STATUSES,
     )
 
-    blood_request.status = "cancelled"
-    blood_request.save(update_fields=["status"])
+    try:
+        services.cancel_request(blood_request)
+    except ValidationError as exc:
+        messages.error(request, exc.messages[0])
+        return redirect("hospital:hospital-dashboard")
 
     messages.success(request, "Blood request cancelled successfully.")
     return redirect("hospital:hospital-dashboard")
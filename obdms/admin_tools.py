@@ -0,0 +1,35 @@
+"""
+Shared ModelAdmin defaults for tables that grow without bound.
+
+The changelist normally runs COUNT(*) twice per page (filtered and
+full). LargeTableAdmin skips the full count, and its paginator answers
+the unfiltered count from MAX(pk), a single index lookup. That is an
+estimate: deleted or archived rows are still counted.
+"""
+
+from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db.models import Max
+from django.utils.functional import cached_property
+
+
+def estimated_count(model):
+    """Rows ever created (MAX(pk)): one index lookup instead of COUNT(*)."""
+    return model._default_manager.aggregate(n=Max("pk"))["n"] or 0
+
+
+class EstimatedCountPaginator(Paginator):
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, "query", None)
+        if query is not None and not query.where:
+            return estimated_count(self.object_list.model)
+        return super().count
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_per_page = 50
+    # Newest first by primary key: no sort over the whole table
+    ordering = ("-pk",)
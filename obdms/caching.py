@@ -0,0 +1,211 @@
+"""
+Versioned response and fragment caching for the public listing pages.
+
+Every cache key embeds the current version of the data it was built from
+("donors", "hospitals"). Model signals bump the version, so stale entries
+are simply never read again and age out on their own.
+"""
+
+import hashlib
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.db import transaction
+
+
+# Names that have recorded hits/misses, reported by cache_stats()
+TRACKED = set()
+
+# When any version was last bumped (after commit); see obdms.routers
+LAST_BUMP_KEY = "cache-version:bumped-at"
+
+
+# ==================================================
+# VERSIONS
+# ==================================================
+def _version_key(namespace):
+    return f"cache-version:{namespace}"
+
+
+def get_version(namespace):
+    key = _version_key(namespace)
+    version = cache.get(key)
+
+    if version is None:
+        # Seed from the clock so an evicted counter never
+        # reuses the version of entries that are still cached.
+        cache.add(key, int(time.time()), timeout=None)
+        version = cache.get(key, int(time.time()))
+
+    return version
+
+
+def bump_version(namespace):
+    try:
+        cache.incr(_version_key(namespace))
+    except ValueError:
+        cache.set(_version_key(namespace), int(time.time()), timeout=None)
+
+    transaction.on_commit(
+        lambda: cache.set(LAST_BUMP_KEY, time.time(), timeout=None)
+    )
+
+
+# ==================================================
+# HIT / MISS COUNTERS
+# ==================================================
+def _incr(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+
+def record(name, hit):
+    TRACKED.add(name)
+    _incr(f"cache-stats:{name}:{'hits' if hit else 'misses'}")
+
+
+def cache_stats():
+    stats = {}
+
+    for name in sorted(TRACKED):
+        hits = cache.get(f"cache-stats:{name}:hits", 0)
+        misses = cache.get(f"cache-stats:{name}:misses", 0)
+        total = hits + misses
+        stats[name] = {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / total, 4) if total else 0.0,
+        }
+
+    return stats
+
+
+# ==================================================
+# FRAGMENTS
+# ==================================================
+def get_fragment(name, vary_on, build):
+    """
+    Return the cached HTML fragment for (name, vary_on),
+    calling build() to render and store it on a miss.
+    """
+    key = make_template_fragment_key(name, vary_on)
+    html = cache.get(key)
+    record(f"fragment:{name}", html is not None)
+
+    if html is None:
+        html = build()
+        cache.set(key, html, settings.FRAGMENT_CACHE_TIMEOUT)
+
+    return html
+
+
+async def aget_fragment(name, vary_on, build):
+    """
+    Async get_fragment(); build is a coroutine function so
+    the listing query stays on the async ORM.
+    """
+    key = make_template_fragment_key(name, vary_on)
+    html = await cache.aget(key)
+    await sync_to_async(record)(f"fragment:{name}", html is not None)
+
+    if html is None:
+        html = await build()
+        await cache.aset(key, html, settings.FRAGMENT_CACHE_TIMEOUT)
+
+    return html
+
+
+# ==================================================
+# FULL RESPONSES (ANONYMOUS ONLY)
+# ==================================================
+def _page_key(request, name, namespaces):
+    """
+    Key for a cacheable request, or None.
+    Only anonymous GET/HEAD requests without session or flash-message
+    cookies are cached; checking the cookie avoids a session lookup.
+    """
+    if request.method not in ("GET", "HEAD"):
+        return None
+
+    if request.COOKIES.get(settings.SESSION_COOKIE_NAME) or request.COOKIES.get("messages"):
+        return None
+
+    versions = ".".join(str(get_version(ns)) for ns in namespaces)
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f"page:{name}:{versions}:{path}"
+
+
+def _lookup(key, name):
+    response = cache.get(key)
+    record(f"page:{name}", response is not None)
+    return response
+
+
+def _store(key, response):
+    def store(rendered):
+        if rendered.status_code == 200 and not rendered.cookies:
+            cache.set(key, rendered, settings.PAGE_CACHE_TIMEOUT)
+
+    if response.streaming:
+        return
+
+    # TemplateResponse (e.g. the home page) can only be pickled once rendered
+    if getattr(response, "is_rendered", True):
+        store(response)
+    else:
+        response.add_post_render_callback(store)
+
+
+def cache_anonymous_page(*namespaces, name=None):
+    """
+    Cache the whole response for anonymous visitors,
+    keyed by the current version of each namespace.
+    Works for both sync and async views.
+    """
+
+    def decorator(view_func):
+        page_name = name or view_func.__name__
+        TRACKED.add(f"page:{page_name}")
+
+        if iscoroutinefunction(view_func):
+
+            @wraps(view_func)
+            async def _view_wrapper(request, *args, **kwargs):
+                key = await sync_to_async(_page_key)(request, page_name, namespaces)
+                if key:
+                    cached = await sync_to_async(_lookup)(key, page_name)
+                    if cached is not None:
+                        return cached
+
+                response = await view_func(request, *args, **kwargs)
+
+                if key:
+                    await sync_to_async(_store)(key, response)
+                return response
+
+        else:
+
+            @wraps(view_func)
+            def _view_wrapper(request, *args, **kwargs):
+                key = _page_key(request, page_name, namespaces)
+                if key:
+                    cached = _lookup(key, page_name)
+                    if cached is not None:
+                        return cached
+
+                response = view_func(request, *args, **kwargs)
+
+                if key:
+                    _store(key, response)
+                return response
+
+        return _view_wrapper
+
+    return decorator
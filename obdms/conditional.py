@@ -0,0 +1,105 @@
+"""
+Conditional GET for list and dashboard pages.
+
+Each page declares a cheap validator (a cache version, or an aggregate of
+max timestamps and row counts). When the browser already holds the same
+representation it gets a 304 before the view queries or renders anything.
+"""
+
+import hashlib
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+
+def _user_part(request):
+    """
+    The navbar differs per user (links, unread badge),
+    so the ETag has to as well.
+    """
+    user = request.user
+
+    if not user.is_authenticated:
+        return "anon"
+
+    donor = getattr(user, "donor", None)
+    if donor:
+        from donors.services import unread_notification_count
+
+        return f"{user.pk}:{unread_notification_count(donor.id)}"
+
+    return str(user.pk)
+
+
+def _validate(validator, request, args, kwargs):
+    """
+    Returns (304 response or None, etag, last_modified timestamp).
+    """
+    if request.method not in ("GET", "HEAD") or request.COOKIES.get("messages"):
+        # Pending flash messages must be rendered, never 304'd away
+        return None, None, None
+
+    parts, last_modified = validator(request, *args, **kwargs)
+
+    digest = hashlib.md5(
+        "|".join(
+            [_user_part(request), request.get_full_path()]
+            + [str(part) for part in parts]
+        ).encode()
+    ).hexdigest()
+    etag = f'"{digest}"'
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+
+    response = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=timestamp,
+    )
+    return response, etag, timestamp
+
+
+def _finish(response, etag, timestamp):
+    if etag:
+        response.headers.setdefault("ETag", etag)
+        if timestamp and not response.has_header("Last-Modified"):
+            response.headers["Last-Modified"] = http_date(timestamp)
+        # Always revalidate; never store in shared caches
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def conditional_page(validator):
+    """
+    validator(request, *args, **kwargs) -> (parts, last_modified)
+
+    parts is a sequence of values that change whenever the page does
+    (include full-precision timestamps: Last-Modified is only to the
+    second); last_modified is a datetime or None. Works for sync and async views.
+    """
+
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+
+            @wraps(view_func)
+            async def _view_wrapper(request, *args, **kwargs):
+                response, etag, timestamp = await sync_to_async(_validate)(
+                    validator, request, args, kwargs
+                )
+                if response is None:
+                    response = await view_func(request, *args, **kwargs)
+                return _finish(response, etag, timestamp)
+
+        else:
+
+            @wraps(view_func)
+            def _view_wrapper(request, *args, **kwargs):
+                response, etag, timestamp = _validate(validator, request, args, kwargs)
+                if response is None:
+                    response = view_func(request, *args, **kwargs)
+                return _finish(response, etag, timestamp)
+
+        return _view_wrapper
+
+    return decorator
@@ -0,0 +1,161 @@
+"""
+Idempotency keys for POST views that create things (blood requests).
+
+The form carries a one-off key in a hidden field, generated when the form
+is rendered. API clients send an Idempotency-Key header instead. The first
+POST with a key claims it by inserting a row into accounts.IdempotencyKey
+(unique key column) and runs the view; its redirect is stored on the row.
+The claim lives in the database, not the per-process cache, so it holds
+across every worker. A repeated POST with the same key within
+IDEMPOTENCY_KEY_TTL seconds (double click, retry on a slow network) does
+not run the view again: it gets the original redirect. If the original is
+still being processed, the repeat waits for it for up to IDEMPOTENCY_WAIT
+seconds.
+
+Expired rows are deleted by the "idempotency-keys" scheduler job.
+
+POSTs without a key behave as before.
+"""
+
+import re
+import time
+import uuid
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.contrib import messages
+from django.db import IntegrityError, transaction
+from django.http import HttpResponse, HttpResponseRedirect
+from django.utils import timezone
+
+from accounts.models import IdempotencyKey
+from obdms.writes import retry_write
+
+FIELD = "idempotency_key"
+HEADER = "Idempotency-Key"
+POLL_INTERVAL = 0.1
+
+_VALID_KEY = re.compile(r"^[A-Za-z0-9_-]{8,64}$")
+
+
+def new_key():
+    """For the hidden form field."""
+    return uuid.uuid4().hex
+
+
+def _request_key(request):
+    key = request.headers.get(HEADER) or request.POST.get(FIELD, "")
+    return key if _VALID_KEY.match(key) else None
+
+
+def _stored_key(request, view_name, key):
+    user = request.user.pk if request.user.is_authenticated else "anon"
+    return f"{view_name}:{user}:{key}"
+
+
+def _expired_before():
+    return timezone.now() - timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL)
+
+
+# ==================================================
+# STORE (accounts.IdempotencyKey)
+# ==================================================
+@retry_write
+def _claim(stored_key):
+    """True if this POST owns the key; False if another one got it first."""
+    IdempotencyKey.objects.filter(
+        key=stored_key, created_at__lt=_expired_before()
+    ).delete()
+
+    try:
+        with transaction.atomic():
+            IdempotencyKey.objects.create(key=stored_key)
+    except IntegrityError:
+        return False
+    return True
+
+
+@retry_write
+def _store(stored_key, location):
+    IdempotencyKey.objects.filter(key=stored_key).update(location=location)
+
+
+@retry_write
+def _release(stored_key):
+    IdempotencyKey.objects.filter(key=stored_key).delete()
+
+
+def _wait_for(stored_key):
+    """The stored redirect, "" while still pending, None if released."""
+    deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT
+
+    while True:
+        stored = (
+            IdempotencyKey.objects.filter(key=stored_key)
+            .values_list("location", flat=True)
+            .first()
+        )
+        if stored != "" or time.monotonic() >= deadline:
+            return stored
+        time.sleep(POLL_INTERVAL)
+
+
+def purge_expired_keys():
+    """Scheduler job. Returns how many keys were deleted."""
+    deleted, _ = retry_write(
+        IdempotencyKey.objects.filter(created_at__lt=_expired_before()).delete
+    )()
+    return deleted
+
+
+# ==================================================
+# DECORATOR
+# ==================================================
+def _replay(request, stored):
+    if not stored:
+        return HttpResponse(
+            "This submission is still being processed.", status=409
+        )
+
+    messages.info(request, "This was already submitted; nothing was created twice.")
+    response = HttpResponseRedirect(stored)
+    response["Idempotent-Replayed"] = "true"
+    return response
+
+
+def idempotent_post(view):
+    """
+    @login_required
+    @idempotent_post
+    def create_blood_request(request): ...
+    """
+    view_name = f"{view.__module__}.{view.__name__}"
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        key = _request_key(request) if request.method == "POST" else None
+        if key is None:
+            return view(request, *args, **kwargs)
+
+        stored_key = _stored_key(request, view_name, key)
+        if not _claim(stored_key):
+            return _replay(request, _wait_for(stored_key))
+
+        try:
+            response = view(request, *args, **kwargs)
+        except Exception:
+            _release(stored_key)
+            raise
+
+        location = response.get("Location") if response.status_code in (301, 302, 303) else None
+        if location and location != request.path:
+            _store(stored_key, location)
+        else:
+            # Re-rendered or bounced back to the form (validation error):
+            # nothing was created, so the same key may be submitted again
+            _release(stored_key)
+
+        return response
+
+    return wrapper
@@ -0,0 +1,60 @@
+"""
+A minimal in-process job queue for slow side work (emails, rematching)
+started from a request or an admin action.
+
+enqueue(func, *args) returns immediately; one daemon worker thread per
+process runs jobs in order, with its own database connection. Jobs are
+lost if the process dies, so they must be safe to re-run: the periodic
+scheduler (or an admin re-running the action) is the safety net.
+With JOBS_RUN_INLINE (tests) jobs run in the caller.
+"""
+
+import logging
+import queue
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections
+
+
+logger = logging.getLogger("obdms.jobs")
+
+
+class JobQueue:
+    def __init__(self):
+        self._jobs = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def enqueue(self, func, *args, **kwargs):
+        if settings.JOBS_RUN_INLINE:
+            func(*args, **kwargs)
+            return
+
+        self._jobs.put((func, args, kwargs))
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="obdms-jobs", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            func, args, kwargs = self._jobs.get()
+            close_old_connections()
+            try:
+                func(*args, **kwargs)
+            except Exception:
+                logger.exception("Job %s failed", getattr(func, "__name__", func))
+            finally:
+                close_old_connections()
+                self._jobs.task_done()
+
+    def join(self):
+        """Wait for queued jobs (management commands before exiting)."""
+        self._jobs.join()
+
+
+jobs = JobQueue()
+enqueue = jobs.enqueue
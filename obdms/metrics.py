@@ -0,0 +1,242 @@
+"""
+Counters and histograms for the matching / notification pipeline,
+rendered in the Prometheus text exposition format.
+
+Values live in their own small SQLite file (METRICS_SQLITE_PATH), not in
+the cache: every worker process on the host adds to the same rows with an
+atomic UPSERT (value = value + ?), nothing is ever evicted, and the
+application database's write lock is never touched. A failed metrics
+write is logged and dropped; it never breaks the caller.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+
+
+logger = logging.getLogger("obdms.metrics")
+
+
+# Histogram sums are stored as integers in micro-units
+_SCALE = 1_000_000
+
+SECONDS_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+HOURS = 3600
+
+EMAIL_KINDS = ("match", "acceptance", "cancelled", "fulfilled", "expired", "reminder")
+
+
+# ==================================================
+# REGISTRY
+# ==================================================
+# name -> (help, {label: allowed values})
+COUNTERS = {
+    "obdms_emails_total": (
+        "Notification emails by kind and result",
+        {"kind": EMAIL_KINDS, "result": ("sent", "failed")},
+    ),
+    "obdms_blood_requests_total": (
+        "Blood request lifecycle events (services pipeline, expiry job)",
+        {"event": ("created", "cancelled", "fulfilled", "expired")},
+    ),
+    "obdms_matches_created_total": (
+        "RequestMatch rows created by match_and_notify",
+        {},
+    ),
+    "obdms_donor_responses_total": (
+        "Donor responses to matched requests",
+        {"response": ("accept", "reject")},
+    ),
+    "obdms_write_retries_total": (
+        "Writes that hit 'database is locked' (retried or given up)",
+        {"result": ("retried", "gave_up")},
+    ),
+}
+
+# name -> (help, buckets, {label: allowed values})
+HISTOGRAMS = {
+    "obdms_match_fanout": (
+        "Donors matched per blood request",
+        (0, 1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500),
+        {},
+    ),
+    "obdms_match_seconds": (
+        "Time spent in match_and_notify",
+        SECONDS_BUCKETS + (30, 60),
+        {},
+    ),
+    "obdms_email_send_seconds": (
+        "send_mail latency by notification kind",
+        SECONDS_BUCKETS,
+        {"kind": EMAIL_KINDS},
+    ),
+    "obdms_donor_response_seconds": (
+        "Time from match to donor response",
+        (60, 300, 900, HOURS, 4 * HOURS, 12 * HOURS, 24 * HOURS, 72 * HOURS, 168 * HOURS),
+        {"response": ("accept", "reject")},
+    ),
+}
+
+
+def _label_sets(labels):
+    combos = [{}]
+    for label, values in labels.items():
+        combos = [{**combo, label: value} for combo in combos for value in values]
+    return combos
+
+
+def _label_str(labels):
+    return ",".join(f'{key}="{value}"' for key, value in sorted(labels.items()))
+
+
+def _key(name, labels, suffix=""):
+    return f"metrics:{name}{{{_label_str(labels)}}}{suffix}"
+
+
+# ==================================================
+# STORAGE
+# ==================================================
+_local = threading.local()
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS metric_values "
+    "(key TEXT PRIMARY KEY, value INTEGER NOT NULL) WITHOUT ROWID"
+)
+_UPSERT = (
+    "INSERT INTO metric_values (key, value) VALUES (?, ?) "
+    "ON CONFLICT (key) DO UPDATE SET value = value + excluded.value"
+)
+
+
+def _db():
+    """One connection per thread, process and path (override_settings)."""
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+
+    path = str(settings.METRICS_SQLITE_PATH)
+    key = (os.getpid(), path)
+    conn = connections.get(key)
+    if conn is None:
+        conn = sqlite3.connect(path, timeout=5, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(_SCHEMA)
+        connections[key] = conn
+    return conn
+
+
+def _add(*pairs):
+    """pairs: (key, amount), applied in one transaction."""
+    try:
+        conn = _db()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(_UPSERT, pairs)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+    except sqlite3.Error:
+        logger.exception("Metrics write dropped")
+
+
+def _values():
+    """key -> value for every stored series (bounded by the registry)."""
+    try:
+        return dict(_db().execute("SELECT key, value FROM metric_values"))
+    except sqlite3.Error:
+        logger.exception("Metrics read failed")
+        return {}
+
+
+# ==================================================
+# RECORDING
+# ==================================================
+def inc(name, amount=1, **labels):
+    if amount:
+        _add((_key(name, labels), amount))
+
+
+def observe(name, value, **labels):
+    _, buckets, _ = HISTOGRAMS[name]
+    # Only the first matching bucket; render() makes them cumulative
+    bucket = next((le for le in buckets if value <= le), "+Inf")
+
+    _add(
+        (_key(name, labels, f":bucket:{bucket}"), 1),
+        (_key(name, labels, ":count"), 1),
+        (_key(name, labels, ":sum"), round(value * _SCALE)),
+    )
+
+
+@contextmanager
+def email_timer(kind):
+    """
+    with email_timer("match"):
+        send_mail(...)
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        inc("obdms_emails_total", kind=kind, result="failed")
+        raise
+    else:
+        inc("obdms_emails_total", kind=kind, result="sent")
+    finally:
+        observe("obdms_email_send_seconds", time.perf_counter() - started, kind=kind)
+
+
+def counter_values(name):
+    """[(labels, value)] for every label combination of a counter."""
+    _, labels = COUNTERS[name]
+    values = _values()
+    return [(combo, values.get(_key(name, combo), 0)) for combo in _label_sets(labels)]
+
+
+# ==================================================
+# EXPOSITION
+# ==================================================
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render(gauges=()):
+    """
+    Text exposition of every registered series, plus
+    `gauges`: (name, help, value) computed at scrape time.
+    """
+    values = _values()
+    lines = []
+
+    for name, (help_text, labels) in COUNTERS.items():
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+        for combo in _label_sets(labels):
+            label_str = _label_str(combo)
+            series = f"{name}{{{label_str}}}" if label_str else name
+            lines.append(f"{series} {values.get(_key(name, combo), 0)}")
+
+    for name, (help_text, buckets, labels) in HISTOGRAMS.items():
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+        for combo in _label_sets(labels):
+            label_str = _label_str(combo)
+            prefix = f"{label_str}," if label_str else ""
+            cumulative = 0
+            for le in buckets + ("+Inf",):
+                cumulative += values.get(_key(name, combo, f":bucket:{le}"), 0)
+                lines.append(f'{name}_bucket{{{prefix}le="{le}"}} {cumulative}')
+            suffix = f"{{{label_str}}}" if label_str else ""
+            total = values.get(_key(name, combo, ":sum"), 0) / _SCALE
+            lines.append(f"{name}_sum{suffix} {_number(total)}")
+            lines.append(f"{name}_count{suffix} {values.get(_key(name, combo, ':count'), 0)}")
+
+    for name, help_text, value in gauges:
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge", f"{name} {_number(value)}"]
+
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,179 @@
+"""
+N+1 query detection for development and tests.
+
+Every SQL statement run while a tracker is active is fingerprinted.
+Statements issued by a lazy related-field access (``r.requested_by``,
+``m.request.hospital``) are grouped by fingerprint and by the template
+line or code location that triggered them. Any group that repeats at
+least NPLUSONE_THRESHOLD times is reported, either as a warning or as
+an NPlusOneError.
+"""
+
+import logging
+import re
+import sys
+import warnings
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.template.base import Node
+from django.utils.decorators import sync_and_async_middleware
+
+
+logger = logging.getLogger("obdms.nplusone")
+
+_current = ContextVar("nplusone_tracker", default=None)
+
+_IN_LIST = re.compile(r"IN \((?:%s, )*%s\)")
+
+# Frames from these files don't tell the developer anything
+# (obdms/timing.py wraps every execute once a timed request has run)
+_SKIP = ("/django/", "/asgiref/", "/site-packages/", __file__, "/obdms/timing.py")
+
+
+class NPlusOneError(AssertionError):
+    pass
+
+
+class NPlusOneWarning(UserWarning):
+    pass
+
+
+def fingerprint(sql):
+    """Placeholders already hide values; collapse IN lists of any length."""
+    return _IN_LIST.sub("IN (...)", sql)
+
+
+# ==================================================
+# STACK INSPECTION
+# ==================================================
+def _from_related_descriptor(frame):
+    while frame is not None:
+        if frame.f_code.co_filename.endswith("related_descriptors.py"):
+            return True
+        frame = frame.f_back
+    return False
+
+
+def _location(frame):
+    """
+    The innermost template node being rendered, else the innermost
+    frame of project code.
+    """
+    code_location = None
+
+    while frame is not None:
+        node = frame.f_locals.get("self")
+        if isinstance(node, Node) and getattr(node, "token", None) and node.origin:
+            return f"{node.origin.template_name}:{node.token.lineno}"
+
+        filename = frame.f_code.co_filename
+        if code_location is None and not any(part in filename for part in _SKIP):
+            code_location = f"{filename}:{frame.f_lineno} in {frame.f_code.co_name}"
+
+        frame = frame.f_back
+
+    return code_location or "unknown"
+
+
+# ==================================================
+# TRACKER
+# ==================================================
+class Tracker:
+    def __init__(self, threshold):
+        self.threshold = threshold
+        self.counts = Counter()
+
+    def record(self, sql):
+        frame = sys._getframe(2)
+        if _from_related_descriptor(frame):
+            self.counts[(fingerprint(sql), _location(frame))] += 1
+
+    def problems(self):
+        return [
+            (sql, location, count)
+            for (sql, location), count in self.counts.most_common()
+            if count >= self.threshold
+        ]
+
+    def report(self, mode, label=""):
+        problems = self.problems()
+        if not problems:
+            return
+
+        message = "\n".join(
+            [f"Possible N+1 queries{f' in {label}' if label else ''}:"]
+            + [
+                f"  {count} x {sql}\n    from {location}"
+                for sql, location, count in problems
+            ]
+        )
+
+        if mode == "raise":
+            raise NPlusOneError(message)
+        logger.warning(message)
+        warnings.warn(message, NPlusOneWarning, stacklevel=2)
+
+
+def _sql_wrapper(execute, sql, params, many, context):
+    tracker = _current.get()
+    if tracker is not None:
+        tracker.record(sql)
+    return execute(sql, params, many, context)
+
+
+def _install_sql_wrapper(connection, **kwargs):
+    if _sql_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_sql_wrapper)
+
+
+def install():
+    connection_created.connect(_install_sql_wrapper, dispatch_uid="obdms.nplusone")
+    for connection in connections.all(initialized_only=True):
+        _install_sql_wrapper(connection)
+
+
+@contextmanager
+def detect_n_plus_one(mode="raise", threshold=None, label=""):
+    """
+    with detect_n_plus_one():           # raise NPlusOneError
+    with detect_n_plus_one("warn"):     # NPlusOneWarning + log
+    """
+    install()
+    tracker = Tracker(threshold or settings.NPLUSONE_THRESHOLD)
+    token = _current.set(tracker)
+    try:
+        yield tracker
+    finally:
+        _current.reset(token)
+    tracker.report(mode, label)
+
+
+# ==================================================
+# MIDDLEWARE (DEVELOPMENT)
+# ==================================================
+@sync_and_async_middleware
+def nplusone_middleware(get_response):
+    mode = settings.NPLUSONE_MODE or ("warn" if settings.DEBUG else "off")
+    if mode == "off":
+        raise MiddlewareNotUsed
+
+    if iscoroutinefunction(get_response):
+
+        async def middleware(request):
+            with detect_n_plus_one(mode, label=request.path):
+                return await get_response(request)
+
+    else:
+
+        def middleware(request):
+            with detect_n_plus_one(mode, label=request.path):
+                return get_response(request)
+
+    return middleware
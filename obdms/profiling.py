@@ -0,0 +1,103 @@
+"""
+On-demand profiling of live requests.
+
+A staff user adds ``?_profile=1`` or an ``X-Profile: 1`` header to a
+request. That request runs under cProfile and writes two files to
+PROFILE_DIR: a .prof file for snakeviz or pstats, and a .txt summary of
+the top functions by cumulative time. All other requests pay only a
+header and query-string check.
+
+For async views the profiler sees the event loop thread; ORM work done
+through sync_to_async shows up as time spent awaiting.
+"""
+
+import cProfile
+import io
+import logging
+import pstats
+import re
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.utils import timezone
+from django.utils.decorators import sync_and_async_middleware
+
+
+logger = logging.getLogger("obdms.profiling")
+
+_QUERY_FLAG = re.compile(r"(?:^|&)_profile=1(?:&|$)")
+
+
+def _requested(request):
+    return (
+        request.META.get("HTTP_X_PROFILE") == "1"
+        or _QUERY_FLAG.search(request.META.get("QUERY_STRING", "")) is not None
+    )
+
+
+def _allowed(user):
+    return user.is_active and user.is_staff
+
+
+def _save(request, profiler):
+    directory = Path(settings.PROFILE_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    match = request.resolver_match
+    name = re.sub(r"[^\w.-]", "_", match.view_name if match else "unresolved")
+    stem = directory / f"{timezone.now():%Y%m%dT%H%M%S%f}-{name}"
+
+    profiler.dump_stats(f"{stem}.prof")
+
+    summary = io.StringIO()
+    summary.write(f"{request.method} {request.get_full_path()}\n\n")
+    pstats.Stats(profiler, stream=summary).strip_dirs().sort_stats(
+        "cumulative"
+    ).print_stats(settings.PROFILE_TOP_FUNCTIONS)
+    Path(f"{stem}.txt").write_text(summary.getvalue(), encoding="utf-8")
+
+    logger.info("Profiled %s -> %s.prof", request.get_full_path(), stem)
+    return stem.name
+
+
+# ==================================================
+# MIDDLEWARE
+# ==================================================
+@sync_and_async_middleware
+def profiling_middleware(get_response):
+    """Must come after AuthenticationMiddleware."""
+
+    if iscoroutinefunction(get_response):
+
+        async def middleware(request):
+            if not _requested(request) or not _allowed(await request.auser()):
+                return await get_response(request)
+
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                response = await get_response(request)
+            finally:
+                profiler.disable()
+
+            response["X-Profile-File"] = _save(request, profiler)
+            return response
+
+    else:
+
+        def middleware(request):
+            if not _requested(request) or not _allowed(request.user):
+                return get_response(request)
+
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                response = get_response(request)
+            finally:
+                profiler.disable()
+
+            response["X-Profile-File"] = _save(request, profiler)
+            return response
+
+    return middleware
@@ -0,0 +1,207 @@
+"""
+Query-count budgets for every URL.
+
+Each app's tests.py declares BUDGETS = {url_name: max_queries} and how to
+call each view. The harness seeds the same fixture at two sizes and fails
+if a view exceeds its budget, if its query count grows with the data
+(the signature of an N+1), or if obdms.nplusone sees lazy related loads
+repeat.
+"""
+
+from datetime import date
+from functools import cache as memoize
+from types import SimpleNamespace
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from blood_requests.models import BloodRequest, RequestMatch
+from donors.models import Donor, DonorDonation, DonorNotification
+from hospitals.models import Hospital
+from obdms.nplusone import detect_n_plus_one
+
+
+SMALL = 2
+LARGE = 12
+
+CITY = "Patna"
+
+
+@memoize
+def _password():
+    # Hashing per user would dominate the run
+    return make_password("Budget-pass-1")
+
+
+def _user(username, **extra):
+    return User.objects.create(
+        username=username, email=username, password=_password(), **extra
+    )
+
+
+def _donor(user, blood_group="O+"):
+    return Donor.objects.create(
+        user=user,
+        first_name="Budget",
+        last_name="Donor",
+        date_of_birth=date(1990, 1, 1),
+        gender="male",
+        marital_status="married",
+        blood_group=blood_group,
+        phone="9876543210",
+        aadhaar_last4="1234",
+        address="1 Main Road",
+        state="Bihar",
+        city=CITY,
+        pincode="800001",
+    )
+
+
+def _hospital(user, index):
+    return Hospital.objects.create(
+        user=user,
+        hospital_name=f"Budget Hospital {index}",
+        category="private",
+        contact_person="Budget Contact",
+        phone="9876543210",
+        address="1 Hospital Road",
+        state="Bihar",
+        city=CITY,
+        licence_number=f"BUDGET-{index:05d}",
+    )
+
+
+def build_fixture(scale):
+    """
+    The actors every view needs, plus `scale` rows of everything
+    a page could iterate over.
+    """
+    fx = SimpleNamespace()
+
+    fx.staff = _user("staff@budget.test", is_staff=True)
+    fx.requester = _user("requester@budget.test")
+
+    fx.hospital_user = _user("hospital@budget.test")
+    fx.hospital = _hospital(fx.hospital_user, 0)
+
+    fx.donor_user = _user("donor@budget.test")
+    fx.donor = _donor(fx.donor_user)
+
+    # The donor's pending inbox on the hospital's open requests
+    for i in range(scale):
+        req = BloodRequest.objects.create(
+            requested_by=fx.hospital_user, hospital=fx.hospital,
+            blood_group="O+", units_required=1, city=CITY, contact_info="1",
+        )
+        RequestMatch.objects.create(request=req, donor=fx.donor)
+    fx.open_request = req
+    fx.pending_match = RequestMatch.objects.get(request=req, donor=fx.donor)
+
+    # Requester's own open requests
+    for i in range(scale):
+        fx.requester_request = BloodRequest.objects.create(
+            requested_by=fx.requester, blood_group="A+",
+            units_required=1, city=CITY, contact_info="r",
+        )
+
+    # Requester's matched request the donor accepted (for mark-fulfilled)
+    fx.matched_request = BloodRequest.objects.create(
+        requested_by=fx.requester, blood_group="O+",
+        units_required=1, city=CITY, contact_info="r",
+    )
+    RequestMatch.objects.create(request=fx.matched_request, donor=fx.donor, accepted=True)
+    fx.matched_request.status = "matched"
+    fx.matched_request.save()
+
+    # Donation history
+    for i in range(scale):
+        done = BloodRequest.objects.create(
+            requested_by=fx.requester, hospital=fx.hospital, blood_group="O+",
+            units_required=1, city=CITY, contact_info="r", status="fulfilled",
+        )
+        RequestMatch.objects.bulk_create([
+            RequestMatch(request=done, donor=fx.donor, accepted=True),
+        ])
+        fx.donation = DonorDonation.objects.bulk_create([
+            DonorDonation(donor=fx.donor, request=done, units_donated=1),
+        ])[0]
+
+    DonorNotification.objects.bulk_create([
+        DonorNotification(donor=fx.donor, title=f"n{i}", message="m")
+        for i in range(scale)
+    ])
+
+    # Other donors and hospitals in the city (listings, match fan-out)
+    for i in range(scale):
+        _donor(_user(f"other{i}@budget.test"))
+        _hospital(_user(f"otherhospital{i}@budget.test"), i + 1)
+
+    return fx
+
+
+class QueryBudgetMixin:
+    """
+    Mix into a TestCase and set URLS (the app's urls module),
+    BUDGETS and calls().
+    """
+
+    URLS = None
+    BUDGETS = {}
+
+    def calls(self, fx):
+        """
+        url name -> (user or None, method, path, data)
+        """
+        raise NotImplementedError
+
+    def measure(self, scale):
+        counts = {}
+
+        with transaction.atomic():
+            fx = build_fixture(scale)
+
+            for name, (user, method, path, data) in self.calls(fx).items():
+                client = Client()
+                if user:
+                    client.force_login(user)
+                cache.clear()
+
+                with transaction.atomic():
+                    with detect_n_plus_one(label=name), \
+                            CaptureQueriesContext(connection) as queries:
+                        response = getattr(client, method)(path, data or {})
+                        if response.streaming:
+                            b"".join(response.streaming_content)
+                    transaction.set_rollback(True)
+
+                self.assertLess(response.status_code, 400, f"{name} -> {response.status_code}")
+                counts[name] = len(queries)
+
+            transaction.set_rollback(True)
+
+        return counts
+
+    def test_every_url_has_a_budget(self):
+        if self.URLS is None:
+            return
+        names = {p.name for p in self.URLS.urlpatterns if p.name}
+        self.assertEqual(names - set(self.BUDGETS), set(), "URL names without a query budget")
+
+    def test_query_budgets(self):
+        small = self.measure(SMALL)
+        large = self.measure(LARGE)
+
+        for name, budget in self.BUDGETS.items():
+            with self.subTest(url=name):
+                self.assertLessEqual(
+                    large[name], budget,
+                    f"{name} ran {large[name]} queries (budget {budget})",
+                )
+                self.assertEqual(
+                    large[name], small[name],
+                    f"{name} queries grow with data: {small[name]} -> {large[name]}",
+                )
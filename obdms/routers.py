@@ -0,0 +1,162 @@
+"""
+Read/write routing with an optional read replica.
+
+Writes always go to "default". Reads go to "replica" only inside views
+(or blocks) that opt in with @replica_reads / reading_replica(), and
+only when:
+
+- the visitor hasn't written anything in the last REPLICA_PIN_SECONDS
+  (read-your-writes: any request that writes sets a short pin cookie);
+- the replica was synced after the last cache version bump, so a
+  lagging copy can never be cached under a new version.
+
+Locally the replica is a periodically copied SQLite file (manage.py
+sync_replica). A real replica only needs a different DATABASES entry.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.decorators import sync_and_async_middleware
+
+from obdms.caching import LAST_BUMP_KEY
+
+
+REPLICA = "replica"
+PIN_COOKIE = "obdms_primary"
+SYNCED_KEY = "replica:synced-at"
+
+_use_replica = ContextVar("use_replica", default=False)
+_request_state = ContextVar("replica_request_state", default=None)
+
+
+def replica_configured():
+    return REPLICA in settings.DATABASES
+
+
+# ==================================================
+# ROUTER
+# ==================================================
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return REPLICA if _use_replica.get() else None
+
+    def db_for_write(self, model, **hints):
+        state = _request_state.get()
+        if state is not None:
+            state["wrote"] = True
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Same data on both aliases
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        return db != REPLICA
+
+
+# ==================================================
+# OPTING IN
+# ==================================================
+def mark_synced(started):
+    """Called by sync_replica with the time the copy started."""
+    cache.set(SYNCED_KEY, started, timeout=None)
+
+
+def replica_usable(request=None):
+    if not replica_configured():
+        return False
+    if request is not None and request.COOKIES.get(PIN_COOKIE):
+        return False
+
+    state = cache.get_many([SYNCED_KEY, LAST_BUMP_KEY])
+    synced = state.get(SYNCED_KEY)
+    return synced is not None and synced >= state.get(LAST_BUMP_KEY, 0)
+
+
+def read_alias(request=None):
+    """For querysets that outlive the view (streamed exports): .using(...)"""
+    return REPLICA if replica_usable(request) else "default"
+
+
+@contextmanager
+def reading_replica(request=None):
+    token = _use_replica.set(replica_usable(request))
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+def replica_reads(view_func):
+    """Route this view's reads to the replica when it is safe to."""
+
+    if iscoroutinefunction(view_func):
+
+        @wraps(view_func)
+        async def _view_wrapper(request, *args, **kwargs):
+            usable = await sync_to_async(replica_usable)(request)
+            token = _use_replica.set(usable)
+            try:
+                return await view_func(request, *args, **kwargs)
+            finally:
+                _use_replica.reset(token)
+
+    else:
+
+        @wraps(view_func)
+        def _view_wrapper(request, *args, **kwargs):
+            with reading_replica(request):
+                return view_func(request, *args, **kwargs)
+
+    return _view_wrapper
+
+
+# ==================================================
+# READ-YOUR-WRITES PIN
+# ==================================================
+def _pin(response, state):
+    if state["wrote"]:
+        response.set_cookie(
+            PIN_COOKIE, str(int(time.time())),
+            max_age=settings.REPLICA_PIN_SECONDS,
+            httponly=True, samesite="Lax",
+        )
+    return response
+
+
+@sync_and_async_middleware
+def replica_pinning_middleware(get_response):
+    """Outside SessionMiddleware, so session writes pin as well."""
+    if not replica_configured():
+        raise MiddlewareNotUsed
+
+    if iscoroutinefunction(get_response):
+
+        async def middleware(request):
+            state = {"wrote": False}
+            token = _request_state.set(state)
+            try:
+                response = await get_response(request)
+            finally:
+                _request_state.reset(token)
+            return _pin(response, state)
+
+    else:
+
+        def middleware(request):
+            state = {"wrote": False}
+            token = _request_state.set(state)
+            try:
+                response = get_response(request)
+            finally:
+                _request_state.reset(token)
+            return _pin(response, state)
+
+    return middleware
@@ -0,0 +1,65 @@
+"""
+Periodic jobs, driven by `manage.py run_scheduler`.
+
+SCHEDULED_JOBS maps a name to (dotted path of a function, interval in
+seconds). Time is cut into slots of one interval per job, and a job runs
+once per slot: the run is claimed by inserting an accounts.ScheduledJobRun
+row whose (job, slot) is unique. The INSERT either wins or raises
+IntegrityError, so several schedulers, in any processes or on any hosts
+sharing the database, never run the same job twice in one slot. A crashed
+run is simply retried in the next slot.
+"""
+
+import logging
+import time
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.utils.module_loading import import_string
+
+from accounts.models import ScheduledJobRun
+from obdms.writes import retry_write
+
+
+logger = logging.getLogger("obdms.scheduler")
+
+
+@retry_write
+def _claim(name, interval):
+    """True if this scheduler owns the job's current slot."""
+    slot = int(time.time() // interval)
+    try:
+        with transaction.atomic():
+            ScheduledJobRun.objects.create(job=name, slot=slot)
+    except IntegrityError:
+        return False
+
+    # Only the latest claim per job is worth keeping
+    ScheduledJobRun.objects.filter(job=name, slot__lt=slot).delete()
+    return True
+
+
+def run_job(name):
+    path, _ = settings.SCHEDULED_JOBS[name]
+    started = time.perf_counter()
+    close_old_connections()
+    try:
+        result = import_string(path)()
+    finally:
+        close_old_connections()
+    logger.info("Job %s -> %r in %.2fs", name, result, time.perf_counter() - started)
+    return result
+
+
+def run_due():
+    """Run every job whose slot is unclaimed; returns {name: result}."""
+    results = {}
+    for name, (_, interval) in settings.SCHEDULED_JOBS.items():
+        if not _claim(name, interval):
+            continue
+        try:
+            results[name] = run_job(name)
+        except Exception as exc:
+            logger.exception("Scheduled job %s failed", name)
+            results[name] = exc
+    return results
@@ -1,11 +1,22 @@
 from pathlib import Path
 import os
 
+from django.core.exceptions import ImproperlyConfigured
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# PROFILE: "development" (default) or "production" (DEBUG off, tuned SQLite)
+PROFILE = os.environ.get("OBDMS_PROFILE", "development")
+if PROFILE not in ("development", "production"):
+    raise ImproperlyConfigured(f"Unknown OBDMS_PROFILE {PROFILE!r}")
+
+PRODUCTION = PROFILE == "production"
+
 SECRET_KEY = os.environ.get("SECRET_KEY", "unsafe-dev-key")
+if PRODUCTION and SECRET_KEY == "unsafe-dev-key":
+    raise ImproperlyConfigured("Set SECRET_KEY for the production profile.")
 
-DEBUG = True
+DEBUG = os.environ.get("DEBUG", "0" if PRODUCTION else "1") == "1"
 
 ALLOWED_HOSTS = os.environ.get(
     "ALLOWED_HOSTS",
@@ -23,14 +34,20 @@ INSTALLED_APPS = [
     "hospitals",
     "donors",
     "blood_requests",
+    "analytics",
 ]
 
 MIDDLEWARE = [
+    "obdms.timing.server_timing_middleware",
+    "obdms.nplusone.nplusone_middleware",
     "django.middleware.security.SecurityMiddleware",
+    "django.middleware.gzip.GZipMiddleware",
+    "obdms.routers.replica_pinning_middleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "obdms.profiling.profiling_middleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -39,13 +56,114 @@ ROOT_URLCONF = "obdms.urls"
 
 WSGI_APPLICATION = "obdms.wsgi.application"
 
+# DATABASE
+# Every profile: writers wait (busy timeout) instead of failing with
+# "database is locked", and BEGIN IMMEDIATE takes the write lock up front
+# so a transaction that reads before writing (full_clean, get_or_create)
+# never deadlocks on the read -> write upgrade (obdms.writes relies on it).
+# Production adds WAL, so readers run alongside the single writer, and
+# keeps connections per worker.
+
+SQLITE_PRAGMAS = [
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",      # durable with WAL; fsync only at checkpoints
+    "PRAGMA cache_size=-65536",       # 64 MB page cache per connection
+    "PRAGMA mmap_size=268435456",     # 256 MB memory-mapped reads
+    "PRAGMA temp_store=MEMORY",
+]
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+        "NAME": os.environ.get("SQLITE_PATH", BASE_DIR / "db.sqlite3"),
+        "OPTIONS": {
+            "timeout": 20,            # busy_timeout, seconds
+            "transaction_mode": "IMMEDIATE",
+        },
+    }
+}
+
+if PRODUCTION:
+    DATABASES["default"]["OPTIONS"]["init_command"] = ";".join(SQLITE_PRAGMAS)
+    DATABASES["default"].update({
+        "CONN_MAX_AGE": int(os.environ.get("CONN_MAX_AGE", 600)),
+        "CONN_HEALTH_CHECKS": True,
+    })
+
+# Optional read replica (obdms.routers). Locally a copy of the primary
+# refreshed by `manage.py sync_replica`, opened read-only and without
+# the WAL pragmas: the file is swapped out from under it on every sync.
+REPLICA_SQLITE_PATH = os.environ.get("REPLICA_SQLITE_PATH")
+REPLICA_PIN_SECONDS = 15        # a visitor who just wrote reads the primary
+REPLICA_SYNC_INTERVAL = 5
+
+if REPLICA_SQLITE_PATH:
+    DATABASES["replica"] = {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": f"file:{REPLICA_SQLITE_PATH}?mode=ro",
+        "OPTIONS": {"uri": True, "timeout": 20},
+        "TEST": {"MIRROR": "default"},
     }
+    DATABASE_ROUTERS = ["obdms.routers.ReplicaRouter"]
+
+# Retries of short write transactions on "database is locked" (obdms.writes)
+WRITE_RETRY_ATTEMPTS = 6
+WRITE_RETRY_BASE_DELAY = 0.05   # seconds, doubled per attempt, full jitter
+WRITE_RETRY_MAX_DELAY = 1.0
+
+# Read receipts etc. go through one batched background writer per process
+DEFER_LOW_PRIORITY_WRITES = os.environ.get(
+    "DEFER_LOW_PRIORITY_WRITES", "1" if PRODUCTION else "0"
+) == "1"
+DEFERRED_WRITE_INTERVAL = 0.5
+
+# Prometheus counters (obdms.metrics): a separate SQLite file shared by
+# every worker process on the host
+METRICS_SQLITE_PATH = os.environ.get("METRICS_SQLITE_PATH", BASE_DIR / "metrics.sqlite3")
+
+# `manage.py test` swaps METRICS_SQLITE_PATH for a temporary file
+TEST_RUNNER = "obdms.test_runner.TestRunner"
+
+# Closed requests (and read notifications) older than this move to the
+# archive tables (manage.py archive_closed)
+ARCHIVE_RETENTION_DAYS = int(os.environ.get("ARCHIVE_RETENTION_DAYS", 180))
+
+# obdms.jobs: run queued jobs in the caller instead of a worker thread
+JOBS_RUN_INLINE = os.environ.get("JOBS_RUN_INLINE") == "1"
+
+# Staff ops dashboard snapshot is recomputed by the scheduler this often
+# (or by `manage.py refresh_ops_dashboard --interval`)
+OPS_SNAPSHOT_MAX_AGE = int(os.environ.get("OPS_SNAPSHOT_MAX_AGE", 120))
+
+# Periodic jobs (obdms.scheduler, `manage.py run_scheduler`):
+# name -> (function, interval in seconds)
+SCHEDULED_JOBS = {
+    "expire-requests": ("blood_requests.expiry.expire_stale_requests", 300),
+    "eligibility-reminders": ("donors.reminders.send_eligibility_reminders", 3600),
+    "ops-dashboard": ("analytics.ops.refresh_job", OPS_SNAPSHOT_MAX_AGE),
+    "idempotency-keys": ("obdms.idempotency.purge_expired_keys", 3600),
 }
 
+# Stale requests are closed as "expired" (blood_requests.expiry)
+REQUEST_EXPIRY_DAYS = int(os.environ.get("REQUEST_EXPIRY_DAYS", 14))
+MATCHED_REQUEST_EXPIRY_DAYS = int(os.environ.get("MATCHED_REQUEST_EXPIRY_DAYS", 30))
+EXPIRY_BATCH_SIZE = 500
+EXPIRY_TIME_BUDGET = 20         # seconds per run; the next run continues
+
+# Donors are reminded once their post-donation cooldown is over
+# (donors.reminders). Cooldowns that ended more than REMINDER_LOOKBACK_DAYS
+# ago (e.g. history imported before the job existed) are skipped silently.
+DONATION_COOLDOWN_DAYS = int(os.environ.get("DONATION_COOLDOWN_DAYS", 90))
+REMINDER_LOOKBACK_DAYS = 7
+REMINDER_BATCH_SIZE = 500
+REMINDER_TIME_BUDGET = 20
+
+# Repeated POSTs with the same idempotency key (obdms.idempotency) replay
+# the first response for this long instead of creating a second request.
+# Keys are claimed in a table (accounts.IdempotencyKey), shared by all workers.
+IDEMPOTENCY_KEY_TTL = 3600
+IDEMPOTENCY_WAIT = 10           # seconds a repeat waits for the original
+
 TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
@@ -57,11 +175,64 @@ TEMPLATES = [
                 "django.template.context_processors.request",
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
+                "donors.context_processors.donor_notifications",
             ],
         },
     },
 ]
 
+# CACHING
+# CACHE_BACKEND: "locmem" (per process) or "file" (shared by workers on one host)
+
+CACHE_BACKENDS = {
+    "locmem": "django.core.cache.backends.locmem.LocMemCache",
+    "file": "django.core.cache.backends.filebased.FileBasedCache",
+}
+
+CACHE_BACKEND = os.environ.get("CACHE_BACKEND", "locmem")
+
+CACHES = {
+    "default": {
+        "BACKEND": CACHE_BACKENDS[CACHE_BACKEND],
+        "LOCATION": os.environ.get(
+            "CACHE_LOCATION",
+            str(BASE_DIR / "cache") if CACHE_BACKEND == "file" else "obdms",
+        ),
+        "OPTIONS": {"MAX_ENTRIES": 5000},
+    }
+}
+
+PAGE_CACHE_TIMEOUT = int(os.environ.get("PAGE_CACHE_TIMEOUT", 300))
+FRAGMENT_CACHE_TIMEOUT = int(os.environ.get("FRAGMENT_CACHE_TIMEOUT", 600))
+
+# Fraction of requests that get a Server-Timing header + timing log line (0 = off)
+SERVER_TIMING_SAMPLE_RATE = float(os.environ.get("SERVER_TIMING_SAMPLE_RATE", 0))
+
+# N+1 detector: "warn", "raise" or "off" (default: warn when DEBUG)
+NPLUSONE_MODE = os.environ.get("NPLUSONE_MODE", "")
+NPLUSONE_THRESHOLD = int(os.environ.get("NPLUSONE_THRESHOLD", 3))
+
+# Staff requests with ?_profile=1 or "X-Profile: 1" run under cProfile
+PROFILE_DIR = os.environ.get("PROFILE_DIR", BASE_DIR / "profiles")
+PROFILE_TOP_FUNCTIONS = 40
+
+# /metrics: "Authorization: Bearer <token>" (staff always; open when DEBUG and unset)
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "obdms.timing": {"handlers": ["console"], "level": "INFO", "propagate": False},
+        "obdms.nplusone": {"handlers": ["console"], "level": "WARNING", "propagate": False},
+        "obdms.profiling": {"handlers": ["console"], "level": "INFO", "propagate": False},
+        "obdms.writes": {"handlers": ["console"], "level": "WARNING", "propagate": False},
+    },
+}
+
 STATIC_URL = "/static/"
 STATICFILES_DIRS = [BASE_DIR / "static"]
 
@@ -106,3 +277,7 @@ EMAIL_HOST_USER = os.environ.get("EMAIL_HOST_USER")
 EMAIL_HOST_PASSWORD = os.environ.get("EMAIL_HOST_PASSWORD")
 
 DEFAULT_FROM_EMAIL = EMAIL_HOST_USER or "obdms292@gmail.com"
+
+# Scheme + host for links in emails sent outside a request (scheduled
+# jobs, the benchmark); requests and admin actions pass their own
+SITE_URL = os.environ.get("SITE_URL", "")
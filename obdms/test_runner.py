@@ -0,0 +1,29 @@
+"""
+TEST_RUNNER: Django's runner, plus a throwaway metrics store.
+
+Counters bumped by the code under test go to a temporary
+METRICS_SQLITE_PATH for the whole run, never to the project's
+metrics.sqlite3.
+"""
+
+import os
+import shutil
+import tempfile
+
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TestRunner(DiscoverRunner):
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._metrics_dir = tempfile.mkdtemp(prefix="obdms-metrics-")
+        self._metrics_settings = override_settings(
+            METRICS_SQLITE_PATH=os.path.join(self._metrics_dir, "metrics.sqlite3")
+        )
+        self._metrics_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._metrics_settings.disable()
+        shutil.rmtree(self._metrics_dir, ignore_errors=True)
+        super().teardown_test_environment(**kwargs)
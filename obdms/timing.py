@@ -0,0 +1,212 @@
+"""
+Per-request performance instrumentation.
+
+A sampled request gets a RequestTimer in a context variable. SQL (through a
+connection execute wrapper), template rendering and @timed service calls
+add their durations to it; the middleware then emits a Server-Timing
+header and one JSON log line keyed by URL name.
+
+When a request is not sampled the hooks see no timer and only pay a
+context variable lookup.
+"""
+
+import json
+import logging
+import random
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.utils.decorators import sync_and_async_middleware
+
+
+logger = logging.getLogger("obdms.timing")
+
+_current = ContextVar("request_timer", default=None)
+
+
+# ==================================================
+# TIMER
+# ==================================================
+class RequestTimer:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.durations = defaultdict(float)
+        self.counts = defaultdict(int)
+        self._depth = defaultdict(int)
+
+    @contextmanager
+    def span(self, name):
+        self.counts[name] += 1
+        self._depth[name] += 1
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._depth[name] -= 1
+            # Nested spans of the same kind (a template including
+            # another) are only timed at the outermost level
+            if not self._depth[name]:
+                self.durations[name] += time.perf_counter() - started
+
+    def total(self):
+        return time.perf_counter() - self.started
+
+
+def current_timer():
+    return _current.get()
+
+
+def timed(name):
+    """Decorator adding a function's run time to the `name` span."""
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            timer = _current.get()
+            if timer is None:
+                return func(*args, **kwargs)
+            with timer.span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+# ==================================================
+# HOOKS (INSTALLED ONCE)
+# ==================================================
+def _sql_wrapper(execute, sql, params, many, context):
+    timer = _current.get()
+    if timer is None:
+        return execute(sql, params, many, context)
+    with timer.span("db"):
+        return execute(sql, params, many, context)
+
+
+def _install_sql_wrapper(connection, **kwargs):
+    if _sql_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_sql_wrapper)
+
+
+def _install_template_timer():
+    from django.template.backends.django import Template
+
+    render = Template.render
+    if getattr(render, "timed", False):
+        return
+
+    @wraps(render)
+    def timed_render(self, context=None, request=None):
+        timer = _current.get()
+        if timer is None:
+            return render(self, context, request)
+        with timer.span("tpl"):
+            return render(self, context, request)
+
+    timed_render.timed = True
+    Template.render = timed_render
+
+
+def install():
+    connection_created.connect(_install_sql_wrapper, dispatch_uid="obdms.timing")
+    # Connections opened before the middleware loaded never send the signal
+    for connection in connections.all(initialized_only=True):
+        _install_sql_wrapper(connection)
+    _install_template_timer()
+
+
+# ==================================================
+# REPORTING
+# ==================================================
+# span name -> Server-Timing metric description
+METRICS = {
+    "db": "SQL",
+    "tpl": "Templates",
+    "notify": "Notifications",
+    "pipeline": "Request pipeline",
+}
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 2)
+
+
+def _report(request, response, timer):
+    total = timer.total()
+
+    metrics = []
+    for name, description in METRICS.items():
+        if timer.counts[name]:
+            metrics.append(
+                f'{name};dur={_ms(timer.durations[name])};'
+                f'desc="{description} x{timer.counts[name]}"'
+            )
+    metrics.append(f'total;dur={_ms(total)};desc="View"')
+
+    existing = response.get("Server-Timing")
+    response["Server-Timing"] = ", ".join(([existing] if existing else []) + metrics)
+
+    match = request.resolver_match
+    logger.info(json.dumps({
+        "url": match.view_name if match else None,
+        "method": request.method,
+        "status": response.status_code,
+        "total_ms": _ms(total),
+        "db_queries": timer.counts["db"],
+        **{f"{name}_ms": _ms(timer.durations[name]) for name in METRICS},
+    }))
+
+
+def _sampled():
+    rate = settings.SERVER_TIMING_SAMPLE_RATE
+    return rate > 0 and (rate >= 1 or random.random() < rate)
+
+
+# ==================================================
+# MIDDLEWARE
+# ==================================================
+@sync_and_async_middleware
+def server_timing_middleware(get_response):
+    install()
+
+    if iscoroutinefunction(get_response):
+
+        async def middleware(request):
+            if not _sampled():
+                return await get_response(request)
+
+            timer = RequestTimer()
+            token = _current.set(timer)
+            try:
+                response = await get_response(request)
+            finally:
+                _current.reset(token)
+
+            _report(request, response, timer)
+            return response
+
+    else:
+
+        def middleware(request):
+            if not _sampled():
+                return get_response(request)
+
+            timer = RequestTimer()
+            token = _current.set(timer)
+            try:
+                response = get_response(request)
+            finally:
+                _current.reset(token)
+
+            _report(request, response, timer)
+            return response
+
+    return middleware
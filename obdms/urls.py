@@ -1,8 +1,18 @@
+from django.contrib import admin
 from django.urls import path, include
 from django.views.generic import TemplateView
 
+from accounts.views import metrics_view
+from obdms.caching import cache_anonymous_page
+
 urlpatterns = [
-    path("", TemplateView.as_view(template_name="home.html"), name="home"),
+    path(
+        "",
+        cache_anonymous_page(name="home")(TemplateView.as_view(template_name="home.html")),
+        name="home",
+    ),
+    path("metrics", metrics_view, name="metrics"),
+    path("admin/", admin.site.urls),
     path("accounts/", include("accounts.urls")),
     path("donors/", include(("donors.urls", "donors"), namespace="donors")),
     path("hospital/", include(("hospitals.urls", "hospital"), namespace="hospital")),
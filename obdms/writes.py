@@ -0,0 +1,143 @@
+"""
+Write coordination for SQLite's single writer lock.
+
+retry_write() runs a small write in its own transaction and retries
+"database is locked" with jittered exponential backoff, so a burst of
+writers queues up instead of failing. Keep side effects (emails) out of
+the wrapped function: it may run more than once.
+
+defer() hands low-priority writes (read receipts) to one background
+writer per process. That writer coalesces them into a single transaction
+every DEFERRED_WRITE_INTERVAL seconds, so they never compete with
+interactive writes request by request.
+"""
+
+import atexit
+import logging
+import random
+import threading
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.db import OperationalError, close_old_connections, connection, transaction
+
+from obdms import metrics
+
+
+logger = logging.getLogger("obdms.writes")
+
+LOCK_ERRORS = ("database is locked", "database table is locked")
+
+
+def is_locked(exc):
+    return isinstance(exc, OperationalError) and any(
+        message in str(exc) for message in LOCK_ERRORS
+    )
+
+
+def _backoff(attempt):
+    # "Full jitter": spreads retrying writers out instead of re-colliding
+    ceiling = min(
+        settings.WRITE_RETRY_MAX_DELAY,
+        settings.WRITE_RETRY_BASE_DELAY * 2 ** attempt,
+    )
+    return random.uniform(0, ceiling)
+
+
+# ==================================================
+# RETRY
+# ==================================================
+def retry_write(func):
+    """
+    @retry_write
+    def record(...): ...
+
+    or retry_write(Model.objects.create)(**fields)
+
+    Inside an outer atomic block the function just runs: only the
+    outermost transaction can be safely retried.
+    """
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if connection.in_atomic_block:
+            return func(*args, **kwargs)
+
+        attempts = settings.WRITE_RETRY_ATTEMPTS
+        for attempt in range(attempts):
+            try:
+                with transaction.atomic():
+                    return func(*args, **kwargs)
+            except OperationalError as exc:
+                if not is_locked(exc) or attempt == attempts - 1:
+                    if is_locked(exc):
+                        metrics.inc("obdms_write_retries_total", result="gave_up")
+                    raise
+                metrics.inc("obdms_write_retries_total", result="retried")
+                time.sleep(_backoff(attempt))
+
+    return wrapper
+
+
+# ==================================================
+# LOW-PRIORITY WRITE QUEUE
+# ==================================================
+class WriteQueue:
+    """
+    handler -> items collected since the last flush. Each flush calls
+    handler(items) once per handler, all in one retried transaction.
+    """
+
+    def __init__(self):
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def add(self, handler, items):
+        with self._lock:
+            self._pending.setdefault(handler, []).extend(items)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="obdms-write-queue", daemon=True
+                )
+                self._thread.start()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+
+        @retry_write
+        def apply():
+            for handler, items in pending.items():
+                handler(items)
+
+        try:
+            apply()
+        except Exception:
+            logger.exception("Deferred writes dropped (%d handlers)", len(pending))
+
+    def _run(self):
+        while True:
+            time.sleep(settings.DEFERRED_WRITE_INTERVAL)
+            close_old_connections()
+            self.flush()
+
+
+low_priority = WriteQueue()
+atexit.register(low_priority.flush)
+
+
+def defer(handler, items):
+    """
+    Queue handler(items) when DEFER_LOW_PRIORITY_WRITES is on,
+    otherwise apply it now (with retries).
+    """
+    if settings.DEFER_LOW_PRIORITY_WRITES:
+        low_priority.add(handler, items)
+        return False
+
+    retry_write(handler)(items)
+    return True